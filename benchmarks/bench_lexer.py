@@ -0,0 +1,74 @@
+"""Benchmark the runtime Lexer tokenizing synthetic log lines.
+
+Tokenize a synthetic log stream, in the style of a typical web server access
+log, with a small scanner and report the throughput in tokens per second for
+both str and bytes input.
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from spag.runtime import Lexer
+from spag.scanner import RegularGrammar
+
+
+def grammar():
+    """Construct a scanner specification for log lines."""
+    _class = (RegularGrammar.left_class(), RegularGrammar.right_class())
+    _range, _plus = RegularGrammar.character_range(), RegularGrammar.kleene_plus()
+    _negate, _star = RegularGrammar.character_negation(), RegularGrammar.kleene_star()
+    return RegularGrammar('log', {
+        'number': [_class[0], '0', _range, '9', _class[1], _plus],
+        'word': [_class[0], 'a', _range, 'z', 'A', _range, 'Z', '_', _class[1],
+                 _class[0], 'a', _range, 'z', 'A', _range, 'Z', '0', _range, '9', '_',
+                 _class[1], _star],
+        'string': ['"', _class[0], _negate, '"', '\n', _class[1], _star, '"'],
+        'punctuation': [_class[0], '.', ':', '/', '-', '[', ']', '=', ',', _class[1]],
+        'whitespace': [_class[0], ' ', '\t', '\n', _class[1], _plus],
+    })
+
+
+def log(lines, seed=0):
+    """Construct `lines` lines of synthetic log output."""
+    random = Random(seed)
+    methods, paths = ('GET', 'POST', 'PUT'), ('/index.html', '/api/v1/users', '/static/app.js')
+    return ''.join('10.0.{0}.{1} - - [16/Oct/2026:12:{2:02}:{3:02}] "{4} {5} HTTP/1.1" {6} {7}\n'
+                   .format(random.randint(0, 255), random.randint(0, 255),
+                           random.randint(0, 59), random.randint(0, 59),
+                           random.choice(methods), random.choice(paths),
+                           random.choice((200, 304, 404, 500)), random.randint(0, 99999))
+                   for _ in range(lines))
+
+
+def benchmark(lexer, text, repeat):
+    """Tokenize the text; report the token count and the best time."""
+    best, count = None, 0
+    for _ in range(repeat):
+        start = perf_counter()
+        count = sum(1 for _ in lexer.tokens(text))
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+
+def main():
+    """Run the benchmark for each requested size and print the results."""
+    cli = ArgumentParser(description='Benchmark the runtime Lexer.')
+    cli.add_argument('-l', '--lines', type=int, nargs='+', default=[1000, 10000],
+                     help='Number of log lines to tokenize.')
+    cli.add_argument('-r', '--repeat', type=int, default=3,
+                     help='Repetitions per size; the best time is reported.')
+    args = cli.parse_args()
+
+    lexer = Lexer(grammar())
+    print('{0: >8} {1: >6} {2: >10} {3: >12} {4: >14}'.format('lines', 'input', 'tokens',
+                                                              'seconds', 'tokens/sec'))
+    for lines in args.lines:
+        text = log(lines)
+        for kind, data in (('str', text), ('bytes', text.encode('latin-1'))):
+            count, elapsed = benchmark(lexer, data, args.repeat)
+            print('{0: >8} {1: >6} {2: >10} {3: >12.4f} {4: >14.0f}'.format(
+                lines, kind, count, elapsed, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark the runtime Parser parsing synthetic JSON documents.
+
+Parse synthetic JSON documents, both wide (many small records) and deep (a
+single array nested to the given depth), with a small LL(1) grammar and report
+the throughput in tokens per second for the flat derivation stream, the
+enter/token/exit event stream, the parse tree of Nodes and the flat array
+encoded Tree. The input is tokenized ahead of time so only parsing is timed.
+"""
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from spag.parser import ContextFreeGrammar
+from spag.runtime import Lexer, Parser
+from spag.scanner import RegularGrammar
+
+
+def scanner():
+    """Construct a scanner specification for JSON."""
+    _class = (RegularGrammar.left_class(), RegularGrammar.right_class())
+    _range, _plus = RegularGrammar.character_range(), RegularGrammar.kleene_plus()
+    _negate, _star = RegularGrammar.character_negation(), RegularGrammar.kleene_star()
+    return RegularGrammar('json', {
+        'string': ['"', _class[0], _negate, '"', '\n', _class[1], _star, '"'],
+        'number': [_class[0], '0', _range, '9', _class[1], _plus],
+        'true': ['t', 'r', 'u', 'e'],
+        'false': ['f', 'a', 'l', 's', 'e'],
+        'null': ['n', 'u', 'l', 'l'],
+        '{': ['{'], '}': ['}'], '[': ['['], ']': [']'], ':': [':'], ',': [','],
+        'whitespace': [_class[0], ' ', '\t', '\n', _class[1], _plus],
+    })
+
+
+def grammar():
+    """Construct an LL(1) parser specification for JSON."""
+    return ContextFreeGrammar('json', {
+        'value': [['object'], ['array'], ['string'], ['number'], ['true'], ['false'], ['null']],
+        'object': [['{', 'members', '}']],
+        'members': [['pair', 'pairs'], []],
+        'pairs': [[',', 'pair', 'pairs'], []],
+        'pair': [['string', ':', 'value']],
+        'array': [['[', 'elements', ']']],
+        'elements': [['value', 'values'], []],
+        'values': [[',', 'value', 'values'], []],
+    }, 'value')
+
+
+def wide(records, seed=0):
+    """Construct an array of `records` small flat objects."""
+    random = Random(seed)
+    return '[' + ',\n'.join('{{"id": {0}, "name": "user{1}", "active": {2}, "tags": [{3}]}}'
+                            .format(record, random.randint(0, 99999),
+                                    random.choice(('true', 'false', 'null')),
+                                    ', '.join(str(random.randint(0, 9)) for _ in range(3)))
+                            for record in range(records)) + ']'
+
+
+def deep(depth):
+    """Construct a single array nested `depth` times."""
+    return '[' * depth + '0' + ']' * depth
+
+
+def benchmark(run, tokens, repeat):
+    """Run over the tokens; report the best time."""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        run(tokens)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Run the benchmark for each requested size and print the results."""
+    cli = ArgumentParser(description='Benchmark the runtime Parser.')
+    cli.add_argument('-w', '--records', type=int, nargs='+', default=[1000, 10000],
+                     help='Number of records in the wide documents.')
+    cli.add_argument('-d', '--depths', type=int, nargs='+', default=[100000],
+                     help='Nesting depth of the deep documents.')
+    cli.add_argument('-r', '--repeat', type=int, default=3,
+                     help='Repetitions per size; the best time is reported.')
+    args = cli.parse_args()
+
+    lexer, parser = Lexer(scanner(), ignore={'whitespace'}), Parser(grammar())
+    runs = (('derive', lambda tokens: sum(1 for _ in parser.derive(tokens))),
+            ('events', lambda tokens: sum(1 for _ in parser.events(tokens))),
+            ('parse', parser.parse),
+            ('tree', parser.tree))
+    documents = [('wide', size, wide(size)) for size in args.records] + \
+                [('deep', size, deep(size)) for size in args.depths]
+    print('{0: >6} {1: >8} {2: >7} {3: >10} {4: >12} {5: >14}'.format(
+        'shape', 'size', 'output', 'tokens', 'seconds', 'tokens/sec'))
+    for shape, size, text in documents:
+        tokens = list(lexer.tokens(text))
+        for output, run in runs:
+            elapsed = benchmark(run, tokens, args.repeat)
+            print('{0: >6} {1: >8} {2: >7} {3: >10} {4: >12.4f} {5: >14.0f}'.format(
+                shape, size, output, len(tokens), elapsed, len(tokens) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark RegularGrammar compilation as the size of the input grows.
+
+Compile synthetic scanner specifications of increasing size and report the
+wall time taken for each. Three families of specifications are available:
+
+  * keywords: a set of distinct keywords, which is the typical bulk of a
+    programming language scanner and produces an NFA with many transitions
+    sharing a common prefix.
+  * identifiers: a set of distinct, pseudo random lowercase keywords along
+    with an identifier overlapping them all, as in a real scanner, whose DFA
+    has a wide row for every keyword state.
+  * suffix: (a|b)*a(a|b){n}, the classic expression whose minimal DFA has
+    2^(n+1) states, which stresses subset construction and minimization.
+
+Optionally the comb vector compression of the resulting transition table, as
+used by table encoded generators, is timed as well.
+"""
+from argparse import ArgumentParser
+from random import Random
+from string import ascii_lowercase
+from time import perf_counter
+from spag.generator import Generator
+from spag.scanner import RegularGrammar
+
+
+def keywords(size):
+    """Construct a scanner specification with `size` keywords."""
+    expressions = {}
+    for idx in range(size):
+        keyword = 'kw{0}'.format(idx)
+        expressions[keyword] = list(keyword)
+    return expressions
+
+
+def identifiers(size):
+    """Construct a scanner specification with `size` keywords and identifiers."""
+    rng, expressions = Random(size), {}
+    while len(expressions) < size:
+        keyword = ''.join(rng.choice(ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        expressions[keyword] = list(keyword)
+    expressions['id'] = [RegularGrammar.left_class(), 'a', RegularGrammar.character_range(),
+                         'z', '0', RegularGrammar.character_range(), '9',
+                         RegularGrammar.right_class(), RegularGrammar.kleene_plus()]
+    return expressions
+
+
+def suffix(size):
+    """Construct a scanner specification whose minimal DFA is exponential."""
+    choice = [RegularGrammar.left_group(), 'a', RegularGrammar.alternative(), 'b',
+              RegularGrammar.right_group()]
+    return {'suffix': choice + [RegularGrammar.kleene_star(), 'a'] + choice * size}
+
+
+def benchmark(family, size, construction, repeat):
+    """Compile the `family` specification of `size`; report the best times.
+
+    The best time to compress the grammar's transition table is reported
+    alongside the best time to compile it.
+    """
+    expressions = family(size)
+    best, comb, grammar = None, None, None
+    for _ in range(repeat):
+        start = perf_counter()
+        grammar = RegularGrammar(family.__name__, expressions, construction)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        table = grammar.table
+        start = perf_counter()
+        Generator._comb(table)  # pylint: disable=protected-access
+        elapsed = perf_counter() - start
+        comb = elapsed if comb is None else min(comb, elapsed)
+    return sum(len(pattern) for pattern in expressions.values()), \
+           len(grammar.states), best, comb
+
+
+def main():
+    """Run the benchmark for each requested size and print the results."""
+    cli = ArgumentParser(description='Benchmark RegularGrammar compilation.')
+    cli.add_argument('-f', '--family', choices=('keywords', 'identifiers', 'suffix'),
+                     default='keywords',
+                     help='The family of specifications to compile.')
+    cli.add_argument('-c', '--construction', choices=('thompson', 'glushkov'),
+                     default='thompson',
+                     help='The NFA construction used by RegularGrammar.')
+    cli.add_argument('-s', '--sizes', type=int, nargs='+',
+                     default=[25, 50, 100, 200, 400],
+                     help='Size of each specification (e.g. keywords).')
+    cli.add_argument('-r', '--repeat', type=int, default=3,
+                     help='Repetitions per size; the best time is reported.')
+    cli.add_argument('--comb', action='store_true',
+                     help='Also report the time to comb vector compress the table.')
+    args = cli.parse_args()
+
+    family = {'keywords': keywords, 'identifiers': identifiers, 'suffix': suffix}[args.family]
+    header = '{0: >8} {1: >10} {2: >10} {3: >12}'.format('size', 'symbols', 'states', 'seconds')
+    print(header + (' {0: >12}'.format('comb') if args.comb else ''))
+    for size in args.sizes:
+        symbols, states, elapsed, comb = benchmark(family, size, args.construction,
+                                                   args.repeat)
+        row = '{0: >8} {1: >10} {2: >10} {3: >12.4f}'.format(size, symbols, states, elapsed)
+        print(row + (' {0: >12.4f}'.format(comb) if args.comb else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,21 @@
 Create the PyPI package distribution(s) for use with python pip or install
 directly from source.
 """
+from re import MULTILINE, search
 from setuptools import setup
 
 
 with open('README.md', 'r') as fd:
     README = fd.read()
 
+# NOTE: Read rather than import the version, so spag/__init__.py remains its
+# single source of truth without importing the package before it is built.
+with open('spag/__init__.py', 'r') as fd:
+    VERSION = search(r"^__version__ = '([^']+)'$", fd.read(), MULTILINE).group(1)
+
 setup(
     name='SPaG',
-    version='1.0.0a0',
+    version=VERSION,
     license='MIT',
     author='Ryan Rozanski',
     author_email='',
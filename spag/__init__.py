@@ -0,0 +1,6 @@
+"""Scanner and parser generation through SPaG.
+
+SPaG compiles regular grammars into minimal DFA's and context free grammars
+into parse tables, which the generators then output as source programs.
+"""
+__version__ = '1.0.0a0'
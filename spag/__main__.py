@@ -11,6 +11,8 @@ from json import dumps, JSONEncoder, loads
 from os.path import isfile
 from sys import argv, stdout
 from time import time
+from types import MappingProxyType
+from spag import __version__
 from spag.generator import Generator
 from spag.generators import __all__ as languages
 from spag.parser import ContextFreeGrammar
@@ -43,6 +45,7 @@ class SPaGEncoder(JSONEncoder):
                 "expressions": o.expressions,
                 "states": list(o.states),
                 "alphabet": list(o.alphabet),
+                "classes": o.classes,
                 "transitions": list(o.transitions),
                 "start": o.start,
                 "accepting": list(o.accepting),
@@ -73,10 +76,16 @@ class SPaGEncoder(JSONEncoder):
                 "parser": o.parser.name if o.parser else None,
                 "filename": o.filename,
                 "encoding": o.encoding,
-                "match": o.match
+                "match": o.match,
+                "tabulate": o.tabulate,
+                "ignore": sorted(o.ignore)
             }
         if isinstance(o, Enum):
             return str(o)
+        if isinstance(o, MappingProxyType):
+            return dict(o)
+        if isinstance(o, frozenset):
+            return list(o)
         return JSONEncoder.default(self, o)
 # pylint: enable=method-hidden
 
@@ -185,8 +194,12 @@ class CollectConfiguration(Action):
                         if setting == 'scanners':
                             specifications.append(CollectScannerSpecifications.collect(input_specification))
                 value = specifications
-            elif setting in ('force', 'time', 'verbose', 'debug'):
+            elif setting == 'ignore':
+                value = [_type.strip() for _type in value.split(',') if _type.strip()]
+            elif setting in ('force', 'time', 'verbose', 'debug', 'tabulate'):
                 value = CollectConfiguration.bool(str(value))
+            elif setting == 'cache':
+                value = value or None
             elif setting in ('configuration', 'output'):
                 pass
             else:
@@ -212,6 +225,17 @@ encoding=direct
 # or 'shortest'.
 match=longest
 
+# Use Reps' tabulating maximal munch, guaranteeing linear time scanning. Requires
+# 'table' encoding and 'longest' matching. Possible values include 'True' or
+# 'False'.
+tabulate=False
+
+# Scanner type(s) which generated parsers skip, such as whitespace or comments.
+# Any other type not in a parser's grammar is a syntax error.
+ignore=space,
+       bcomment,
+       lcomment
+
 # Overwrite pre-exisintg files if they exist. Possible values include 'True' or
 # 'False'.
 force=True
@@ -222,6 +246,10 @@ generate=c
 # Base filename to derive the generated output filename(s).
 output=out
 
+# Directory of the compile cache, reusing the compiled scanner(s)/parser(s)
+# of unchanged specifications. Leave empty to always compile.
+cache=
+
 # File path(s) to the JSON parser specification(s), if any.
 # The file should contain a dictionary with keys:
 #   - name (str): BNF grammar name.
@@ -286,6 +314,10 @@ def cli_program():
     cli.add_argument('-c', '--configuration', type=open, metavar='rcfile',
                      action=CollectConfiguration,
                      help='Collect arguments from rcfile instead of command line.')
+    cli.add_argument('-C', '--cache', type=str, default=None, metavar='directory',
+                     help='Directory of the compile cache; compiled scanner(s) '
+                          'and parser(s) of unchanged specifications are loaded '
+                          'from here rather than recomputed.')
     cli.add_argument('-d', '--debug', action='store_true',
                      help='Dump the instantiated scanner, parser, and generator '
                           'into a JSON object to inspect/ensure the input was '
@@ -304,6 +336,10 @@ def cli_program():
     cli.add_argument('-h', '--help', action='store_true',
                      help='Show this help message and exit. The default behavior if '
                           'no arguments are supplied.')
+    cli.add_argument('-i', '--ignore', type=str, nargs='*', default=[], metavar='type',
+                     help='Scanner type(s) which generated parsers skip, such '
+                          'as whitespace or comments. Any other type not in a '
+                          'parser\'s grammar is a syntax error.')
     cli.add_argument('-m', '--match', type=str, default='longest',
                      choices=('longest', 'shortest'),
                      help='Source program text matching strategy to use in the '
@@ -331,12 +367,16 @@ def cli_program():
                           'token names to a sequence representing the expression. '
                           'The strings in the sequence should be of length one '
                           'unless excaping an operator (*,+,.,|,?,(,),[,],-,^).')
+    cli.add_argument('-T', '--tabulate', action='store_true',
+                     help='Use Reps\' tabulating maximal munch in the generated '
+                          'scanner(s), guaranteeing linear time scanning. '
+                          'Requires table encoding and longest matching.')
     cli.add_argument('-t', '--time', action='store_true',
                      help='Display the wall time taken for each component.')
     cli.add_argument('-v', '--verbose', action='store_true',
                      help='Output more information when running.')
     cli.add_argument('-V', '--version', action='version',
-                     version='SPaG-CLI v1.0.0a0',
+                     version='SPaG-CLI v{0}'.format(__version__),
                      help='Show version information and exit.')
     return cli
 
@@ -366,7 +406,7 @@ def main():
             stdout.flush()
         start = time()
         try:
-            scanners.append(RegularGrammar(**scanner))
+            scanners.append(RegularGrammar(**scanner, cache=args['cache']))
         except Exception as exception:
             stdout.write('Failed to create scanner:\n{0}\n'.format(exception))
             stdout.flush()
@@ -390,7 +430,7 @@ def main():
             stdout.flush()
         start = time()
         try:
-            parsers.append(ContextFreeGrammar(**parser))
+            parsers.append(ContextFreeGrammar(**parser, cache=args['cache']))
         except Exception as exception:
             stdout.write('Failed to create parser:\n{0}\n'.format(exception))
             stdout.flush()
@@ -413,6 +453,7 @@ def main():
         generator = generator()
         generator.encoding = args['encoding']
         generator.match = args['match']
+        generator.tabulate = args['tabulate']
         generator.filename = args['output']
         generators.append((target, generator))
 
@@ -425,6 +466,7 @@ def main():
     for (target, generator), scanner, parser in output:
         generator.parser = parser
         generator.scanner = scanner
+        generator.ignore = set(args['ignore']) & set(scanner.expressions) if scanner else set()
         if scanner:
             target = target + '_' + scanner.name
         if parser:
@@ -445,6 +487,9 @@ def main():
         end = time()
         if args['verbose']:
             stdout.write('done\n')
+            if generator.sizes:
+                stdout.write('Table size ({0}): {1} bytes compressed; {2} bytes dense\n'.format(
+                    target, *generator.sizes))
             stdout.flush()
         if args['time']:
             stdout.write('Elapsed time (generator: {0}) {1}s\n'.format(target,
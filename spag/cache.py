@@ -0,0 +1,126 @@
+"""A persistent, content addressed cache of compiled SPaG artifacts.
+
+The Cache object stores the results of compiling RegularGrammar (minimal DFA)
+and ContextFreeGrammar (first/follow sets and parse table) objects on disk so
+subsequent compilations of the same specification can be loaded rather than
+recomputed. Entries are addressed by a hash of the normalized specification
+along with the SPaG version, so any change to either results in a miss.
+"""
+from enum import Enum
+from hashlib import sha256
+from json import dumps
+from os import makedirs, remove, replace
+from os.path import join
+from pickle import dumps as serialize, loads as deserialize, HIGHEST_PROTOCOL
+from tempfile import NamedTemporaryFile
+from zlib import compress, decompress
+from spag import __version__
+
+
+class Cache:
+    """The Cache object responsible for storing and loading compiled artifacts.
+
+    Cache represents a directory of compressed binary entries, one per
+    compiled specification. Entries are written atomically so concurrent
+    builds sharing a cache never observe partial writes, and unreadable
+    entries are treated as misses. Entries are unpickled when loaded so the
+    cache directory must be trusted.
+    """
+
+    _suffix = '.spag'
+
+    def __init__(self, directory):
+        """Construct a Cache storing its entries within the given directory.
+
+        Args:
+          directory (str): the directory to store entries in; created on the
+              first store if it does not already exist.
+
+        Raises:
+          TypeError: if directory is not a string
+          ValueError: if directory is empty
+        """
+        if not isinstance(directory, str):
+            raise TypeError('directory must be a string')
+
+        if not directory:
+            raise ValueError('directory must be non empty')
+
+        self._directory = directory
+
+    @property
+    def directory(self):
+        """Query for the directory the cache entries are stored in.
+
+        Return:
+          str: the directory of the cache.
+        """
+        return self._directory
+
+    @staticmethod
+    def key(kind, *specification):
+        """Compute the content address of a specification.
+
+        The specification is normalized to JSON, with operators tagged by their
+        enumeration so they never collide with plain strings, and hashed along
+        with the kind of artifact and the SPaG version.
+
+        Args:
+          kind (str): the kind of artifact the specification compiles to.
+          specification (tuple): the (ordered) inputs to the compilation.
+
+        Return:
+          str: the hexadecimal digest addressing the specification.
+        """
+        normalized = dumps([__version__, kind, specification], separators=(',', ':'),
+                           default=Cache._normalize)
+        return sha256(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _normalize(value):
+        """Normalize the values JSON cannot handle itself."""
+        if isinstance(value, Enum):
+            return {type(value).__name__: value.name}
+        raise TypeError('specification value must be JSON serializable')
+
+    def load(self, key):
+        """Load the artifact stored under the given key, if any.
+
+        Args:
+          key (str): the content address of the artifact.
+
+        Return:
+          object|None: the stored artifact, or None if it was not found or
+            could not be read.
+        """
+        try:
+            with open(join(self._directory, key + Cache._suffix), 'rb') as entry:
+                return deserialize(decompress(entry.read()))
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def store(self, key, artifact):
+        """Store the artifact under the given key, replacing any existing one.
+
+        Failures to write are ignored since the cache is only an optimization.
+
+        Args:
+          key (str): the content address of the artifact.
+          artifact (object): the compiled artifact to store.
+        """
+        data = compress(serialize(artifact, HIGHEST_PROTOCOL))
+        try:
+            makedirs(self._directory, exist_ok=True)
+            entry = NamedTemporaryFile(dir=self._directory, delete=False)  # pylint: disable=consider-using-with
+        except OSError:
+            return
+
+        try:
+            with entry:
+                entry.write(data)
+            replace(entry.name, join(self._directory, key + Cache._suffix))
+        except OSError:
+            try:
+                remove(entry.name)
+            except OSError:
+                pass
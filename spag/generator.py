@@ -31,6 +31,9 @@ class Generator:
         self._filename = 'out'
         self._encoding = 'direct'
         self._match = 'longest'
+        self._tabulate = False
+        self._ignore = frozenset()
+        self._sizes = None
 
     @property
     def scanner(self):
@@ -193,6 +196,78 @@ class Generator:
 
         self._match = match
 
+    @property
+    def tabulate(self):
+        """Get or set whether maximal munch should be tabulating.
+
+        Query for or attempt to set whether the generated scanner should use
+        Reps' tabulating maximal munch algorithm. It remembers the (state,
+        position) pairs known to fail to lead to a longer match so input is
+        never rescanned from the same state, guaranteeing linear time
+        tokenization even for token sets (e.g. `a` and `a*b`) and inputs on
+        which plain backtracking is quadratic. Only available with 'table'
+        encoding and 'longest' matching.
+
+        Args:
+          tabulate (bool): whether to use tabulating maximal munch.
+
+        Return:
+          bool: False if not set (default), otherwise the last set value.
+
+        Raises:
+          TypeError if tabulate is not of type bool
+        """
+        return self._tabulate
+
+    @tabulate.setter
+    def tabulate(self, tabulate):
+        if not isinstance(tabulate, bool):
+            raise TypeError('tabulate must be of type bool')
+
+        self._tabulate = tabulate
+
+    @property
+    def ignore(self):
+        """Get or set the scanner types a generated parser should skip.
+
+        Query for or attempt to set the token types (e.g. whitespace and
+        comments) a generated parser reads from the scanner but never parses,
+        mirroring the runtime Lexer's ignore set. A token of any other type
+        which is not a terminal of the grammar is a syntax error.
+
+        Args:
+          ignore (set[str]): the scanner types to skip.
+
+        Return:
+          frozenset[str]: empty if not set (default), otherwise the last set
+            types.
+
+        Raises:
+          TypeError if ignore is not a set of strings
+        """
+        return self._ignore
+
+    @ignore.setter
+    def ignore(self, ignore):
+        if not isinstance(ignore, (set, frozenset)) or \
+           not all(isinstance(_type, str) for _type in ignore):
+            raise TypeError('ignore must be a set of strings')
+
+        self._ignore = frozenset(ignore)
+
+    @property
+    def sizes(self):
+        """Get the sizes of the last generated, compressed scanner table.
+
+        Query for how much the last call to generate saved by compressing the
+        scanner's transition table, as only done by some encodings.
+
+        Return:
+          None: if no compressed table was generated.
+          tuple[int, int]: the compressed and dense table sizes in bytes.
+        """
+        return self._sizes
+
     def _translate(self):
         """The method which subclasses must override to construct the output.
 
@@ -210,6 +285,90 @@ class Generator:
         """
         raise NotImplementedError('Base Generator incapable of translation')
 
+    @staticmethod
+    def _comb(table):
+        """Compress the scanner's transition table with row displacement.
+
+        Pack the rows of the (dense) TransitionTable into a single comb vector
+        following the base/next/check/default scheme used by flex and the
+        Dragon book. Each state's most common next state becomes its default
+        and is not stored. The remaining entries are placed at the smallest
+        offset (base) where they do not collide with those already placed.
+        The next state of `state` on class `symbol` is then found by:
+
+          idx = base[state] + symbol
+          next[idx] if check[idx] == state else default[state]
+
+        States with the most entries are placed first, since they are the
+        hardest to fit. The search for an offset never retries one known to
+        collide: on finding an entry's slot taken it jumps straight to the
+        next free slot for that entry, found through Generator._free.
+
+        Args:
+          table (TransitionTable): the scanner's compact transition table.
+
+        Return:
+          list[int]: the offset (base) of each state's row in next/check.
+          list[int]: the packed next states.
+          list[int]: the owning state of each entry in next, -1 if unused.
+          list[int]: the default next state of each state.
+        """
+        classes, cells = table.classes, table.cells
+        rows = [cells[state*classes:(state+1)*classes] for state in range(table.states)]
+
+        default = []
+        for row in rows:
+            counts = {}
+            for dest in row:
+                counts[dest] = counts.get(dest, 0) + 1
+            default.append(max(sorted(counts), key=lambda dest, c=counts: c[dest]))
+
+        base, _next, check, succ = [0 for _ in rows], [], [], []
+        entries = [[symbol for symbol, dest in enumerate(row) if dest != default[state]]
+                   for state, row in enumerate(rows)]
+        for state in sorted(range(len(rows)), key=lambda state: (-len(entries[state]), state)):
+            symbols, offset, idx = entries[state], 0, 0
+            while idx < len(symbols):
+                slot = Generator._free(succ, offset + symbols[idx])
+                if slot == offset + symbols[idx]:
+                    idx += 1
+                else:  # every offset up to slot - symbol collides on this entry
+                    offset, idx = slot - symbols[idx], 0
+            base[state] = offset
+
+            size = offset + classes
+            _next.extend(0 for _ in range(size - len(_next)))
+            check.extend(-1 for _ in range(size - len(check)))
+            succ.extend(range(len(succ), size))
+            for symbol in symbols:
+                _next[offset+symbol] = rows[state][symbol]
+                check[offset+symbol] = state
+                succ[offset+symbol] = offset + symbol + 1
+
+        return base, _next, check, default
+
+    @staticmethod
+    def _free(succ, slot):
+        """Find the first free slot of the comb vector at or after `slot`.
+
+        succ holds each free slot itself and each taken slot a later slot to
+        continue the search from (slots past its end are all free). The path
+        followed is compressed, so repeated searches take near constant time.
+
+        Args:
+          succ (list[int]): the successor of each slot, updated in place.
+          slot (int): the slot to start searching from.
+
+        Return:
+          int: the first free slot at or after slot.
+        """
+        free = slot
+        while free < len(succ) and succ[free] != free:
+            free = succ[free]
+        while slot < len(succ) and succ[slot] != slot:
+            succ[slot], slot = free, succ[slot]
+        return free
+
     def _verify_options(self):
         """Verify the current configuration of set options in the generator.
 
@@ -218,10 +377,25 @@ class Generator:
 
         Raises:
           ValueError: if neither a scanner nor a parser is set.
+          ValueError: if ignoring types not of the scanner.
+          ValueError: if tabulating a scanner without 'table' encoding.
+          ValueError: if tabulating a scanner without 'longest' matching.
         """
         if not self.scanner and not self.parser:
             raise ValueError('scanner and/or parser must be provided for generation')
 
+        if self.scanner and not self.ignore <= set(self.scanner.expressions):
+            raise ValueError('ignore must only contain types of the scanner')
+
+        if not self.scanner or not self.tabulate:
+            return
+
+        if self.encoding != 'table':
+            raise ValueError('tabulating maximal munch requires table encoding')
+
+        if self.match != 'longest':
+            raise ValueError('tabulating maximal munch requires longest matching')
+
     @staticmethod
     def _verify_output(files):
         """Verify the output returned from the subclass generator.
@@ -281,6 +455,7 @@ class Generator:
         """
         self._verify_options()
 
+        self._sizes = None
         files = self._translate()
 
         Generator._verify_output(files)
@@ -67,10 +67,46 @@ class C(Generator):
 """.format(name.upper())
 
 
+    # NOTE: Constants of the generated api, also prefixed by the scanner/parser
+    # name, which token types must not collide with. Parser terminals are all
+    # prefixed by T_.
+    _constants = {
+        "NIL", "EOF", "INVALID_INPUT", "OUT_OF_MEMORY", "UNKNOWN_ERROR", "START",
+        "SINK", "NO_CLASS", "ROW_BYTES", "BLOCK_SIZE", "ACCEPT", "SYNTAX_ERROR",
+        "READ_ERROR", "PARSE_OUT_OF_MEMORY", "END_OF_INPUT", "TERMINALS",
+        "START_SYMBOL"
+    }
+
+    def _token_type(self, name, token_name):
+        """
+        The (enum) type of the named token, prefixed by the scanner name so it
+        never collides with other identifiers (e.g. NULL), and suffixed should
+        it collide with the constants of the generated api.
+        """
+        _type = self._sanatize(token_name.upper())
+        if _type in self._constants or _type.startswith('T_'):
+            _type += '_TOKEN'
+        return self._sanatize('{0}_{1}'.format(name, _type))
+
+    @staticmethod
+    def _ctype(values):
+        """
+        The smallest c integer type able to represent all of the values, along
+        with its size in bytes.
+        """
+        low, high = min(values, default=0), max(values, default=0)
+        for ctype, bits in (('char', 8), ('short', 16), ('int', 32)):
+            if low >= 0 and high < 1 << bits:
+                return 'unsigned ' + ctype, bits // 8
+            if -(1 << (bits-1)) <= low and high < 1 << (bits-1):
+                return 'signed ' + ctype if bits == 8 else ctype, bits // 8
+        return 'long', 8
+
     def _generate_token_api(self, name):
         types = []
         for token_name, pattern in self.scanner.expressions.items():
-            types.append('  {0: <23} // {1}'.format(token_name.upper()+",", pattern))
+            types.append('  {0: <23} // {1}'.format(self._token_type(name, token_name)+",",
+                                                  list(pattern)))
         return """\
 {2}
 // Token's abstract over the character input stream.
@@ -125,30 +161,26 @@ typedef struct {0}_token {{
                            unsigned long source_len,
                            unsigned long line,
                            unsigned long column) {{
+  // NOTE: The text and source are stored after the token in one allocation.
   {0}_token_t *{0}_token;
-  if(!(({0}_token = calloc(1, sizeof({0}_token_t))) &&
-       ({0}_token->text = malloc(sizeof(char)*(text_len+1))) &&
-       ({0}_token->source = malloc(sizeof(char)*(source_len+1))))) {{
-    free({0}_token->source);
-    free({0}_token->text);
-    free({0}_token);
+  if(!({0}_token = malloc(sizeof({0}_token_t) + sizeof(char)*(text_len+source_len+2)))) {{
     return NULL;
   }}
 
   {0}_token->type = type;
   {0}_token->line = line;
   {0}_token->column = column;
-  strncpy({0}_token->text, text, sizeof(char)*text_len);
+  {0}_token->text = (char *)({0}_token + 1);
+  memcpy({0}_token->text, text, sizeof(char)*text_len);
   {0}_token->text[text_len] = 0;
-  strncpy({0}_token->source, source, sizeof(char)*source_len);
+  {0}_token->source = {0}_token->text + text_len + 1;
+  memcpy({0}_token->source, source, sizeof(char)*source_len);
   {0}_token->source[source_len] = 0;
 
   return {0}_token;
 }}
 
 void free_{0}_token({0}_token_t *{0}_token) {{
-  free({0}_token->text);
-  free({0}_token->source);
   free({0}_token);
 }}
 
@@ -176,9 +208,12 @@ unsigned long column({0}_token_t *{0}_token) {{ return {0}_token->column; }}
             labels[state_id] = "L{0}".format(label)
 
         program = """\
+  int peek;
+
+  {1}_scanner->last_final_pos = -1;
   goto {0};
 
-""".format(labels[self.scanner.start])
+""".format(labels[self.scanner.start], name)
 
         for in_state, state_key in state.items():
             if in_state in types.get('_sink', set()):
@@ -210,10 +245,10 @@ unsigned long column({0}_token_t *{0}_token) {{ return {0}_token->column; }}
                             _type = pname
                             break
                     cases += """\
-      {0}_scanner->last_final_pos = ftell({0}_scanner->input);
+      {0}_scanner->last_final_pos = {0}_tell({0}_scanner);
       {0}_scanner->last_final_type = {1};
       goto {2};
-""".format(name, _type.upper(), labels[end_state])
+""".format(name, self._token_type(name, _type), labels[end_state])
                 else:
                     cases += """\
       goto {0};
@@ -223,39 +258,281 @@ unsigned long column({0}_token_t *{0}_token) {{ return {0}_token->column; }}
             # error is returned which means 1 of 2 possibilities: unrecognized or invalid input.
             program += """\
 {0}:
-  if(feof({1}_scanner->input)) {{ return {1}_EOF; }}
-
-  switch({1}_peek({1}_scanner)) {{
+  switch((peek = {1}_peek({1}_scanner))) {{
 {2}    default:
-      if({1}_scanner->last_final_pos) {{
-        fprintf(stdout, "TYPE: %d @%ld\\n", {1}_scanner->last_final_type, {1}_scanner->last_final_pos);
+      if({1}_scanner->last_final_pos >= 0) {{
+        {1}_seek({1}_scanner, {1}_scanner->last_final_pos);
         return {1}_read_token({1}_scanner, {1}_scanner->last_final_type);
       }}
-      return {1}_INVALID_INPUT;
+      return {1}_reject({1}_scanner, peek);
   }}
 
 """.format(labels[in_state], name, cases)
 
         return program
 
-    # NOTE:
-    # - switch to internal buffer, allowing for pipes.
-        # -> more scanner state and a buffer API?
-        # - NFA to be updated with types in final state for uniqueness when ->dfa->hopcroft??
-        #   - cannot be done. example is most langs do relop -> < | > | <= | >= ...
+    @staticmethod
+    def _array(ctype, name, values):
+        """
+        Encode the values as a static c array of the given type.
+        """
+        lines, line = [], []
+        for value in values:
+            line.append(str(value))
+            if len(line) == 16:
+                lines.append('  ' + ', '.join(line))
+                line = []
+        if line:
+            lines.append('  ' + ', '.join(line))
+        return """\
+static const {0} {1}[{2}] = {{
+{3}
+}};
+
+""".format(ctype, name, len(values), ',\n'.join(lines))
+
+    def _encode_table(self, name):
+        """
+        Encode the DFA as comb vector (row displacement) compressed tables
+        driven by a small loop, reporting the compressed and dense sizes.
+        """
+        table = self.scanner.table
+        base, _next, check, default = self._comb(table)
+
+        # NOTE: characters read are bytes; anything else is not recognized.
+        classes = [table.classes for _ in range(256)]
+        for code in range(256):
+            symbol = table.symbol(chr(code))
+            if symbol >= 0:
+                classes[code] = symbol
+
+        ctypes = {
+            'classes': self._ctype(classes),
+            'base': self._ctype(base),
+            'next': self._ctype(_next + default + [table.sink]),
+            'check': self._ctype(check),
+            'accept': self._ctype(list(table.accepts)),
+        }
+
+        dense = table.states * table.classes * ctypes['next'][1]
+        compressed = len(base) * ctypes['base'][1] + \
+                     len(_next) * ctypes['next'][1] + \
+                     len(check) * ctypes['check'][1] + \
+                     len(default) * ctypes['next'][1]
+        self._sizes = (compressed, dense)
+
+        tables = """\
+// Comb vector (row displacement) encoded transition table. The next state of
+// state s on character c is found by:
+//   i = base[s] + classes[c];
+//   check[i] == s ? next[i] : default[s]
+// Compressed: {1} bytes ({2} entries); dense: {3} bytes ({4} states x {5} classes).
+#define {0}_START {6}
+#define {0}_SINK {7}
+#define {0}_NO_CLASS {5}
+
+""".format(name, compressed, len(_next), dense, table.states, table.classes,
+           table.start, table.sink)
+        tables += self._array(ctypes['classes'][0], name+'_classes', classes)
+        tables += self._array(ctypes['base'][0], name+'_base', base)
+        tables += self._array(ctypes['next'][0], name+'_next', _next)
+        tables += self._array(ctypes['check'][0], name+'_check', check)
+        tables += self._array(ctypes['next'][0], name+'_default', default)
+        tables += self._array(ctypes['accept'][0], name+'_accept', list(table.accepts))
+
+        if self.tabulate:
+            tables += self._encode_failures(name, table.states)
+            return tables, self._encode_tabulating(name)
+
+        program = """\
+  int state = {0}_START, peek = 0, symbol, idx;
+
+  {0}_scanner->last_final_pos = -1;
+  for(;;) {{
+    if((peek = {0}_peek({0}_scanner)) == EOF) {{ break; }}
+    if((symbol = {0}_classes[peek]) == {0}_NO_CLASS) {{ break; }}
+    idx = {0}_base[state] + symbol;
+    state = {0}_check[idx] == state ? {0}_next[idx] : {0}_default[state];
+    if(state == {0}_SINK) {{ break; }}
+    if({0}_accept[state] >= 0) {{
+      {0}_scanner->last_final_pos = {0}_tell({0}_scanner);
+      {0}_scanner->last_final_type = ({0}_token_type_t){0}_accept[state];
+    }}
+  }}
+
+  // NOTE: Revert to the last final state seen, implementing maximal munch.
+  if({0}_scanner->last_final_pos >= 0) {{
+    {0}_seek({0}_scanner, {0}_scanner->last_final_pos);
+    return {0}_read_token({0}_scanner, {0}_scanner->last_final_type);
+  }}
+  return {0}_reject({0}_scanner, peek);
+""".format(name)
+
+        return tables, program
+
+    @staticmethod
+    def _encode_failures(name, states):
+        """
+        Encode the bookkeeping for tabulating maximal munch: a bitmap of the
+        (state, position) pairs known to fail, holding a row of bits per
+        position from the start of the current token onward.
+        """
+        return """\
+// Tabulating maximal munch (Reps) records the (state, position) pairs known to
+// fail. Positions before the current token are never revisited, so only rows
+// from the start of the current token (failed_base) onward are kept.
+#define {0}_ROW_BYTES {1}
+
+static int {0}_failed({0}_scanner_t *{0}_scanner, int state, long pos) {{
+  unsigned long row = (unsigned long)(pos - {0}_scanner->failed_base);
+  if(row >= {0}_scanner->failed_rows) {{ return 0; }}
+  return ({0}_scanner->failed[row*{0}_ROW_BYTES + state/8] >> (state%8)) & 1;
+}}
+
+static int {0}_fail({0}_scanner_t *{0}_scanner, int state, long pos) {{
+  unsigned long row = (unsigned long)(pos - {0}_scanner->failed_base), rows;
+  unsigned char *failed;
+  if(row >= {0}_scanner->failed_rows) {{
+    rows = 2*row + 1;
+    if(!(failed = realloc({0}_scanner->failed, rows*{0}_ROW_BYTES))) {{ return 0; }}
+    memset(failed + {0}_scanner->failed_rows*{0}_ROW_BYTES, 0,
+           (rows - {0}_scanner->failed_rows)*{0}_ROW_BYTES);
+    {0}_scanner->failed = failed;
+    {0}_scanner->failed_rows = rows;
+  }}
+  {0}_scanner->failed[row*{0}_ROW_BYTES + state/8] |= (unsigned char)(1 << (state%8));
+  return 1;
+}}
+
+static void {0}_slide({0}_scanner_t *{0}_scanner, long pos) {{
+  unsigned long rows = {0}_scanner->failed_rows;
+  unsigned long row = (unsigned long)(pos - {0}_scanner->failed_base);
+  if(row == 0) {{ return; }}
+  if(row < rows) {{
+    memmove({0}_scanner->failed, {0}_scanner->failed + row*{0}_ROW_BYTES,
+            (rows - row)*{0}_ROW_BYTES);
+    memset({0}_scanner->failed + (rows - row)*{0}_ROW_BYTES, 0, row*{0}_ROW_BYTES);
+  }} else if(rows) {{
+    memset({0}_scanner->failed, 0, rows*{0}_ROW_BYTES);
+  }}
+  {0}_scanner->failed_base = pos;
+}}
+
+""".format(name, (states + 7) // 8)
+
+    @staticmethod
+    def _encode_tabulating(name):
+        """
+        Encode Reps' tabulating maximal munch over the comb vector tables.
+        Every (state, position) pair passed after the last final state fails
+        to lead to a longer match, so it is recorded and the scan stops early
+        should it be reached again, keeping tokenization linear time.
+        """
+        return """\
+  int state = {0}_START, peek = 0, symbol, idx, *trail;
+  long pos = {0}_scanner->offset, trail_pos = pos;
+  unsigned long length = 0, mark;
+
+  {0}_slide({0}_scanner, pos);
+  {0}_scanner->last_final_pos = -1;
+  for(;;) {{
+    if({0}_failed({0}_scanner, state, pos)) {{ break; }}
+    if(pos > {0}_scanner->offset && {0}_accept[state] >= 0) {{
+      {0}_scanner->last_final_pos = pos;
+      {0}_scanner->last_final_type = ({0}_token_type_t){0}_accept[state];
+      length = 0;
+      trail_pos = pos;
+    }}
+    if(length == {0}_scanner->trail_length) {{
+      if(!(trail = realloc({0}_scanner->trail, sizeof(int)*(2*length + 1)))) {{
+        return {0}_OUT_OF_MEMORY;
+      }}
+      {0}_scanner->trail = trail;
+      {0}_scanner->trail_length = 2*length + 1;
+    }}
+    {0}_scanner->trail[length++] = state;
+    if((peek = {0}_peek({0}_scanner)) == EOF) {{ break; }}
+    if((symbol = {0}_classes[peek]) == {0}_NO_CLASS) {{ break; }}
+    idx = {0}_base[state] + symbol;
+    state = {0}_check[idx] == state ? {0}_next[idx] : {0}_default[state];
+    pos++;
+    if(state == {0}_SINK) {{ break; }}
+  }}
+
+  // NOTE: Everything passed since the last final state (the first entry, if
+  // any) is known to fail.
+  for(mark = {0}_scanner->last_final_pos >= 0 ? 1 : 0; mark < length; mark++) {{
+    if(!{0}_fail({0}_scanner, {0}_scanner->trail[mark], trail_pos + (long)mark)) {{
+      return {0}_OUT_OF_MEMORY;
+    }}
+  }}
+
+  // NOTE: Revert to the last final state seen, implementing maximal munch.
+  if({0}_scanner->last_final_pos >= 0) {{
+    {0}_seek({0}_scanner, {0}_scanner->last_final_pos);
+    return {0}_read_token({0}_scanner, {0}_scanner->last_final_type);
+  }}
+  return {0}_reject({0}_scanner, peek);
+""".format(name)
+
     def _generate_scanner_api(self, name):
+        if self.encoding == 'table':
+            tables, program = self._encode_table(name)
+        else:
+            tables, program = "", self._encode_dfa(name)
+        fields, frees = "", ""
+        if self.tabulate:
+            fields = """\
+  unsigned char *failed;
+  long int failed_base;
+  unsigned long failed_rows;
+  int *trail;
+  unsigned long trail_length;
+"""
+            frees = """\
+  free({0}_scanner->failed);
+  free({0}_scanner->trail);
+""".format(name)
         return """\
 {1}
 // Abstract over the reading of {0}_token_t's.
 typedef struct {0}_scanner {0}_scanner_t;
 
-// Attempt the creation of a new scanner given the path to a file.
+// Attempt the creation of a new scanner given the path to a file. The file is
+// read in blocks as scanning proceeds, so it may also be a pipe.
 {0}_scanner_t *new_{0}_scanner(char *fpath);
 
-// Free the scanner and close the associated file.
+// Attempt the creation of a new scanner over a memory mapped (regular) file.
+// The file is scanned in place, without copying.
+{0}_scanner_t *new_{0}_scanner_mmap(const char *path);
+
+// Attempt the creation of a new scanner over len bytes of the buffer buf. The
+// buffer is scanned in place, without copying, so it must outlive the scanner.
+{0}_scanner_t *new_{0}_scanner_buffer(const char *buf, size_t len);
+
+// Free the scanner and close or unmap any associated file.
 void free_{0}_scanner({0}_scanner_t *{0}_scanner);
 
-// Return most recently read token of the given scanner.
+// A token as a view into the scanner's input. Views are read without any
+// allocation or copying and are only valid until the next scan.
+typedef struct {0}_token_view {{
+  {0}_token_type_t type;   // the token's type.
+  long int offset;          // position of the lexeme in the input.
+  unsigned long length;     // length of the lexeme in bytes.
+  unsigned long line;       // starting line of the lexeme, from 1.
+  unsigned long column;     // starting column of the lexeme, from 1.
+}} {0}_token_view_t;
+
+// Return a view of the most recently read token of the given scanner.
+const {0}_token_view_t *{0}_view({0}_scanner_t *{0}_scanner);
+
+// Return the text of the most recently read token of the given scanner, in
+// place within the input. It is not NUL terminated; its length is the view's.
+const char *{0}_text({0}_scanner_t *{0}_scanner);
+
+// Return a copy of the most recently read token of the given scanner, owned by
+// the caller and freed with free_{0}_token. NULL if no token has been read or
+// memory could not be allocated.
 {0}_token_t *{0}_token({0}_scanner_t *{0}_scanner);
 
 // Errors associated with scanning.
@@ -267,106 +544,244 @@ typedef enum {{
   {0}_UNKNOWN_ERROR,       // error not known.
 }} {0}_scan_error_t;
 
-// Attempt to scan a token from the file. 1 if successful, otherwise 0.
-// If failure occurs the token will still contain the relevant details of the
-// unrecognized token except for its type.
+// Attempt to scan a token from the input. {0}_NIL if successful, after which
+// the token is available as a view (or owned copy), otherwise the error.
 {0}_scan_error_t {0}_scan({0}_scanner_t *{0}_scanner);
 """.format(name, self._generate_section_header("scanner")), """\
 {2}
+// Input is read with read(2) in large blocks into a buffer holding everything
+// from the start of the current token onward, unless the whole input is given
+// up front (memory mapped or caller owned) in which case it is scanned in
+// place. Backtracking just moves the cursor and lexemes are taken in place.
+#define {0}_BLOCK_SIZE 65536
+
 typedef struct {0}_scanner {{
-  FILE *input;
-  int peek;
+  int fd;
+  int eof;
+  int borrowed;
+  size_t mapped;
+  {0}_scan_error_t error;
+  char *buffer;
+  unsigned long capacity;
+  unsigned long cursor;
+  unsigned long end;
+  long int base;
   long int offset;
-  char *text;
   char *source;
-  unsigned int length;
-  unsigned int line;
-  unsigned int column;
-  {0}_token_t *token;
+  unsigned long line;
+  unsigned long column;
+  {0}_token_view_t view;
   long int last_final_pos;
   {0}_token_type_t last_final_type;
-}} {0}_scanner_t;
+{4}}} {0}_scanner_t;
 
 {0}_scanner_t *new_{0}_scanner(char *fpath) {{
-  FILE *f = fopen(fpath, "r");
-  if(!f) {{ return NULL; }}
-
   {0}_scanner_t *{0}_scanner;
-  if(!({0}_scanner = calloc(1, sizeof({0}_scanner_t))) &&
-      ({0}_scanner->token = malloc(sizeof({0}_token_t)))) {{
-    free({0}_scanner->token);
+  int fd;
+
+  if((fd = open(fpath, O_RDONLY)) < 0) {{ return NULL; }}
+
+  if(!({0}_scanner = calloc(1, sizeof({0}_scanner_t)))) {{
+    close(fd);
+    return NULL;
+  }}
+
+  if(!({0}_scanner->buffer = malloc(sizeof(char)*{0}_BLOCK_SIZE))) {{
     free({0}_scanner);
+    close(fd);
     return NULL;
   }}
 
-  {0}_scanner->input = f;
-  //{0}_scanner->peek = fgetc(f);
-  {0}_scanner->offset = 0;
-  {0}_scanner->text = NULL;
+  {0}_scanner->fd = fd;
+  {0}_scanner->capacity = {0}_BLOCK_SIZE;
   {0}_scanner->source = fpath;
-  {0}_scanner->length = 0;
-  {0}_scanner->line = 0;
-  {0}_scanner->column = 0;
+  {0}_scanner->line = 1;
+  {0}_scanner->column = 1;
+  {0}_scanner->last_final_pos = -1;
+
+  return {0}_scanner;
+}}
+
+static {0}_scanner_t *{0}_scanner_whole(const char *buf, size_t len, char *source) {{
+  {0}_scanner_t *{0}_scanner;
+
+  if(!({0}_scanner = calloc(1, sizeof({0}_scanner_t)))) {{ return NULL; }}
+
+  {0}_scanner->fd = -1;
+  {0}_scanner->eof = 1;
+  {0}_scanner->borrowed = 1;
+  {0}_scanner->buffer = (char *)buf;
+  {0}_scanner->capacity = len;
+  {0}_scanner->end = len;
+  {0}_scanner->source = source;
+  {0}_scanner->line = 1;
+  {0}_scanner->column = 1;
   {0}_scanner->last_final_pos = -1;
-  //{0}_scanner->last_final_type = 0;
 
   return {0}_scanner;
 }}
 
+{0}_scanner_t *new_{0}_scanner_mmap(const char *path) {{
+  {0}_scanner_t *{0}_scanner;
+  struct stat info;
+  void *map = NULL;
+  size_t len;
+  int fd;
+
+  if((fd = open(path, O_RDONLY)) < 0) {{ return NULL; }}
+
+  if(fstat(fd, &info) < 0 || !S_ISREG(info.st_mode)) {{
+    close(fd);
+    return NULL;
+  }}
+
+  // NOTE: Empty files cannot be mapped, but need not be.
+  if((len = (size_t)info.st_size) > 0 &&
+     (map = mmap(NULL, len, PROT_READ, MAP_PRIVATE, fd, 0)) == MAP_FAILED) {{
+    close(fd);
+    return NULL;
+  }}
+  close(fd);
+
+  if(!({0}_scanner = {0}_scanner_whole(map, len, (char *)path))) {{
+    if(map) {{ munmap(map, len); }}
+    return NULL;
+  }}
+  {0}_scanner->mapped = len;
+
+  return {0}_scanner;
+}}
+
+{0}_scanner_t *new_{0}_scanner_buffer(const char *buf, size_t len) {{
+  return {0}_scanner_whole(buf, len, "");
+}}
+
 void free_{0}_scanner({0}_scanner_t *{0}_scanner) {{
-  fclose({0}_scanner->input);
-  free({0}_scanner->text);
-  free({0}_scanner->token);
+  if({0}_scanner->fd >= 0) {{ close({0}_scanner->fd); }}
+  if({0}_scanner->mapped) {{ munmap({0}_scanner->buffer, {0}_scanner->mapped); }}
+{5}  if(!{0}_scanner->borrowed) {{ free({0}_scanner->buffer); }}
   free({0}_scanner);
 }}
 
+const {0}_token_view_t *{0}_view({0}_scanner_t *{0}_scanner) {{
+  return &{0}_scanner->view;
+}}
+
+const char *{0}_text({0}_scanner_t *{0}_scanner) {{
+  return {0}_scanner->buffer + ({0}_scanner->view.offset - {0}_scanner->base);
+}}
+
 {0}_token_t *{0}_token({0}_scanner_t *{0}_scanner) {{
-  return {0}_scanner->token;
+  if(!{0}_scanner->view.line) {{ return NULL; }}
+  return new_{0}_token({0}_scanner->view.type,
+                       (char *){0}_text({0}_scanner),
+                       {0}_scanner->view.length,
+                       {0}_scanner->source,
+                       strlen({0}_scanner->source),
+                       {0}_scanner->view.line,
+                       {0}_scanner->view.column);
 }}
 
-int {0}_peek({0}_scanner_t *{0}_scanner) {{
-  {0}_scanner->peek = fgetc({0}_scanner->input);
-  {0}_scanner->column++;
-  if({0}_scanner->peek == '\\n') {{
-    {0}_scanner->line++;
-    {0}_scanner->column = 0;
+// Read the next block of input, first sliding the current token to the front
+// of the buffer and growing the buffer should the token fill it. 1 if more
+// input was read, otherwise 0.
+static int {0}_refill({0}_scanner_t *{0}_scanner) {{
+  unsigned long keep = (unsigned long)({0}_scanner->offset - {0}_scanner->base);
+  unsigned long capacity;
+  char *buffer;
+  ssize_t count;
+
+  if({0}_scanner->eof) {{ return 0; }}
+
+  if(keep > 0) {{
+    memmove({0}_scanner->buffer, {0}_scanner->buffer + keep, {0}_scanner->end - keep);
+    {0}_scanner->base += (long int)keep;
+    {0}_scanner->cursor -= keep;
+    {0}_scanner->end -= keep;
   }}
-  return {0}_scanner->peek;
-}}
 
-{0}_scan_error_t {0}_read_token({0}_scanner_t *{0}_scanner,
-                                {0}_token_type_t {0}_type) {{
-  {0}_scanner->length = ftell({0}_scanner->input) - {0}_scanner->offset;
+  if({0}_scanner->capacity - {0}_scanner->end < {0}_BLOCK_SIZE/4) {{
+    capacity = 2*{0}_scanner->capacity;
+    if(!(buffer = realloc({0}_scanner->buffer, sizeof(char)*capacity))) {{
+      {0}_scanner->error = {0}_OUT_OF_MEMORY;
+      {0}_scanner->eof = 1;
+      return 0;
+    }}
+    {0}_scanner->buffer = buffer;
+    {0}_scanner->capacity = capacity;
+  }}
 
-  {0}_scanner->text = realloc({0}_scanner->text, sizeof(char)*{0}_scanner->length);
-  if(!{0}_scanner->text) {{ return {0}_OUT_OF_MEMORY; }}
+  do {{
+    count = read({0}_scanner->fd, {0}_scanner->buffer + {0}_scanner->end,
+                 {0}_scanner->capacity - {0}_scanner->end);
+  }} while(count < 0 && errno == EINTR);
 
-  fseek({0}_scanner->input, {0}_scanner->offset, SEEK_SET);
-  if(fread({0}_scanner->text,
-           sizeof(char),
-           sizeof(char)*{0}_scanner->length,
-           {0}_scanner->input) != sizeof(char)*{0}_scanner->length) {{
-    return {0}_UNKNOWN_ERROR;
+  if(count <= 0) {{
+    if(count < 0) {{ {0}_scanner->error = {0}_UNKNOWN_ERROR; }}
+    {0}_scanner->eof = 1;
+    return 0;
   }}
 
-  if(!({0}_scanner->token = new_{0}_token({0}_type,
-                                          {0}_scanner->text,
-                                          {0}_scanner->length,
-                                          {0}_scanner->source,
-                                          0,
-                                          {0}_scanner->line,
-                                          {0}_scanner->column))) {{
-    return {0}_OUT_OF_MEMORY;
+  {0}_scanner->end += (unsigned long)count;
+  return 1;
+}}
+
+int {0}_peek({0}_scanner_t *{0}_scanner) {{
+  for(;;) {{
+    if({0}_scanner->cursor < {0}_scanner->end) {{
+      return (unsigned char){0}_scanner->buffer[{0}_scanner->cursor++];
+    }}
+    if(!{0}_refill({0}_scanner)) {{ return EOF; }}
+  }}
+}}
+
+static long int {0}_tell({0}_scanner_t *{0}_scanner) {{
+  return {0}_scanner->base + (long int){0}_scanner->cursor;
+}}
+
+static void {0}_seek({0}_scanner_t *{0}_scanner, long int pos) {{
+  {0}_scanner->cursor = (unsigned long)(pos - {0}_scanner->base);
+}}
+
+{0}_scan_error_t {0}_read_token({0}_scanner_t *{0}_scanner,
+                                {0}_token_type_t {0}_type) {{
+  const char *text;
+  unsigned long idx;
+
+  if({0}_scanner->error) {{ return {0}_scanner->error; }}
+
+  {0}_scanner->view.type = {0}_type;
+  {0}_scanner->view.offset = {0}_scanner->offset;
+  {0}_scanner->view.length = (unsigned long)({0}_tell({0}_scanner) - {0}_scanner->offset);
+  {0}_scanner->view.line = {0}_scanner->line;
+  {0}_scanner->view.column = {0}_scanner->column;
+
+  text = {0}_text({0}_scanner);
+  for(idx = 0; idx < {0}_scanner->view.length; idx++) {{
+    if(text[idx] == '\\n') {{
+      {0}_scanner->line++;
+      {0}_scanner->column = 1;
+    }} else {{
+      {0}_scanner->column++;
+    }}
   }}
 
   return {0}_NIL;
 }}
 
-{0}_scan_error_t {0}_scan({0}_scanner_t *{0}_scanner) {{
-  {0}_scanner->offset = ftell({0}_scanner->input);
+// Report why no token could be read: a failure to read input, the end of the
+// input or input not recognized.
+static {0}_scan_error_t {0}_reject({0}_scanner_t *{0}_scanner, int peek) {{
+  if({0}_scanner->error) {{ return {0}_scanner->error; }}
+  if(peek == EOF && {0}_tell({0}_scanner) == {0}_scanner->offset) {{ return {0}_EOF; }}
+  return {0}_INVALID_INPUT;
+}}
+
+{3}{0}_scan_error_t {0}_scan({0}_scanner_t *{0}_scanner) {{
+  {0}_scanner->offset = {0}_tell({0}_scanner);
 
 {1}}}
-""".format(name, self._encode_dfa(name), self._generate_section_header("scanner"))
+""".format(name, program, self._generate_section_header("scanner"), tables, fields, frees)
 
     def _generate_ast_api(self, name):
         # NOTE: define AST prototypes and defs
@@ -376,30 +791,236 @@ int {0}_peek({0}_scanner_t *{0}_scanner) {{
         return ast_header, ast_source
 
     def _encode_bnf(self, name):
-        # NOTE: graph encoded as GOTOs;
-        # automatically throw away tokens not in the bnf (whitespace, comments, etc)
-        _ = name
-        _ = self
-        return ""
-        #production_rules = ""
-        #for nonterm, rule in self._parser.rules():
-        #    production_rules += "// {0: <30} ::= {1}\n".format(nonterm, " ".join(rule))
-        # """\
-        # // Start production ::= {2}
-        #
-        # {3}
-        #
-        # // Attempt to parse into an AST of tokens. 1 if successful, otherwise 0.
-        # int {0}(FILE *f);
-        # """.format(parse_func, self._generate_section_header("::BNF GRAMMMAR::"),
-        #            self._parser.start(), production_rules)
+        """
+        Encode the LL(1) parse table and production rules as compact arrays:
+        the table holds a rule per nonterminal x terminal (-1 for errors) and
+        the right hand sides of all rules are flattened into a single array,
+        delimited by the offsets of each rule.
+        """
+        table = self.parser.parse_table
+        rows, cols = table.rows, table.cols
+        terminals = len(cols)
+        end = cols[self.parser.end_of_input()]
+
+        for row, col in table.conflicts:
+            nonterminal = next(symbol for symbol in rows if rows[symbol] == row)
+            terminal = next(symbol for symbol in cols if cols[symbol] == col)
+            raise ValueError('parser must be LL(1): conflict on {0} x {1}'
+                             .format(nonterminal, terminal))
+        cells = list(table.cells)
+
+        offsets, rhs = [0], []
+        for _, production in self.parser.rules:
+            for symbol in production:
+                if symbol == self.parser.epsilon():
+                    continue
+                rhs.append(cols[symbol] if symbol in cols else terminals + rows[symbol])
+            offsets.append(len(rhs))
+
+        start = terminals + rows[self.parser.start]
+        symbols = self._ctype(rhs + [start, end])
+
+        tables = """\
+// LL(1) parse table, indexed by nonterminal x terminal, holding the rule to
+// apply (-1 if none). Symbols numbered below {0}_TERMINALS are terminals and
+// the rest nonterminals. The right hand side of rule r is
+//   rhs[offsets[r]] ... rhs[offsets[r+1]-1]
+#define {0}_TERMINALS {1}
+#define {0}_START_SYMBOL {2}
+
+typedef {3} {0}_symbol_t;
+
+""".format(name, terminals, start, symbols[0])
+        tables += self._array(self._ctype(cells)[0], name+'_table', cells)
+        tables += self._array(self._ctype(offsets)[0], name+'_offsets', offsets)
+        tables += self._array(symbols[0], name+'_rhs', rhs or [0])
+        return tables
 
     def _generate_parser_api(self, name):
-        # NOTE: define parser prototypes and defs
-        parser_header, parser_source = "", """\
-        {0} {1} {2}
-        """.format(name, self._encode_bnf(name), self._generate_section_header("parser"))
-        return parser_header, parser_source
+        terminals = sorted(self.parser.parse_table.cols.items(), key=lambda item: item[1])
+        types, constants = [], set()
+        for terminal, col in terminals:
+            if terminal == self.parser.end_of_input():
+                types.append('  {0: <23} // end of input'.format(name+'_END_OF_INPUT = '+str(col)+','))
+                continue
+            # NOTE: Distinct terminals may sanatize the same (e.g. ':' and '=').
+            constant = self._sanatize('{0}_T_{1}'.format(name, terminal.upper()))
+            if constant in constants:
+                constant += '_{0}'.format(col)
+            constants.add(constant)
+            types.append('  {0: <23} // {1}'.format(constant+' = '+str(col)+',', terminal))
+
+        rules = []
+        for idx, (nonterminal, production) in enumerate(self.parser.rules):
+            production = [symbol for symbol in production if symbol != self.parser.epsilon()]
+            rules.append('//  {0: >3}: {1} ::= {2}'.format(
+                idx, nonterminal, ' '.join(production) if production else '(epsilon)'))
+
+        if self.scanner is not None:
+            scan_func = self._sanatize(self.scanner.name)
+            params = '{0}_scanner_t *{0}_scanner'.format(scan_func)
+            read = '{0}_read({1}_scanner)'.format(name, scan_func)
+            doc = """\
+// Attempt to parse all of the scanner's input. Tokens are read as needed and
+// those of the ignored types (e.g. whitespace) are skipped, while any other
+// type not in the grammar is a syntax error. Upon a syntax error the scanner's
+// view holds the unexpected token."""
+            cols = self.parser.parse_table.cols
+            columns = [-2 if token in self.ignore else cols.get(token, -3)
+                       for token in self.scanner.expressions]
+            reader = """\
+// The terminal of each scanner type, {0}_IGNORED if it is skipped, otherwise
+// {0}_UNEXPECTED.
+#define {0}_IGNORED -2
+#define {0}_UNEXPECTED -3
+
+""".format(name) + self._array(self._ctype(columns)[0], name+'_columns', columns) + """\
+// Read the next token which is not ignored. The column of the token,
+// {0}_END_OF_INPUT at the end of the input, {0}_UNEXPECTED if its type is not
+// in the grammar, otherwise -1.
+static int {0}_read({1}_scanner_t *{1}_scanner) {{
+  {1}_scan_error_t error;
+  int terminal;
+
+  do {{
+    if((error = {1}_scan({1}_scanner)) != {1}_NIL) {{
+      return error == {1}_EOF ? {0}_END_OF_INPUT : -1;
+    }}
+  }} while((terminal = {0}_columns[{1}_view({1}_scanner)->type]) == {0}_IGNORED);
+
+  return terminal;
+}}
+
+""".format(name, scan_func)
+            supplier = ""
+        else:
+            params = '{0}_next_t next, void *source'.format(name)
+            read = 'next(source)'
+            doc = """\
+// Attempt to parse all of the terminals supplied by next, given source."""
+            reader = ""
+            supplier = """\
+// Supplies the next terminal of the input from source: {0}_END_OF_INPUT at
+// the end of the input, -1 if it could not be read, or any other negative
+// value if it is not a terminal of the grammar.
+typedef int (*{0}_next_t)(void *source);
+
+""".format(name)
+
+        return """\
+{1}
+// Terminals of the grammar, numbered as the columns of the parse table.
+typedef enum {{
+{2}
+}} {0}_terminal_t;
+
+// Production rules of the grammar, numbered as reported to actions.
+{3}
+
+// Abstract over the parsing of terminals, reusing its stack across parses.
+typedef struct {0}_parser {0}_parser_t;
+
+// Attempt the creation of a new parser.
+{0}_parser_t *new_{0}_parser(void);
+
+// Free the parser.
+void free_{0}_parser({0}_parser_t *{0}_parser);
+
+// Reports the leftmost derivation as the parse proceeds: rule is the number of
+// the production applied, or -1 once the current terminal is matched.
+typedef void (*{0}_action_t)(void *context, int rule);
+
+// Errors associated with parsing.
+typedef enum {{
+  {0}_ACCEPT,              // input parsed successfully.
+  {0}_SYNTAX_ERROR,        // input not derivable by the grammar.
+  {0}_READ_ERROR,          // failed to read a terminal.
+  {0}_PARSE_OUT_OF_MEMORY, // failed to allocate memory.
+}} {0}_parse_error_t;
+
+{4}{5}
+// Parsing is iterative, so deeply nested input never overflows the C stack.
+// action (if not NULL) is called with the given context.
+{0}_parse_error_t {0}_parse({0}_parser_t *{0}_parser,
+{7}{6},
+{7}{0}_action_t action,
+{7}void *context);
+
+""".format(name, self._generate_section_header("parser"), '\n'.join(types),
+           '\n'.join(rules), supplier, doc, params, ' '*(len(name)+26)), """\
+{1}
+{2}typedef struct {0}_parser {{
+  {0}_symbol_t *stack;
+  unsigned long capacity;
+}} {0}_parser_t;
+
+{0}_parser_t *new_{0}_parser(void) {{
+  {0}_parser_t *{0}_parser;
+
+  if(!({0}_parser = malloc(sizeof({0}_parser_t)))) {{ return NULL; }}
+
+  {0}_parser->capacity = 64;
+  if(!({0}_parser->stack = malloc(sizeof({0}_symbol_t)*{0}_parser->capacity))) {{
+    free({0}_parser);
+    return NULL;
+  }}
+
+  return {0}_parser;
+}}
+
+void free_{0}_parser({0}_parser_t *{0}_parser) {{
+  free({0}_parser->stack);
+  free({0}_parser);
+}}
+
+{3}{0}_parse_error_t {0}_parse({0}_parser_t *{0}_parser,
+{6}{4},
+{6}{0}_action_t action,
+{6}void *context) {{
+  {0}_symbol_t *stack = {0}_parser->stack, top;
+  unsigned long length = 0, capacity = {0}_parser->capacity, idx;
+  int terminal, rule, size;
+
+  stack[length++] = {0}_END_OF_INPUT;
+  stack[length++] = {0}_START_SYMBOL;
+  if((terminal = {5}) < 0) {{ return terminal == -1 ? {0}_READ_ERROR : {0}_SYNTAX_ERROR; }}
+
+  while(length) {{
+    top = stack[--length];
+
+    if(top < {0}_TERMINALS) {{
+      if(top != terminal) {{ return {0}_SYNTAX_ERROR; }}
+      if(top == {0}_END_OF_INPUT) {{ return {0}_ACCEPT; }}
+      if(action) {{ action(context, -1); }}
+      if((terminal = {5}) < 0) {{ return terminal == -1 ? {0}_READ_ERROR : {0}_SYNTAX_ERROR; }}
+      continue;
+    }}
+
+    if((rule = {0}_table[(top - {0}_TERMINALS)*{0}_TERMINALS + terminal]) < 0) {{
+      return {0}_SYNTAX_ERROR;
+    }}
+    if(action) {{ action(context, rule); }}
+
+    size = {0}_offsets[rule+1] - {0}_offsets[rule];
+    if(capacity - length < (unsigned long)size) {{
+      capacity = 2*capacity + (unsigned long)size;
+      if(!(stack = realloc(stack, sizeof({0}_symbol_t)*capacity))) {{
+        return {0}_PARSE_OUT_OF_MEMORY;
+      }}
+      {0}_parser->stack = stack;
+      {0}_parser->capacity = capacity;
+    }}
+
+    // NOTE: Push the right hand side in reverse, leaving its first symbol on top.
+    for(idx = {0}_offsets[rule+1]; idx > (unsigned long){0}_offsets[rule]; idx--) {{
+      stack[length++] = {0}_rhs[idx-1];
+    }}
+  }}
+
+  return {0}_SYNTAX_ERROR;
+}}
+""".format(name, self._generate_section_header("parser"), self._encode_bnf(name), reader,
+           params, read, ' '*(len(name)+26))
 
     def _translate(self):
         """Override the superclass method to generate source code.
@@ -423,7 +1044,7 @@ int {0}_peek({0}_scanner_t *{0}_scanner) {{
                                             warning,
                                             libs)
 
-        libs.extend(["stdlib", "string", filename])
+        libs.extend(["stdlib", "string", "errno", "fcntl", "unistd", "sys/mman", "sys/stat", filename])
         source = self._generate_file_header(filename+".c",
                                             author,
                                             source,
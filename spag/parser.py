@@ -4,9 +4,13 @@ The ContextFreeGrammar object represents a BNF (Backus-[Naur/Normal] Form)
 grammar which is programmatically transformed into a parse table. This is done
 by utilizing the grammars first and follow sets, which are computed internally,
 and applying that information to properly construct the resulting parse table.
+The grammar can also be transformed into LALR(1) action and goto tables, built
+upon request from its LR(0) automaton.
 """
-from copy import deepcopy
+from array import array
 from enum import Enum, unique
+from types import MappingProxyType
+from spag.cache import Cache
 
 
 @unique
@@ -21,6 +25,224 @@ class _ContextFreeGrammarOperators(Enum):
     EPSILON = 1       # e
 
 
+class ParseTable(bytes):
+    """The ParseTable is a compact, immutable encoding of an LL(1) parse table.
+
+    ParseTable stores the rule to apply for each nonterminal and terminal as a
+    flat buffer of fixed width (native byte order) signed integers in row-major
+    nonterminal x terminal order, with -1 for errors. Cells in conflict (the
+    grammar not being LL(1)) hold their lowest rule, while all of their rules
+    are kept in a small side mapping. Being bytes, the table supports the
+    buffer protocol and can be handed to generators and runtimes as is.
+    """
+
+    def __new__(cls, cells, rows, cols, conflicts):
+        """Construct a ParseTable from the given (flattened) table.
+
+        Args:
+          cells (list[int]): the rule of every nonterminal and terminal pair, in
+              row-major order, or -1 if there is none.
+          rows (dict[str, int]): row (nonterminal) symbol to table index.
+          cols (dict[str, int]): column (terminal) symbol to table index.
+          conflicts (dict[tuple[int, int], set[int]]): every rule of the cells
+              (row, column) with more than one.
+
+        Return:
+          ParseTable: the compact table.
+        """
+        typecode = 'h' if max(cells, default=0) < 1 << 15 else 'i'
+        table = super().__new__(cls, array(typecode, cells).tobytes())
+        table._typecode = typecode
+        table._cells = memoryview(table).cast(typecode)
+        table._rows = MappingProxyType(dict(rows))
+        table._cols = MappingProxyType(dict(cols))
+        table._conflicts = MappingProxyType({cell: frozenset(rules)
+                                             for cell, rules in conflicts.items()})
+        return table
+
+    def __reduce__(self):
+        """Rebuild the table from plain data when pickled or copied."""
+        return (self.__class__, (self._cells.tolist(), dict(self._rows), dict(self._cols),
+                                 {cell: set(rules) for cell, rules in self._conflicts.items()}))
+
+    def _fields(self):
+        """Every field identifying the table, for comparison and hashing."""
+        return (self._typecode, bytes(self), frozenset(self._rows.items()),
+                frozenset(self._cols.items()), frozenset(self._conflicts.items()))
+
+    def __eq__(self, other):
+        if not isinstance(other, ParseTable):
+            return False
+        return self._fields() == other._fields()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    @property
+    def typecode(self):
+        """The array typecode of the cells; 'h' or 'i'."""
+        return self._typecode
+
+    @property
+    def cells(self):
+        """A read only view of the cells as integers."""
+        return self._cells
+
+    @property
+    def rows(self):
+        """An immutable mapping of row (nonterminal) symbol to table index."""
+        return self._rows
+
+    @property
+    def cols(self):
+        """An immutable mapping of column (terminal) symbol to table index."""
+        return self._cols
+
+    @property
+    def conflicts(self):
+        """An immutable mapping of every (row, column) in conflict to its rules."""
+        return self._conflicts
+
+    def rule(self, nonterminal, terminal):
+        """Find the rule to apply for `nonterminal` on `terminal`, or -1."""
+        row, col = self._rows.get(nonterminal), self._cols.get(terminal)
+        if row is None or col is None:
+            return -1
+        return self._cells[row * len(self._cols) + col]
+
+    def rules(self, nonterminal, terminal):
+        """Find every rule for `nonterminal` on `terminal`, conflicts included."""
+        row, col = self._rows.get(nonterminal), self._cols.get(terminal)
+        if row is None or col is None:
+            return frozenset()
+        if (row, col) in self._conflicts:
+            return self._conflicts[(row, col)]
+        rule = self._cells[row * len(self._cols) + col]
+        return frozenset([rule]) if rule >= 0 else frozenset()
+
+
+class LALRTable(bytes):
+    """The LALRTable is a compact, immutable encoding of LALR(1) parse tables.
+
+    LALRTable stores the action table, indexed by state x terminal, followed by
+    the goto table, indexed by state x nonterminal, as one flat buffer of fixed
+    width (native byte order) signed integers, each in row-major order. An
+    action cell holds s > 0 to shift and enter state s, ~r (i.e. -r - 1) to
+    reduce by rule r, or 0 for an error; a reduction by the rule one past the
+    grammar's last is the augmented start rule, meaning accept. A goto cell
+    holds the state entered, or 0. State 0, the start state, is never entered
+    by a shift or goto so 0 is free to mean error. Cells in conflict (the
+    grammar not being LALR(1)) hold the shift, if any, otherwise the lowest
+    rule's reduction, while all of their actions are kept in a small side
+    mapping.
+    """
+
+    def __new__(cls, actions, gotos, cols, rows, conflicts):
+        """Construct an LALRTable from the given (flattened) tables.
+
+        Args:
+          actions (list[int]): the action of every state and terminal pair, in
+              row-major order.
+          gotos (list[int]): the goto of every state and nonterminal pair, in
+              row-major order.
+          cols (dict[str, int]): action column (terminal) symbol to index.
+          rows (dict[str, int]): goto column (nonterminal) symbol to index.
+          conflicts (dict[tuple[int, int], set[int]]): every action of the
+              action cells (state, column) with more than one.
+
+        Return:
+          LALRTable: the compact tables.
+        """
+        cells = actions + gotos
+        low, high = min(cells, default=0), max(cells, default=0)
+        typecode = 'h' if -1 << 15 <= low and high < 1 << 15 else 'i'
+        table = super().__new__(cls, array(typecode, cells).tobytes())
+        view = memoryview(table).cast(typecode)
+        table._typecode = typecode
+        table._states = len(actions) // len(cols)
+        table._actions = view[:len(actions)]
+        table._gotos = view[len(actions):]
+        table._cols = MappingProxyType(dict(cols))
+        table._rows = MappingProxyType(dict(rows))
+        table._conflicts = MappingProxyType({cell: frozenset(actions)
+                                             for cell, actions in conflicts.items()})
+        return table
+
+    def __reduce__(self):
+        """Rebuild the tables from plain data when pickled or copied."""
+        return (self.__class__, (self._actions.tolist(), self._gotos.tolist(), dict(self._cols),
+                                 dict(self._rows),
+                                 {cell: set(actions) for cell, actions in self._conflicts.items()}))
+
+    def _fields(self):
+        """Every field identifying the tables, for comparison and hashing."""
+        return (self._typecode, bytes(self), self._states, frozenset(self._cols.items()),
+                frozenset(self._rows.items()), frozenset(self._conflicts.items()))
+
+    def __eq__(self, other):
+        if not isinstance(other, LALRTable):
+            return False
+        return self._fields() == other._fields()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    @property
+    def typecode(self):
+        """The array typecode of the cells; 'h' or 'i'."""
+        return self._typecode
+
+    @property
+    def states(self):
+        """The number of states (rows) of the tables."""
+        return self._states
+
+    @property
+    def actions(self):
+        """A read only view of the action cells as integers."""
+        return self._actions
+
+    @property
+    def gotos(self):
+        """A read only view of the goto cells as integers."""
+        return self._gotos
+
+    @property
+    def cols(self):
+        """An immutable mapping of action column (terminal) symbol to index."""
+        return self._cols
+
+    @property
+    def rows(self):
+        """An immutable mapping of goto column (nonterminal) symbol to index."""
+        return self._rows
+
+    @property
+    def conflicts(self):
+        """An immutable mapping of every (state, column) in conflict to its actions."""
+        return self._conflicts
+
+    def action(self, state, terminal):
+        """Find the action to take in `state` on `terminal`, or 0."""
+        col = self._cols.get(terminal)
+        if col is None:
+            return 0
+        return self._actions[state * len(self._cols) + col]
+
+    def goto(self, state, nonterminal):
+        """Find the state to enter from `state` on `nonterminal`, or 0."""
+        row = self._rows.get(nonterminal)
+        if row is None:
+            return 0
+        return self._gotos[state * len(self._rows) + row]
+
+
 class ContextFreeGrammar:
     """The ContextFreeGrammar object responsible for creating parse tables.
 
@@ -32,7 +254,7 @@ class ContextFreeGrammar:
     queried through the exposed API functions.
     """
 
-    def __init__(self, name, productions, start):
+    def __init__(self, name, productions, start, cache=None):
         """Construct a parse table for the given BNF grammar.
 
         Attempt to initialize a ContextFreeGramamr object with the specified
@@ -51,6 +273,11 @@ class ContextFreeGrammar:
         token it cannot be known what rule to choose in order to successfully
         produce a parse without backtracking.
 
+        If cache is given the first/follow sets and parse table are stored
+        within that directory, addressed by the productions, start and SPaG
+        version, and loaded from there rather than recomputed whenever the same
+        grammar is given again.
+
         Args:
           name (str): The name of the input grammar.
           productions (dict[str, list[list[str]]): The production rules of the
@@ -58,12 +285,16 @@ class ContextFreeGrammar:
               rules, which are a series of [non]terminal string identifiers. An
               empty rule can be used for epsilon.
           start (str): The start productions nonterminal identifier of the grammar.
+          cache (str): The directory of the compile cache; None if not
+              specified (default) to always compile.
 
         Raises:
           TypeError: if `name` is not a string
           ValueError: if `name` is empty
           TypeError: if `start` is not a string
           ValueError: if `start` is empty
+          TypeError: if `cache` is not a string
+          ValueError: if `cache` is empty
           TypeError: if `productions` is not a dict
           ValueError: if `productions` is empty
           ValueError: if `start` not in `productions`
@@ -91,6 +322,12 @@ class ContextFreeGrammar:
 
         self._start = start
 
+        if cache is not None and not isinstance(cache, str):
+            raise TypeError('cache must be a string')
+
+        if cache is not None and not cache:
+            raise ValueError('cache must be non empty')
+
         if not isinstance(productions, dict):
             raise TypeError('productions must be a dict')
 
@@ -100,7 +337,7 @@ class ContextFreeGrammar:
         if self._start not in productions:
             raise ValueError('start production not present in given productions')
 
-        self._rules = []
+        rules = []
         for nonterminal in productions:
             rhs = productions[nonterminal]
             if not isinstance(nonterminal, str):
@@ -126,15 +363,32 @@ class ContextFreeGrammar:
                     if isinstance(symbol, str) and not symbol:
                         raise ValueError('production rule symbol must be non empty')
 
-                self._rules.append((nonterminal, rule))
-
-        self._terminals, self._nonterminals = self._symbols(self._rules)
-        self._first_set = self._first(self._terminals, self._nonterminals, self._rules)
-        self._follow_set = self._follow(self._nonterminals, self._start,
-                                        self._first_set, self._rules)
-        self._parse_table, self._rows, self._cols = \
-          self._table(self._terminals, self._nonterminals,
-                      self._first_set, self._follow_set, self._rules)
+                rules.append((nonterminal, tuple(rule)))
+
+        self._rules = tuple(rules)
+
+        compiled = None
+        if cache is not None:
+            cache = Cache(cache)
+            key = Cache.key('ParseTable', self._start, self._rules)
+            compiled = cache.load(key)
+        self._cache = cache
+        self._lalr_table = None
+
+        if compiled is None:
+            terminals, nonterminals = self._symbols(self._rules)
+            members, bits = self._number(terminals)
+            first = self._first(terminals, nonterminals, self._rules, bits)
+            follow = self._follow(nonterminals, self._start, first, self._rules, bits)
+            cells, conflicts, rows, cols = self._table(terminals, nonterminals, first, follow,
+                                                       self._rules, members)
+            first = {symbol: self._members(first[symbol], members) for symbol in first}
+            follow = {symbol: self._members(follow[symbol], members) for symbol in follow}
+            compiled = (terminals, nonterminals, first, follow, cells, conflicts, rows, cols)
+            if cache is not None:
+                cache.store(key, compiled)
+
+        self._link(*compiled)
 
     @staticmethod
     def epsilon():
@@ -164,102 +418,173 @@ class ContextFreeGrammar:
     def name(self):
         """Query for the name of the grammar.
 
-        A readonly property which copies the grammar's name to protect against
-        user mutations.
+        A readonly property returning the grammar's (immutable) name.
 
         Return:
           str: The given input name of the grammar.
         """
-        return deepcopy(self._name)
+        return self._name
 
     @property
     def start(self):
         """Query for the start production's nonterminal of the grammar.
 
-        A readonly property which copies the grammar's start production
-        nonterminal to protect against user mutations.
+        A readonly property returning the grammar's (immutable) start production
+        nonterminal.
 
         Return:
           str: The given start production nonterminal.
         """
-        return deepcopy(self._start)
+        return self._start
 
     @property
     def terminals(self):
         """Query for the terminal set of the grammar.
 
-        A readonly property which copies the grammar's terminal set to protect
-        against user mutations.
+        A readonly property returning the grammar's terminal set as an
+        immutable set, so no copy is made.
 
         Return:
-          set[str]: The set of terminal symbols contained in the grammar.
+          frozenset[str]: The set of terminal symbols contained in the grammar.
         """
-        return deepcopy(self._terminals)
+        return self._terminals
 
     @property
     def nonterminals(self):
         """Query for the nonterminal set of the grammar.
 
-        A readonly property which copies the grammar's nonterminal set to
-        protect against user mutations.
+        A readonly property returning the grammar's nonterminal set as an
+        immutable set, so no copy is made.
 
         Return:
-          set[str]: The set of nonterminal production symbols in the grammar.
+          frozenset[str]: The set of nonterminal production symbols in the
+            grammar.
         """
-        return deepcopy(self._nonterminals)
+        return self._nonterminals
 
     @property
     def first(self):
         """Query for the first set(s) of the grammar's [non]terminal(s).
 
-        A readonly property which copies the first set(s) of the grammar's
-        [non]terminal(s) to protect against user mutations.
+        A readonly property returning an immutable view of the first set(s) of
+        the grammar's [non]terminal(s), so no copy is made.
 
         Return:
-          dict[str, set[str, int]]: The first set of every [non]terminal.
+          mappingproxy[str, frozenset[str, int]]: The first set of every
+            [non]terminal.
         """
-        return deepcopy(self._first_set)
+        return self._first_set
 
     @property
     def follow(self):
         """Query for the follow set(s) of the grammar's nonterminal(s).
 
-        A readonly property which copies the follow set(s) grammar's
-        nonterminals to protect against user mutations.
+        A readonly property returning an immutable view of the follow set(s) of
+        the grammar's nonterminals, so no copy is made.
 
         Return:
-          dict[str, set[str, int]]: The follow set of every nonterminal.
+          mappingproxy[str, frozenset[str, int]]: The follow set of every
+            nonterminal.
         """
-        return deepcopy(self._follow_set)
+        return self._follow_set
 
     @property
     def rules(self):
         """Query for the production rules of the grammar.
 
-        A readonly property which copies the grammar's flattened production
-        rules to protect against user mutations.
+        A readonly property returning the grammar's flattened production rules
+        as nested tuples, so no copy is made.
 
         Return:
-          list[tuple[str, list[str]]]: A flattened list of production rules.
+          tuple[tuple[str, tuple[str]]]: A flattened list of production rules.
         """
-        return deepcopy(self._rules)
+        return self._rules
+
+    @property
+    def parse_table(self):
+        """Query for the compact parse table of the given input grammar.
+
+        A readonly property returning the grammar's parse table as a flat,
+        (immutable) ParseTable, so no copy is made. Unlike table, no object is
+        allocated per cell; conflicts are kept to the side.
+
+        Return:
+          ParseTable: the parse table with a rule (or -1) per cell.
+        """
+        return self._compact
+
+    @property
+    def lalr_table(self):
+        """Query for the compact LALR(1) parse tables of the given input grammar.
+
+        A readonly property returning the grammar's LALR(1) action and goto
+        tables as a flat, (immutable) LALRTable. Unlike the LL(1) parse table
+        the grammar may be left recursive and need not be left factored. The
+        tables are constructed upon first query, or loaded from the cache if
+        given, and shared thereafter.
+
+        Return:
+          LALRTable: the action and goto tables.
+        """
+        if self._lalr_table is None:
+            compiled = None
+            if self._cache is not None:
+                key = Cache.key('LALRTable', self._start, self._rules)
+                compiled = self._cache.load(key)
+
+            if compiled is None:
+                compiled = self._lalr(self._nonterminals, self._start, self._rules)
+                if self._cache is not None:
+                    self._cache.store(key, compiled)
+
+            self._lalr_table = LALRTable(*compiled)
+        return self._lalr_table
 
     @property
     def table(self):
         """Query for the parse table of the given input grammar.
 
-        A readonly property which copies the grammar's parse table to protect
-        against user mutations.
+        A readonly property returning immutable views of the grammar's parse
+        table. The views are derived from the compact parse_table upon first
+        query and shared thereafter.
 
         Return:
-          list[list[set[int]]]: row-major parse table with list rule
+          tuple[tuple[frozenset[int]]]: row-major parse table with list rule
             inidice(s) entries. (i.e. Table[nonterminal][terminal] -> rules)
-          dict[str, int]: Mapping for row (nonterminal) symbol to table index.
-          dict[str, int]: Mapping for column (terminal) symbol to table index.
+          mappingproxy[str, int]: Mapping for row (nonterminal) symbol to table
+            index.
+          mappingproxy[str, int]: Mapping for column (terminal) symbol to table
+            index.
         """
-        return deepcopy(self._parse_table), \
-               deepcopy(self._rows), \
-               deepcopy(self._cols)
+        if self._parse_table is None:
+            compact = self._compact
+            rows = sorted(compact.rows, key=compact.rows.get)
+            cols = sorted(compact.cols, key=compact.cols.get)
+            table = tuple(tuple(compact.rules(nonterminal, terminal) for terminal in cols)
+                          for nonterminal in rows)
+            self._parse_table = (table, compact.rows, compact.cols)
+        return self._parse_table
+
+    def _link(self, terminals, nonterminals, first, follow, cells, conflicts, rows, cols):
+        """Freeze the compiled grammar into the structures the properties share.
+
+        Args:
+          terminals (set[str]): set of grammar terminal symbols.
+          nonterminals (set[str]): set of grammar nonterminal symbols.
+          first (dict[str, set[str, int]]): first sets for [non]terminals.
+          follow (dict[str, set[str, int]]): follow sets for terminals.
+          cells (list[int]): row-major parse table of rules, or -1.
+          conflicts (dict[tuple[int, int], set[int]]): rules of the cells in
+              conflict.
+          rows (dict[str, int]): row (nonterminal) symbol to table index.
+          cols (dict[str, int]): column (terminal) symbol to table index.
+        """
+        self._terminals = frozenset(terminals)
+        self._nonterminals = frozenset(nonterminals)
+        self._first_set = MappingProxyType({s: frozenset(first[s]) for s in first})
+        self._follow_set = MappingProxyType({s: frozenset(follow[s]) for s in follow})
+        self._compact = ParseTable(cells, rows, cols, conflicts)
+        self._parse_table = None
 
     @staticmethod
     def _symbols(productions):
@@ -283,112 +608,221 @@ class ContextFreeGrammar:
         return terminals, nonterminals
 
     @staticmethod
-    def _first_production(production, first):
-        """Derive the first set given a single production rule.
+    def _number(terminals):
+        """Number the symbols which may be members of first/follow sets.
 
-        Compute the first set for a single nonterminal's production rule
-        following the algorithm at:
-        http://marvin.cs.uidaho.edu/Teaching/CS445/firstfollow.txt
+        During analysis first, follow and predict sets are int bitsets, with
+        bit i set if the i'th member is present, so unions and differences
+        are word wide operations on a single int.
 
         Args:
-          production (list[str]): a series of [non]terminal symbols.
-          first (dict[str, set[str, int]]): first sets for [non]terminals.
+          terminals (set[str]): set of grammar terminal symbols.
+
+        Return:
+          tuple[str, int]: the member symbol of each bit.
+          dict[str, int]: the bit (mask) of each member symbol.
+        """
+        epsilon, end = ContextFreeGrammar.epsilon(), ContextFreeGrammar.end_of_input()
+        members = (epsilon, end) + tuple(terminals - set([epsilon, end]))
+        return members, {member: 1 << idx for idx, member in enumerate(members)}
+
+    @staticmethod
+    def _members(bitset, members):
+        """Convert a bitset back to the set of its members.
+
+        Args:
+          bitset (int): the bitset to convert.
+          members (tuple[str, int]): the member symbol of each bit.
+
+        Return:
+          set[str, int]: the members present in the bitset.
+        """
+        _set = set()
+        while bitset:
+            low = bitset & -bitset
+            _set.add(members[low.bit_length() - 1])
+            bitset ^= low
+        return _set
+
+    @staticmethod
+    def _nullable(productions):
+        """Derive the set of nullable [non]terminals of the grammar.
+
+        A symbol is nullable if it can derive the empty string. This holds for
+        epsilon itself and every nonterminal with a rule of nullable symbols,
+        found with a worklist: each rule counts its symbols not yet known to be
+        nullable, and its nonterminal becomes nullable once the count is zero.
+
+        Args:
+          productions (list[tuple[str, list[str]]]): flattened list of rules.
 
         Return:
-          set[str, int]: possible symbols first encountered for `production`.
+          set[str, int]: The nullable [non]terminals.
+        """
+        counts, occurrences, worklist = [], {}, []
+        for rule, (nonterminal, production) in enumerate(productions):
+            counts.append(len(production))
+            for symbol in production:
+                occurrences.setdefault(symbol, []).append(rule)
+            if not production:
+                worklist.append(nonterminal)
+
+        if ContextFreeGrammar.epsilon() in occurrences:
+            worklist.append(ContextFreeGrammar.epsilon())
+
+        nullable = set()
+        while worklist:
+            symbol = worklist.pop()
+            if symbol in nullable:
+                continue
+            nullable.add(symbol)
+            for rule in occurrences.get(symbol, ()):
+                counts[rule] -= 1
+                if not counts[rule]:
+                    worklist.append(productions[rule][0])
+        return nullable
+
+    @staticmethod
+    def _propagate(sets, edges):
+        """Propagate bitsets along dependency edges until they are closed.
+
+        The strongly connected components of the dependency graph share the
+        same closed set, so they are found (Tarjan, iteratively) and then
+        visited in topological order: each component's union is computed once
+        and flows into its successors before they are visited, taking time
+        linear in the size of the graph.
+
+        Args:
+          sets (dict[str, int]): the bitsets to close; updated in place.
+          edges (dict[str, set[str]]): the successors of each symbol.
         """
-        _first = set([ContextFreeGrammar.epsilon()])
-        for symbol in production:
-            _first.update(first[symbol])
-            if ContextFreeGrammar.epsilon() not in first[symbol]:
-                _first.discard(ContextFreeGrammar.epsilon())
-                break
-        return _first
+        index, low, stack, on_stack, components = {}, {}, [], set(), []
+        for root in edges:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(edges[root]))]
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = low[successor] = len(index)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(edges.get(successor, ()))))
+                        break
+                    if successor in on_stack:
+                        low[node] = min(low[node], index[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = [stack.pop()]
+                        while component[-1] != node:
+                            component.append(stack.pop())
+                        on_stack.difference_update(component)
+                        components.append(component)
+
+        # NOTE: Tarjan's algorithm finds components in reverse topological order.
+        for component in reversed(components):
+            union = 0
+            for symbol in component:
+                union |= sets[symbol]
+            for symbol in component:
+                sets[symbol] = union
+                for successor in edges.get(symbol, ()):
+                    sets[successor] |= union
 
     @staticmethod
-    def _first(terminals, nonterminals, productions):
+    def _first(terminals, nonterminals, productions, bits):
         """Derive the grammars first sets.
 
-        Calculate the first set for each [non]terminal in the grammar following
-        the algorithm at:
-        http://marvin.cs.uidaho.edu/Teaching/CS445/firstfollow.txt
+        Calculate the first set for each [non]terminal in the grammar. The
+        first set of a nonterminal takes in the first sets of every symbol of
+        its rules up to and including the first non nullable one, so these
+        dependencies form a graph along which the sets are propagated with a
+        worklist. Epsilon is then added for the nullable nonterminals.
 
         Args:
           terminals (set[str]): set of grammar terminal symbols.
           nonterminals (set[str]): set of grammar nonterminal symbols.
           productions (list[tuple[str, list[str]]]): flattened list of rules.
+          bits (dict[str, int]): the bit of each member symbol.
 
         Return:
-          dict[str, set[str, int]]: The first set of every [non]terminal.
+          dict[str, int]: The first set (bitset) of every [non]terminal.
         """
-        first = {}
+        epsilon = ContextFreeGrammar.epsilon()
 
-        # foreach elem A of TERMS do first[A] = {A}
-        for terminal in terminals:
-            first[terminal] = set([terminal])
+        first = {terminal: bits[terminal] for terminal in terminals}
+        first.update((nonterminal, 0) for nonterminal in nonterminals)
 
-        # foreach elem A of NONTERMS do first[A] = {}
-        for nonterminal in nonterminals:
-            first[nonterminal] = set()
+        nullable = ContextFreeGrammar._nullable(productions)
 
-        # loop until nothing new happens updating the first sets
-        while True:
-            changed = False
+        edges = {}
+        for nonterminal, production in productions:
+            for symbol in production:
+                if symbol in nonterminals:
+                    edges.setdefault(symbol, set()).add(nonterminal)
+                elif symbol != epsilon:
+                    first[nonterminal] |= bits[symbol]
+                if symbol not in nullable:
+                    break
 
-            for nonterminal, production in productions:
-                new = ContextFreeGrammar._first_production(production, first) - first[nonterminal]
-                if new:
-                    first[nonterminal].update(new)
-                    changed = True
+        ContextFreeGrammar._propagate(first, edges)
 
-            if not changed:
-                return first
+        for nonterminal in nonterminals & nullable:
+            first[nonterminal] |= bits[epsilon]
+        return first
 
     @staticmethod
-    def _follow(nonterminals, start, first, productions):
+    def _follow(nonterminals, start, first, productions, bits):
         """Derive the grammars follow sets.
 
-        Calculate the follow set for each nonterminal in the grammar following
-        the algorithm at:
-        http://marvin.cs.uidaho.edu/Teaching/CS445/firstfollow.txt
+        Calculate the follow set for each nonterminal in the grammar. Each
+        rule is walked once from right to left, keeping the first set of the
+        suffix after each symbol (less epsilon) and whether that suffix is
+        nullable. A nonterminal is followed by its suffix's first set, and
+        also by whatever follows the rule's nonterminal when the suffix is
+        nullable; those dependencies are propagated with a worklist.
 
         Args:
           nonterminals (set[str]): set of grammar nonterminal symbols.
           start (str): The given start production nonterminal.
-          first (dict[str, set[str, int]]): first sets for [non]terminals.
+          first (dict[str, int]): first sets (bitsets) for [non]terminals.
           productions (list[tuple[str, list[str]]]): flattened list of rules.
+          bits (dict[str, int]): the bit of each member symbol.
 
         Return:
-          dict[str, set[str, int]]: The follow set of every nonterminal.
+          dict[str, int]: The follow set (bitset) of every nonterminal.
         """
-        # foreach elem A of NONTERMS do follow[A] = {}
-        follow = {nonterminal: set() for nonterminal in nonterminals}
-
-        # put $ (end of input marker) in follow(<Start>)
-        follow[start] = set([ContextFreeGrammar.end_of_input()])
-
-        # loop until nothing new happens updating the follow sets
-        while True:
-            changed = False
-
-            for nonterminal, production in productions:
-                for (idx, elem) in enumerate(production):
-                    if elem in nonterminals:
-                        new = ContextFreeGrammar._first_production(production[idx+1:], first)
-                        if ContextFreeGrammar.epsilon() in new:
-                            new.discard(ContextFreeGrammar.epsilon())
-                            new.update(follow[nonterminal])
-
-                        new = new - follow[elem]
-                        if new:
-                            follow[elem].update(new)
-                            changed = True
-
-            if not changed:
-                return follow
+        epsilon = bits[ContextFreeGrammar.epsilon()]
+
+        follow = {nonterminal: 0 for nonterminal in nonterminals}
+        follow[start] |= bits[ContextFreeGrammar.end_of_input()]
+
+        edges = {}
+        for nonterminal, production in productions:
+            suffix, nullable = 0, True
+            for symbol in reversed(production):
+                if symbol in nonterminals:
+                    follow[symbol] |= suffix
+                    if nullable and symbol != nonterminal:
+                        edges.setdefault(nonterminal, set()).add(symbol)
+                if first[symbol] & epsilon:
+                    suffix |= first[symbol] & ~epsilon
+                else:
+                    suffix, nullable = first[symbol] & ~epsilon, False
+
+        ContextFreeGrammar._propagate(follow, edges)
+        return follow
 
     @staticmethod
-    def _table(terminals, nonterminals, first, follow, productions):
+    def _table(terminals, nonterminals, first, follow, productions, members):
         """Programmatically construct the grammars parse table.
 
         Construct the parse table indexed by nonterminal x terminal. This is
@@ -399,27 +833,219 @@ class ContextFreeGrammar:
         Args:
           terminals (set[str]): set of grammar terminal symbols.
           nonterminals (set[str]): set of grammar nonterminal symbols.
-          first (dict[str, set[str, int]]): first sets for [non]terminals.
-          follow (dict[str, set[str, int]]): follow sets for terminals.
+          first (dict[str, int]): first sets (bitsets) for [non]terminals.
+          follow (dict[str, int]): follow sets (bitsets) for nonterminals.
           productions (list[tuple[str, list[str]]]): flattened list of rules.
+          members (tuple[str, int]): the member symbol of each bit.
 
         Return:
-          list[list[set[int]]]: row-major parse table with list rule
-            inidice(s) entries. (i.e. Table[nonterminal][terminal] -> rules)
+          list[int]: row-major parse table holding the rule of each entry
+            (i.e. Table[nonterminal * len(cols) + terminal] -> rule), or -1.
+          dict[tuple[int, int], set[int]]: every rule of the (row, column)
+            entries predicted by more than one rule.
           dict[str, int]: Mapping for row (nonterminal) symbol to table index.
           dict[str, int]: Mapping for column (terminal) symbol to table index.
         """
         rows = {n:i for i, n in enumerate(nonterminals)}
         cols = {t:i for i, t in enumerate(terminals | set([ContextFreeGrammar.end_of_input()]))}
+        epsilon = 1 << members.index(ContextFreeGrammar.epsilon())
 
-        table = [[set() for _ in cols] for _ in rows]
+        width = len(cols)
+        table, conflicts = [-1] * (len(rows) * width), {}
 
         for (rule, (nonterminal, production)) in enumerate(productions):
-            predict = ContextFreeGrammar._first_production(production, first)
-            if ContextFreeGrammar.epsilon() in predict:
-                predict.discard(ContextFreeGrammar.epsilon())
-                predict.update(follow[nonterminal])
-            for terminal in predict:
-                table[rows[nonterminal]][cols[terminal]].add(rule)
-
-        return table, rows, cols
+            predict = epsilon
+            for symbol in production:
+                predict |= first[symbol]
+                if not first[symbol] & epsilon:
+                    predict &= ~epsilon
+                    break
+            if predict & epsilon:
+                predict = (predict & ~epsilon) | follow[nonterminal]
+            row = rows[nonterminal]
+            for terminal in ContextFreeGrammar._members(predict, members):
+                col = cols[terminal]
+                cell = row * width + col
+                if table[cell] < 0:
+                    table[cell] = rule
+                elif table[cell] != rule:
+                    conflicts.setdefault((row, col), set([table[cell]])).add(rule)
+                    table[cell] = min(table[cell], rule)
+
+        return table, conflicts, rows, cols
+
+    @staticmethod
+    def _automaton(nonterminals, productions):
+        """Construct the LR(0) automaton of the given (augmented) grammar.
+
+        States are identified by their kernel items, (rule, dot) pairs, and
+        numbered in the order found, starting from the augmented start rule
+        (the last) with the dot at its beginning. Every state's closure adds
+        the items at the beginning of the rules of each nonterminal after a
+        dot, and in turn those of each nonterminal beginning them, found with
+        a worklist.
+
+        Args:
+          nonterminals (set[str]): set of grammar nonterminal symbols.
+          productions (list[tuple[str, tuple[str]]]): flattened list of rules
+              without epsilon, the augmented start rule last.
+
+        Return:
+          list[dict[str, int]]: the state entered upon each [non]terminal,
+            per state.
+          list[list[int]]: the rules completed (reducible), per state.
+        """
+        alternatives = {}
+        for rule, (nonterminal, production) in enumerate(productions):
+            alternatives.setdefault(nonterminal, []).append(rule)
+
+        kernels = [((len(productions) - 1, 0),)]
+        states, gotos, completes = {kernels[0]: 0}, [], []
+        while len(gotos) < len(kernels):
+            kernel = kernels[len(gotos)]
+            items, worklist, closed = list(kernel), [], set()
+            for rule, dot in kernel:
+                production = productions[rule][1]
+                if dot < len(production) and production[dot] in nonterminals:
+                    worklist.append(production[dot])
+            while worklist:
+                nonterminal = worklist.pop()
+                if nonterminal in closed:
+                    continue
+                closed.add(nonterminal)
+                for rule in alternatives.get(nonterminal, ()):
+                    items.append((rule, 0))
+                    production = productions[rule][1]
+                    if production and production[0] in nonterminals:
+                        worklist.append(production[0])
+
+            successors, complete = {}, []
+            for rule, dot in items:
+                production = productions[rule][1]
+                if dot < len(production):
+                    successors.setdefault(production[dot], []).append((rule, dot + 1))
+                else:
+                    complete.append(rule)
+
+            moves = {}
+            for symbol, successor in successors.items():
+                successor = tuple(sorted(successor))
+                if successor not in states:
+                    states[successor] = len(kernels)
+                    kernels.append(successor)
+                moves[symbol] = states[successor]
+            gotos.append(moves)
+            completes.append(complete)
+        return gotos, completes
+
+    @staticmethod
+    def _lalr(nonterminals, start, productions):
+        """Programmatically construct the grammars LALR(1) parse tables.
+
+        Construct the LR(0) automaton of the grammar augmented with a rule
+        deriving the start nonterminal, then compute the lookaheads of its
+        reductions following DeRemer and Pennello (Efficient Computation of
+        LALR(1) Look-Ahead Sets, 1982) over the automaton's nonterminal
+        transitions (p, A):
+
+          * DR(p, A): the terminals read by the state A enters from p.
+          * Read(p, A): DR(p, A) along with Read(r, C) for every nullable C
+            read by the state r A enters from p.
+          * Follow(p, A): Read(p, A) along with Follow(p', B) for every rule
+            B -> b A g with g nullable and b leading from p' to p.
+          * LA(q, A -> w): the union of Follow(p, A) for every p from which w
+            leads to q.
+
+        The unions of Read and Follow are bitsets propagated along their
+        relations exactly as first and follow sets are, one strongly connected
+        component at a time.
+
+        Args:
+          nonterminals (set[str]): set of grammar nonterminal symbols.
+          start (str): The given start production nonterminal.
+          productions (list[tuple[str, list[str]]]): flattened list of rules.
+
+        Return:
+          list[int]: row-major action table (i.e. Table[state * len(cols) +
+            terminal] -> action) of shifts s > 0, reductions ~rule or 0.
+          list[int]: row-major goto table (i.e. Table[state * len(rows) +
+            nonterminal] -> state), or 0.
+          dict[str, int]: Mapping for action column (terminal) symbol to index.
+          dict[str, int]: Mapping for goto column (nonterminal) symbol to index.
+          dict[tuple[int, int], set[int]]: every action of the (state, column)
+            action cells in conflict.
+        """
+        epsilon, end = ContextFreeGrammar.epsilon(), ContextFreeGrammar.end_of_input()
+        rules = [(nonterminal, tuple(symbol for symbol in production if symbol != epsilon))
+                 for nonterminal, production in productions]
+        accept = len(rules)
+        rules.append((None, (start,)))
+
+        terminals = [symbol for _, production in rules for symbol in production
+                     if symbol not in nonterminals]
+        cols = {terminal: col for col, terminal in enumerate(dict.fromkeys(terminals + [end]))}
+        rows = {nonterminal: row for row, nonterminal in enumerate(dict.fromkeys(
+            nonterminal for nonterminal, _ in productions))}
+
+        gotos, completes = ContextFreeGrammar._automaton(nonterminals, rules)
+        nullable = ContextFreeGrammar._nullable(rules)
+
+        # DR and reads.
+        read, reads = {}, {}
+        for state, moves in enumerate(gotos):
+            for symbol, target in moves.items():
+                if symbol not in nonterminals:
+                    continue
+                read[(state, symbol)] = 1 << cols[end] if (state, symbol) == (0, start) else 0
+                for _symbol in gotos[target]:
+                    if _symbol not in nonterminals:
+                        read[(state, symbol)] |= 1 << cols[_symbol]
+                    elif _symbol in nullable:
+                        reads.setdefault((target, _symbol), set()).add((state, symbol))
+        ContextFreeGrammar._propagate(read, reads)
+
+        # includes and lookback.
+        alternatives = {}
+        for rule, (nonterminal, production) in enumerate(rules):
+            suffix = len(production)
+            while suffix and production[suffix - 1] in nullable:
+                suffix -= 1
+            alternatives.setdefault(nonterminal, []).append((rule, production, suffix))
+
+        follow, includes, lookback = read, {}, {}
+        for (state, nonterminal) in list(follow):
+            for rule, production, suffix in alternatives[nonterminal]:
+                _state = state
+                for idx, symbol in enumerate(production):
+                    if symbol in nonterminals and idx + 1 >= suffix:
+                        includes.setdefault((state, nonterminal), set()).add((_state, symbol))
+                    _state = gotos[_state][symbol]
+                lookback.setdefault((_state, rule), []).append((state, nonterminal))
+        ContextFreeGrammar._propagate(follow, includes)
+
+        width, height = len(cols), len(rows)
+        actions, _gotos, conflicts = [0] * (len(gotos) * width), [0] * (len(gotos) * height), {}
+        for state, moves in enumerate(gotos):
+            for symbol, target in moves.items():
+                if symbol in nonterminals:
+                    _gotos[state * height + rows[symbol]] = target
+                else:
+                    actions[state * width + cols[symbol]] = target
+            for rule in completes[state]:
+                lookahead = 1 << cols[end] if rule == accept else 0
+                for transition in lookback.get((state, rule), ()):
+                    lookahead |= follow[transition]
+                while lookahead:
+                    low = lookahead & -lookahead
+                    lookahead ^= low
+                    col = low.bit_length() - 1
+                    cell = state * width + col
+                    if not actions[cell]:
+                        actions[cell] = ~rule
+                    elif actions[cell] != ~rule:
+                        conflicts.setdefault((state, col), set([actions[cell]])).add(~rule)
+                        if actions[cell] < 0:
+                            actions[cell] = max(actions[cell], ~rule)
+
+        return actions, _gotos, cols, rows, conflicts
+
@@ -0,0 +1,687 @@
+"""In-process execution of compiled SPaG grammars.
+
+The Lexer object runs the minimal DFA of a RegularGrammar directly over str or
+bytes input, yielding Token objects by maximal munch (longest match). The
+Parser object runs the LL(1) parse table of a ContextFreeGrammar over those
+tokens, producing a parse tree of Node objects, a flat array encoded Tree, a
+flat stream of the derivation or a stream of enter, token and exit events. No
+code generation step is required; both are driven by the grammar's compact
+TransitionTable and ParseTable respectively.
+"""
+from array import array
+from functools import partial
+from spag.parser import ContextFreeGrammar
+from spag.scanner import RegularGrammar
+
+
+class Token:
+    """A single token recognized by the Lexer.
+
+    Token records the type, text and location of a lexeme within the input.
+    Tokens are plentiful, so their attributes are fixed by __slots__ to keep
+    them small and quick to construct.
+    """
+
+    __slots__ = ('type', 'value', 'offset', 'line', 'column')
+
+    def __init__(self, _type, value, offset, line, column):
+        """Construct a Token.
+
+        Args:
+          _type (str): the token name/type given in the grammar.
+          value (str|bytes): the lexeme, of the same type as the input.
+          offset (int): the index of the lexeme within the input.
+          line (int): the line on which the lexeme begins, starting at 1.
+          column (int): the column at which the lexeme begins, starting at 1.
+        """
+        self.type = _type
+        self.value = value
+        self.offset = offset
+        self.line = line
+        self.column = column
+
+    def __repr__(self):
+        return 'Token({0!r}, {1!r}, {2}, {3}, {4})'.format(self.type, self.value, self.offset,
+                                                          self.line, self.column)
+
+    def __eq__(self, other):
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (self.type, self.value, self.offset, self.line, self.column) == \
+               (other.type, other.value, other.offset, other.line, other.column)
+
+    __hash__ = None
+
+
+class Lexer:
+    """The Lexer object responsible for tokenizing input with a RegularGrammar.
+
+    Lexer represents the minimal DFA of a RegularGrammar ready for execution.
+    Input is consumed by maximal munch: the DFA is run as far as it can go and
+    the longest prefix accepted becomes the next token, with ties going to the
+    type given first in the grammar's expressions. Everything the hot loop
+    needs (the integer table, the character to class map and the state to
+    type map) is precomputed so no allocations are made per character.
+
+    Plain maximal munch backtracks to the last accepting position once a
+    longer match fails, so some token sets (e.g. `a` and `a*b` over a run of
+    a's) take quadratic time. Optionally the Lexer instead uses Reps'
+    tabulating algorithm, which remembers the (state, position) pairs known to
+    fail and so never scans the same input from the same state twice, making
+    tokenization linear time at the cost of the bookkeeping.
+    """
+
+    def __init__(self, regular_grammar, ignore=None, tabulate=False):
+        """Construct a Lexer from the given RegularGrammar.
+
+        Args:
+          regular_grammar (RegularGrammar): the grammar to tokenize with.
+          ignore (set[str]): token types to recognize but not yield (e.g.
+              whitespace or comments); None if not specified (default).
+          tabulate (bool): use Reps' tabulating maximal munch, which is linear
+              time; False if not specified (default).
+
+        Raises:
+          TypeError: if regular_grammar is not a RegularGrammar
+          TypeError: if ignore is not a set
+          ValueError: if ignore contains a type not in the grammar
+          TypeError: if tabulate is not a bool
+        """
+        if not isinstance(regular_grammar, RegularGrammar):
+            raise TypeError('regular_grammar must be a RegularGrammar')
+
+        if ignore is None:
+            ignore = set()
+
+        if not isinstance(ignore, (set, frozenset)):
+            raise TypeError('ignore must be a set')
+
+        if not ignore <= set(regular_grammar.expressions):
+            raise ValueError('ignore must only contain types of the grammar')
+
+        if not isinstance(tabulate, bool):
+            raise TypeError('tabulate must be a bool')
+
+        table = regular_grammar.table
+        self._grammar = regular_grammar
+        self._ignore = frozenset(ignore)
+        self._tabulate = tabulate
+        self._states = table.states
+        self._cells = table.cells
+        self._width = table.classes
+        self._start = table.start
+        self._sink = table.sink
+        self._symbol = table.symbol
+        self._classes = tuple(table.symbol(chr(code)) for code in range(256))
+        self._accepts = tuple(table.types[idx] if idx >= 0 else None for idx in table.accepts)
+
+    @property
+    def grammar(self):
+        """Query for the RegularGrammar the lexer tokenizes with.
+
+        Return:
+          RegularGrammar: the grammar given at construction.
+        """
+        return self._grammar
+
+    def _munch(self, chars, position):
+        """Run the DFA from `position` reporting the longest match.
+
+        Args:
+          chars (str): the input text.
+          position (int): the index in chars where matching begins.
+
+        Return:
+          tuple[int, str|None]: the end of the longest (non empty) match and
+            its type, or (-1, None) if there was no match.
+        """
+        cells, width, sink = self._cells, self._width, self._sink
+        classes, accepts, symbol_of = self._classes, self._accepts, self._symbol
+
+        state, last, _type = self._start, -1, None
+        for idx in range(position, len(chars)):
+            code = ord(chars[idx])
+            symbol = classes[code] if code < 256 else symbol_of(chars[idx])
+            if symbol < 0:
+                break
+            state = cells[state * width + symbol]
+            if state == sink:
+                break
+            if accepts[state] is not None:
+                last, _type = idx + 1, accepts[state]
+        return last, _type
+
+    def _munch_tabulating(self, chars, position, failed):
+        """Run the DFA from `position` reporting the longest match.
+
+        Reps' tabulating variant of _munch. Every (state, position) pair passed
+        after the last accepting one cannot lead to a longer match, so they are
+        recorded as failed and the scan stops early should it reach them again.
+
+        Args:
+          chars (str): the input text.
+          position (int): the index in chars where matching begins.
+          failed (set[int]): the (state, position) pairs known to fail, keyed
+              by position * states + state; updated in place.
+
+        Return:
+          tuple[int, str|None]: the end of the longest (non empty) match and
+            its type, or (-1, None) if there was no match.
+        """
+        cells, width, sink, states = self._cells, self._width, self._sink, self._states
+        classes, accepts, symbol_of = self._classes, self._accepts, self._symbol
+
+        state, idx, end, last, _type, trail = self._start, position, len(chars), -1, None, []
+        while idx * states + state not in failed:
+            if idx > position and accepts[state] is not None:
+                last, _type = idx, accepts[state]
+                del trail[:]
+            trail.append(idx * states + state)
+            if idx == end:
+                break
+            code = ord(chars[idx])
+            symbol = classes[code] if code < 256 else symbol_of(chars[idx])
+            if symbol < 0:
+                break
+            state, idx = cells[state * width + symbol], idx + 1
+            if state == sink:
+                break
+
+        # NOTE: the first entry is the last accepting pair, if there was one
+        failed.update(trail[1:] if last >= 0 else trail)
+        return last, _type
+
+    def tokens(self, text, position=0):
+        """Tokenize the text, yielding each token found by maximal munch.
+
+        Bytes are tokenized byte by byte, each byte standing for the character
+        of the same code (i.e. latin-1). Tokens of ignored types are consumed
+        but not yielded. When tabulating, tokenizing takes time linear in the
+        length of the input.
+
+        Args:
+          text (str|bytes): the input to tokenize.
+          position (int): the index in text where tokenizing begins.
+
+        Return:
+          generator[Token]: the tokens of the input in order.
+
+        Raises:
+          TypeError: if text is not a str or bytes
+          TypeError: if position is not an int
+          ValueError: if position is not within the text
+          ValueError: if the input is not recognized at some offset
+        """
+        if not isinstance(text, (str, bytes)):
+            raise TypeError('text must be a str or bytes')
+
+        if not type(position) is type(int()):
+            raise TypeError('position must be an int')
+
+        if position < 0 or position > len(text):
+            raise ValueError('position must be within the text')
+
+        return self._tokens(text, position)
+
+    def _tokens(self, text, position):
+        """The generator behind tokens; arguments are already validated."""
+        chars = text if isinstance(text, str) else text.decode('latin-1')
+        ignore, munch, newline = self._ignore, self._munch, '\n'
+        if self._tabulate:
+            munch = partial(self._munch_tabulating, failed=set())
+        line = chars.count(newline, 0, position) + 1
+        start_of_line = chars.rfind(newline, 0, position) + 1
+
+        end = len(chars)
+        while position < end:
+            last, _type = munch(chars, position)
+            if last < 0:
+                raise ValueError('input not recognized at offset {0} (line {1}, column {2})'
+                                 .format(position, line, position - start_of_line + 1))
+
+            if _type not in ignore:
+                yield Token(_type, text[position:last], position, line,
+                            position - start_of_line + 1)
+
+            newlines = chars.count(newline, position, last)
+            if newlines:
+                line += newlines
+                start_of_line = chars.rfind(newline, position, last) + 1
+            position = last
+
+
+class Node:
+    """A single node of a parse tree built by the Parser.
+
+    Node records the nonterminal derived, the rule used to derive it and the
+    resulting children: the Nodes and Tokens of the rule's right hand side, in
+    order. Like Tokens their attributes are fixed by __slots__.
+    """
+
+    __slots__ = ('symbol', 'rule', 'children')
+
+    def __init__(self, symbol, rule, children):
+        """Construct a Node.
+
+        Args:
+          symbol (str): the nonterminal derived.
+          rule (int): the index of the rule used, into the grammar's rules.
+          children (list[Node|Token]): the derived children, in order.
+        """
+        self.symbol = symbol
+        self.rule = rule
+        self.children = children
+
+    def __repr__(self):
+        return 'Node({0!r}, {1}, {2!r})'.format(self.symbol, self.rule, self.children)
+
+    def __eq__(self, other):
+        if not isinstance(other, Node):
+            return NotImplemented
+        return (self.symbol, self.rule, self.children) == \
+               (other.symbol, other.rule, other.children)
+
+    __hash__ = None
+
+
+class Tree:
+    """A parse tree built by the Parser, stored flat as parallel arrays.
+
+    Tree numbers its nodes in preorder, the root being 0, and records each as
+    one entry of six array('i') columns rather than as an object:
+
+      kind:    the index of the rule deriving the node into the grammar's rules,
+               or for a token ~t where t indexes its type into types.
+      parent:  the node's parent, or -1 for the root.
+      first:   the node's first child, or -1 if it has none.
+      sibling: the node's next sibling, or -1 if it has none.
+      offset:  the index within the input of the node's first token, or -1 if
+               it derives none.
+      length:  the span within the input of the node's tokens, first to last.
+
+    At 24 bytes per node this is a small fraction of the size of a tree of
+    Nodes and Tokens. The columns are plain arrays, so a Tree pickles cheaply
+    and each column's buffer can be copied to and from shared memory as is.
+    """
+
+    __slots__ = ('rules', 'types', 'kind', 'parent', 'first', 'sibling', 'offset', 'length')
+
+    def __init__(self, rules, types):
+        """Construct an empty Tree, whose columns are then to be filled.
+
+        Args:
+          rules (tuple[str]): the nonterminal derived by each rule.
+          types (tuple[str]): the token types.
+        """
+        self.rules = rules
+        self.types = types
+        self.kind = array('i')
+        self.parent = array('i')
+        self.first = array('i')
+        self.sibling = array('i')
+        self.offset = array('i')
+        self.length = array('i')
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __repr__(self):
+        return 'Tree({0} nodes)'.format(len(self))
+
+    def __eq__(self, other):
+        if not isinstance(other, Tree):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in Tree.__slots__)
+
+    __hash__ = None
+
+    def token(self, node):
+        """Query whether the node is a token (leaf) rather than a rule.
+
+        Args:
+          node (int): the node to query.
+
+        Return:
+          bool: True if the node is a token, False otherwise.
+        """
+        return self.kind[node] < 0
+
+    def symbol(self, node):
+        """Query for the nonterminal derived by, or token type of, the node.
+
+        Args:
+          node (int): the node to query.
+
+        Return:
+          str: the nonterminal or token type.
+        """
+        kind = self.kind[node]
+        return self.types[~kind] if kind < 0 else self.rules[kind]
+
+    def text(self, node, source):
+        """Query for the input spanned by the node.
+
+        Args:
+          node (int): the node to query.
+          source (str|bytes): the input the tree was parsed from.
+
+        Return:
+          str|bytes: the span of the input, empty if the node derives no tokens.
+        """
+        offset = self.offset[node]
+        return source[offset:offset+self.length[node]] if offset >= 0 else source[:0]
+
+    def children(self, node):
+        """Iterate over the children of the node, in order.
+
+        Args:
+          node (int): the node to query.
+
+        Return:
+          generator[int]: the children.
+        """
+        child, sibling = self.first[node], self.sibling
+        while child >= 0:
+            yield child
+            child = sibling[child]
+
+    def ancestors(self, node):
+        """Iterate over the ancestors of the node, its parent first.
+
+        Args:
+          node (int): the node to query.
+
+        Return:
+          generator[int]: the ancestors.
+        """
+        node, parent = self.parent[node], self.parent
+        while node >= 0:
+            yield node
+            node = parent[node]
+
+    def walk(self, node=0):
+        """Iterate over the subtree rooted at the node, in preorder.
+
+        Nodes are numbered in preorder, so the subtree of a node is simply the
+        run of nodes following it up to, but excluding, its next sibling or
+        that of its nearest ancestor which has one.
+
+        Args:
+          node (int): the root of the subtree, the whole tree by default.
+
+        Return:
+          range: the nodes of the subtree.
+
+        Raises:
+          IndexError: if the node is not in the tree
+        """
+        if not 0 <= node < len(self):
+            raise IndexError('node out of range')
+        parent, sibling, end = self.parent, self.sibling, node
+        while end >= 0 and sibling[end] < 0:
+            end = parent[end]
+        return range(node, sibling[end] if end >= 0 else len(self))
+
+
+class Parser:
+    """The Parser object responsible for parsing tokens with a ContextFreeGrammar.
+
+    Parser represents the LL(1) parse table of a ContextFreeGrammar ready for
+    execution. Parsing is iterative, driven by an explicit stack of integer
+    symbols (terminals numbered by their column of the table, nonterminals
+    following), so deeply nested input is never limited by recursion. The
+    right hand side of every rule is precomputed reversed, ready to be pushed
+    onto the stack in one go.
+
+    Tokens are anything with a `type` naming a terminal of the grammar, such
+    as the Tokens of a Lexer; a token of any other type is a syntax error.
+    Tokens not meant for the parser (e.g. whitespace) should be left out by
+    the Lexer's ignore set instead.
+    """
+
+    def __init__(self, context_free_grammar):
+        """Construct a Parser from the given ContextFreeGrammar.
+
+        Args:
+          context_free_grammar (ContextFreeGrammar): the grammar to parse with.
+
+        Raises:
+          TypeError: if context_free_grammar is not a ContextFreeGrammar
+          ValueError: if context_free_grammar is not LL(1)
+        """
+        if not isinstance(context_free_grammar, ContextFreeGrammar):
+            raise TypeError('context_free_grammar must be a ContextFreeGrammar')
+
+        table = context_free_grammar.parse_table
+        if table.conflicts:
+            raise ValueError('context_free_grammar must be LL(1)')
+
+        width = len(table.cols)
+        symbols = dict(table.cols)
+        symbols.update((nonterminal, width + row) for nonterminal, row in table.rows.items())
+
+        epsilon = ContextFreeGrammar.epsilon()
+        self._grammar = context_free_grammar
+        self._cells = table.cells
+        self._width = width
+        self._columns = {terminal: col for terminal, col in table.cols.items()
+                         if isinstance(terminal, str)}
+        self._end = table.cols[ContextFreeGrammar.end_of_input()]
+        self._types = tuple(terminal if isinstance(terminal, str) else None
+                            for terminal, _ in sorted(table.cols.items(), key=lambda item: item[1]))
+        self._start = symbols[context_free_grammar.start]
+        self._lhs = tuple(nonterminal for nonterminal, _ in context_free_grammar.rules)
+        self._rhs = tuple(tuple(symbols[symbol] for symbol in reversed(production)
+                                if symbol != epsilon)
+                          for _, production in context_free_grammar.rules)
+        self._lengths = {rule: len(production) for rule, production in enumerate(self._rhs)}
+        self._lengths[None] = -1  # the root's parent, never complete
+        self._enters = tuple(('enter', rule) for rule in range(len(self._rhs)))
+        self._exits = tuple(('exit', rule) for rule in range(len(self._rhs)))
+
+    @property
+    def grammar(self):
+        """Query for the ContextFreeGrammar the parser parses with.
+
+        Return:
+          ContextFreeGrammar: the grammar given at construction.
+        """
+        return self._grammar
+
+    def _terminals(self, tokens):
+        """Pair each token with its terminal, ending with $.
+
+        Raises:
+          ValueError: if a token's type is not a terminal of the grammar
+        """
+        columns = self._columns
+        for token in tokens:
+            terminal = columns.get(token.type)
+            if terminal is None:
+                raise self._unexpected(token)
+            yield terminal, token
+        yield self._end, None
+
+    def derive(self, tokens):
+        """Parse the tokens, yielding the leftmost derivation as it proceeds.
+
+        The derivation is a flat stream of the rules applied, as indices into
+        the grammar's rules, interleaved with the tokens matched. Both it and
+        the tokens are consumed lazily.
+
+        Args:
+          tokens (iterable[Token]): the input to parse.
+
+        Return:
+          generator[int|Token]: the rules applied and tokens matched in order.
+
+        Raises:
+          ValueError: if the tokens are not derivable by the grammar
+        """
+        cells, width, end, rhs = self._cells, self._width, self._end, self._rhs
+        terminals = self._terminals(tokens)
+
+        stack = [end, self._start]
+        terminal, token = next(terminals)
+        while True:
+            top = stack.pop()
+            if top < width:
+                if top != terminal:
+                    raise self._unexpected(token)
+                if top == end:
+                    return
+                yield token
+                terminal, token = next(terminals)
+            else:
+                rule = cells[(top - width) * width + terminal]
+                if rule < 0:
+                    raise self._unexpected(token)
+                yield rule
+                stack.extend(rhs[rule])
+
+    def events(self, tokens):
+        """Parse the tokens, yielding events as the parse tree is walked.
+
+        Each rule applied is bracketed by an ('enter', rule) and an ('exit',
+        rule) event, between which the ('token', token) events of the tokens it
+        derives are yielded, as in a depth first walk of the tree built by
+        parse. Both the events and the tokens are consumed lazily; nothing is
+        buffered. Pending exits of a rule repeatedly deriving itself in tail
+        position (e.g. a list) are counted rather than stacked, so memory stays
+        proportional to the nesting depth of the input rather than its length.
+
+        Args:
+          tokens (iterable[Token]): the input to parse.
+
+        Return:
+          generator[tuple[str, int|Token]]: the enter, token and exit events.
+
+        Raises:
+          ValueError: if the tokens are not derivable by the grammar
+        """
+        cells, width, end, rhs = self._cells, self._width, self._end, self._rhs
+        enters, exits = self._enters, self._exits
+        terminals = self._terminals(tokens)
+
+        stack = [end, self._start]
+        terminal, token = next(terminals)
+        while True:
+            top = stack.pop()
+            if top.__class__ is not int:
+                event = exits[top[0]]
+                for _ in range(top[1]):
+                    yield event
+            elif top < 0:
+                yield exits[~top]
+            elif top < width:
+                if top != terminal:
+                    raise self._unexpected(token)
+                if top == end:
+                    return
+                yield 'token', token
+                terminal, token = next(terminals)
+            else:
+                rule = cells[(top - width) * width + terminal]
+                if rule < 0:
+                    raise self._unexpected(token)
+                yield enters[rule]
+                pending = stack[-1]  # exits are ~rule, or [rule, count] once repeated
+                if pending == ~rule:
+                    stack[-1] = [rule, 2]
+                elif pending.__class__ is list and pending[0] == rule:
+                    pending[1] += 1
+                else:
+                    stack.append(~rule)
+                stack.extend(rhs[rule])
+
+    @staticmethod
+    def _unexpected(token):
+        """The error raised upon the given (or end of input if None) token."""
+        if token is None:
+            return ValueError('unexpected end of input')
+        return ValueError('unexpected token {0!r}'.format(token))
+
+    def parse(self, tokens):
+        """Parse the tokens into a parse tree.
+
+        Args:
+          tokens (iterable[Token]): the input to parse.
+
+        Return:
+          Node: the root of the parse tree, deriving the start nonterminal.
+
+        Raises:
+          ValueError: if the tokens are not derivable by the grammar
+        """
+        lhs, lengths = self._lhs, self._lengths
+
+        root = Node(None, None, [])
+        stack = [root]
+        for event in self.derive(tokens):
+            parent = stack[-1]
+            if event.__class__ is int:
+                node = Node(lhs[event], event, [])
+                parent.children.append(node)
+                stack.append(node)
+                parent = node
+            else:
+                parent.children.append(event)
+            while len(parent.children) == lengths[parent.rule]:
+                stack.pop()
+                parent = stack[-1]
+        return root.children[0]
+
+    def tree(self, tokens):
+        """Parse the tokens into a flat, array encoded, parse tree.
+
+        Args:
+          tokens (iterable[Token]): the input to parse.
+
+        Return:
+          Tree: the parse tree, its root deriving the start nonterminal.
+
+        Raises:
+          ValueError: if the tokens are not derivable by the grammar
+        """
+        tree = Tree(self._lhs, self._types)
+        kinds, firsts, siblings = tree.kind, tree.first, tree.sibling
+        offsets, lengths = tree.offset, tree.length
+        kind, parent, first = kinds.append, tree.parent.append, firsts.append
+        sibling, offset, length = siblings.append, offsets.append, lengths.append
+        columns, sizes = self._columns, self._lengths
+
+        # the open rule nodes, with their last child and count of children to come
+        stack, last, remaining, end = [-1], [-1], [-1], 0
+        for node, event in enumerate(self.derive(tokens)):
+            parent(stack[-1])
+            first(-1)
+            sibling(-1)
+            if last[-1] >= 0:
+                siblings[last[-1]] = node
+            elif node:
+                firsts[stack[-1]] = node
+            last[-1] = node
+            remaining[-1] -= 1
+            if event.__class__ is int:
+                kind(event)
+                offset(-1)
+                length(0)
+                stack.append(node)
+                last.append(-1)
+                remaining.append(sizes[event])
+            else:
+                kind(~columns[event.type])
+                offset(event.offset)
+                length(len(event.value))
+                end = event.offset + len(event.value)
+            while not remaining[-1]:
+                node = stack.pop()
+                last.pop()
+                remaining.pop()
+                child = firsts[node]
+                while child >= 0 and offsets[child] < 0:
+                    child = siblings[child]
+                if child >= 0:
+                    offsets[node] = offsets[child]
+                    lengths[node] = end - offsets[child]
+        return tree
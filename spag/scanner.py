@@ -6,10 +6,13 @@ Finite Automata) recognizing the given input pattern(s). This is done through a
 series of transformations on the input taking it from an expression to an
 epsilon NFA and finally to a minimal DFA.
 """
-from copy import deepcopy
+from array import array
+from bisect import bisect_left, bisect_right
 from enum import Enum, unique
+from itertools import count
 from string import printable
-from uuid import uuid4
+from types import MappingProxyType
+from spag.cache import Cache
 
 
 @unique
@@ -35,6 +38,257 @@ class _RegularGrammarOperators(Enum):
     RIGHT_INTERVAL = 12      # }
 
 
+class _LazyDFAState:
+    """A single DFA state discovered on demand by the _LazyDFA.
+
+    _LazyDFAState represents a set of NFA states along with the index of the
+    highest priority type it accepts, if any, the generation of the cache it
+    belongs to and the transitions out of the state, by character class, which
+    have been discovered (cached) so far.
+    """
+
+    __slots__ = ('subset', 'accept', 'generation', 'transitions')
+
+    def __init__(self, subset, accept, generation):
+        self.subset = subset
+        self.accept = accept
+        self.generation = generation
+        self.transitions = {}
+
+
+class _LazyDFA:
+    """The _LazyDFA performs subset construction on demand while matching.
+
+    _LazyDFA keeps the (merged) NFA of a RegularGrammar and only creates the
+    DFA states which the input actually reaches, caching them for reuse. The
+    cache is bounded; once it is full it is flushed entirely and rebuilt as
+    needed, in the spirit of RE2, which bounds memory while keeping the hot
+    paths running at DFA speed. Every flush starts a new generation; states of
+    an older generation are never linked to again, so the states reachable
+    from the start state are always within the cache.
+    """
+
+    def __init__(self, nfa, names, capacity):
+        """Construct a lazy DFA over the given NFA.
+
+        Args:
+          nfa (tuple): the NFA as produced by RegularGrammar._ranges.
+          names (tuple[str]): the expression types in order of priority.
+          capacity (int): the maximum number of DFA states to cache.
+        """
+        _, V, T, E, S, _, G = nfa
+
+        cache = dict()
+        self._delta = {}
+        for (source, symbol, dest) in T:
+            moves = self._delta[source] = self._delta.get(source, {})
+            moves[symbol] = moves.get(symbol, frozenset()) | \
+                            RegularGrammar._e_closure(dest, E, cache)
+
+        self._lows = [ranges[0][0] for ranges in V]
+        self._highs = [ranges[0][1] for ranges in V]
+
+        self._priority = {}
+        for priority, name in reversed(list(enumerate(names))):
+            for state in G[name]:
+                self._priority[state] = priority
+
+        self._capacity = capacity
+        self._cache = {}
+        self._generation = 0
+        self._start = self._state(frozenset(RegularGrammar._e_closure(S, E, cache)))
+
+    def _state(self, subset):
+        """Find the cached DFA state of the given subset, creating it if new."""
+        state = self._cache.get(subset)
+        if state is None:
+            if len(self._cache) >= self._capacity:
+                self._flush()
+            accept = min((self._priority[q] for q in subset if q in self._priority),
+                         default=None)
+            state = self._cache[subset] = _LazyDFAState(subset, accept, self._generation)
+        return state
+
+    def _flush(self):
+        """Evict every cached DFA state along with their transitions."""
+        for state in self._cache.values():
+            state.transitions.clear()
+        self._cache.clear()
+        self._generation += 1
+
+    def _step(self, state, symbol):
+        """Compute (and cache) the transition of `state` on class `symbol`."""
+        subset = set()
+        for q in state.subset:
+            subset.update(self._delta.get(q, {}).get(symbol, ()))
+        _state = self._state(frozenset(subset))
+        if state.generation == self._generation:  # not evicted meanwhile
+            state.transitions[symbol] = _state
+        return _state
+
+    @property
+    def size(self):
+        """The number of DFA states currently cached."""
+        return len(self._cache)
+
+    def match(self, text, position):
+        """Find the longest match starting at `position` of `text`.
+
+        Return:
+          tuple[int, int]|None: the priority of the matched type and the end
+            position of the match, or None if there was no match.
+        """
+        if self._start.generation != self._generation:
+            self._start = self._state(self._start.subset)
+
+        state, match = self._start, None
+        if state.accept is not None:
+            match = (state.accept, position)
+        lows, highs = self._lows, self._highs
+        for idx in range(position, len(text)):
+            code = ord(text[idx])
+            symbol = bisect_right(lows, code) - 1
+            if symbol < 0 or code > highs[symbol]:
+                break
+            state = state.transitions.get(symbol) or self._step(state, symbol)
+            if not state.subset:
+                break
+            if state.accept is not None:
+                match = (state.accept, idx+1)
+        return match
+
+
+class TransitionTable(bytes):
+    """The TransitionTable is a compact, immutable encoding of a minimal DFA.
+
+    TransitionTable stores the DFA's transitions as a flat buffer of fixed
+    width (native byte order) integers in row-major state x class order, so
+    the next state of `state` on a character of class `symbol` is found at
+    `state * classes + symbol`. States are integers, the start state and sink
+    (error) state are given by id, and the highest priority type accepted by
+    each state is kept in a separate vector. Being bytes, the table supports
+    the buffer protocol and can be handed to generators and runtimes as is.
+    """
+
+    def __new__(cls, cells, classes, start, sink, accepts, types, ranges):
+        """Construct a TransitionTable from the given (flattened) DFA.
+
+        Args:
+          cells (list[int]): the next state of every state and class pair, in
+              row-major state x class order.
+          classes (int): the number of character classes (columns).
+          start (int): the start state of the DFA.
+          sink (int): the sink (error) state of the DFA, or -1 if none.
+          accepts (list[int]): the index into types of the highest priority
+              type accepted by each state, or -1 if the state does not accept.
+          types (tuple[str]): the names of the types in order of priority.
+          ranges (list[tuple[int, int, int]]): the sorted, inclusive character
+              code ranges and their class.
+
+        Return:
+          TransitionTable: the compact table.
+        """
+        typecode = 'H' if max(cells, default=0) < 1 << 16 else 'I'
+        table = super().__new__(cls, array(typecode, cells).tobytes())
+        table._typecode = typecode
+        table._cells = memoryview(table).cast(typecode)
+        table._classes = classes
+        table._start = start
+        table._sink = sink
+        table._accepts = memoryview(array('h', accepts).tobytes()).cast('h')
+        table._types = types
+        table._ranges = tuple(ranges)
+        table._lows = tuple(low for (low, _, _) in ranges)
+        return table
+
+    def __reduce__(self):
+        """Rebuild the table from plain data when pickled or copied."""
+        return (self.__class__, (self._cells.tolist(), self._classes, self._start, self._sink,
+                                 self._accepts.tolist(), self._types, list(self._ranges)))
+
+    def _fields(self):
+        """Every field identifying the table, for comparison and hashing."""
+        return (self._typecode, bytes(self), self._classes, self._start, self._sink,
+                self._accepts.tobytes(), self._types, self._ranges)
+
+    def __eq__(self, other):
+        if not isinstance(other, TransitionTable):
+            return False
+        return self._fields() == other._fields()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    @property
+    def typecode(self):
+        """The array typecode of the cells; 'H' or 'I'."""
+        return self._typecode
+
+    @property
+    def cells(self):
+        """A read only view of the cells as integers."""
+        return self._cells
+
+    @property
+    def states(self):
+        """The number of states (rows) in the table."""
+        return len(self._cells) // self._classes if self._classes else len(self._accepts)
+
+    @property
+    def classes(self):
+        """The number of character classes (columns) in the table."""
+        return self._classes
+
+    @property
+    def start(self):
+        """The start state of the DFA."""
+        return self._start
+
+    @property
+    def sink(self):
+        """The sink (error) state of the DFA, or -1 if there is none."""
+        return self._sink
+
+    @property
+    def accepts(self):
+        """A read only view of the type index accepted by each state, or -1."""
+        return self._accepts
+
+    @property
+    def types(self):
+        """The names of the types in order of priority."""
+        return self._types
+
+    def symbol(self, char):
+        """Find the character class of `char`, or -1 if outside the alphabet."""
+        code = ord(char)
+        idx = bisect_right(self._lows, code) - 1
+        if idx < 0 or code > self._ranges[idx][1]:
+            return -1
+        return self._ranges[idx][2]
+
+    def next_state(self, state, char):
+        """Find the state reached from `state` on `char`.
+
+        Characters outside of the alphabet lead to the sink state, as does any
+        character from the sink (or -1) itself.
+        """
+        symbol = self.symbol(char)
+        if symbol < 0 or state < 0 or state == self._sink:
+            return self._sink
+        return self._cells[state * self._classes + symbol]
+
+    def accept(self, state):
+        """Find the highest priority type accepted by `state`, or None."""
+        if state < 0:
+            return None
+        idx = self._accepts[state]
+        return self._types[idx] if idx >= 0 else None
+
+
 class RegularGrammar:
     """The RegularGrammar object responsible for creating the minimal DFA.
 
@@ -47,7 +301,7 @@ class RegularGrammar:
     through the exposed read only properties.
     """
 
-    def __init__(self, name, expressions):
+    def __init__(self, name, expressions, construction='thompson', lazy=0, cache=None):
         """Construct a scanner DFA given the input regular expressions.
 
         Attempt to initialize a RegularGrammar object with the specified name,
@@ -82,8 +336,29 @@ class RegularGrammar:
              expression(s).
 
         The input is then taken through a series of transformations taking it
-        from a regular expression to an epsilon NFA and finally to a minimal
-        DFA. The final minimal DFA produced will be minimized with respect to
+        from a regular expression to an NFA and finally to a minimal DFA. The
+        NFA is built using one of the following constructions:
+
+            * 'thompson' (epsilon NFA with two states per character)
+            * 'glushkov' (epsilon free position automaton with one state per
+                          character)
+
+        Both constructions result in the same minimal DFA, however the
+        position automaton avoids epsilon closures entirely and typically
+        produces a smaller NFA for subset construction.
+
+        If lazy is given the minimal DFA is not constructed up front. Instead
+        the NFA is kept and DFA states are created only as the input given to
+        match reaches them, caching at most `lazy` states at any one time. The
+        full minimal DFA is still built, only once, if any of the DFA
+        properties are queried.
+
+        If cache is given the minimal DFA is stored within that directory,
+        addressed by the expressions and SPaG version, and loaded from there
+        rather than recomputed whenever the same expressions are given again.
+        A cached DFA is always loaded eagerly.
+
+        The final minimal DFA produced will be minimized with respect to
         unreachable and nondistinguishable states. It will also have a total
         delta (transition) function, possibly including an sink/error state if
         necessary. It will also include a dictionary mapping the named input
@@ -95,10 +370,22 @@ class RegularGrammar:
           expressions (dict[str, list[str, _RegularGrammarOperators]]): token
               name/type and there pattern(s). str should be of length one
               (a character).
+          construction (str): the NFA construction to use; 'thompson' if not
+              specified (default), otherwise 'glushkov'.
+          lazy (int): the maximum number of DFA states to cache when matching
+              lazily; 0 if not specified (default) to build the DFA eagerly.
+          cache (str): the directory of the compile cache; None if not
+              specified (default) to always compile.
 
         Raises:
           TypeError: if name is not a string
           ValueError: if name is empty
+          TypeError: if construction is not a string
+          ValueError: if construction is not recognized
+          TypeError: if lazy is not an int
+          ValueError: if lazy is negative
+          TypeError: if cache is not a string
+          ValueError: if cache is empty
           TypeError: if expressions is not a dict
           ValueError: if expressions is empty
           TypeError: if token identifier/type is not a string
@@ -113,7 +400,7 @@ class RegularGrammar:
           ValueError: Invalid interval, min must be less than max.
           ValueError: Negative interval.
           ValueError: Invalid group for interval expression.
-          ValueError: Feature limited to character/group expressions.
+          ValueError: Feature limited to character/class/group expressions.
           TypeError: Interval expression characters must be integers.
           ValueError: Only two numbers required for interval expressions.
           TypeError: Integers only permitted inside interval expressions.
@@ -146,15 +433,36 @@ class RegularGrammar:
 
         self._name = name
 
+        if not isinstance(construction, str):
+            raise TypeError('construction must be a string')
+
+        if construction not in ('thompson', 'glushkov'):
+            raise ValueError('construction type not recognized')
+
+        construct = {
+            'thompson': RegularGrammar._nfa,
+            'glushkov': RegularGrammar._glushkov,
+        }[construction]
+
+        if not type(lazy) is type(int()):
+            raise TypeError('lazy must be an int')
+
+        if lazy < 0:
+            raise ValueError('lazy must be non negative')
+
+        if cache is not None and not isinstance(cache, str):
+            raise TypeError('cache must be a string')
+
+        if cache is not None and not cache:
+            raise ValueError('cache must be non empty')
+
         if not isinstance(expressions, dict):
             raise TypeError('expressions must be a dict')
 
         if not expressions:
             raise ValueError('expressions must be non empty')
 
-        self._expressions = {}
-
-        nfa = []
+        _expressions = {}
         for identifier in expressions:
             pattern = expressions[identifier]
             if not isinstance(identifier, str):
@@ -177,25 +485,35 @@ class RegularGrammar:
                 if isinstance(character, str) and len(character) != 1:
                     raise ValueError('pattern character str must be non empty')
 
-            self._expressions[identifier] = pattern[:]
+            _expressions[identifier] = tuple(pattern)
+
+        self._expressions = MappingProxyType(_expressions)
+        self._names = tuple(_expressions)
 
+        self._cache, self._key = None, None
+        self._lazy, self._nfa, self._dfa = None, None, None
+        if cache is not None:
+            self._cache = Cache(cache)
+            self._key = Cache.key('RegularGrammar', list(self._expressions.items()))
+            dfa = self._cache.load(self._key)
+            if dfa is not None:
+                self._link(*dfa)
+                return
+
+        nfa, states = [], count()
+        for identifier, pattern in self._expressions.items():
+            pattern = RegularGrammar._expand_char_class_range(list(pattern))
             pattern = RegularGrammar._expand_intervals(pattern)
-            pattern = RegularGrammar._expand_char_class_range(pattern)
             pattern = RegularGrammar._expand_concat(pattern)
             pattern = RegularGrammar._shunt(pattern)
 
-            nfa.append((RegularGrammar._nfa(identifier, pattern)))
-
-        Q, V, T, S, F, G = RegularGrammar._dfa(*RegularGrammar._merge_nfa(nfa))
-        Q, V, T, S, F, G = RegularGrammar._total(Q, V, T, S, F, G)
-        Q, V, T, S, F, G = RegularGrammar._alpha(*RegularGrammar._hopcroft(Q, V, T, S, F, G))
+            nfa.append(construct(identifier, pattern, states))
 
-        self._states = Q
-        self._alphas = V
-        self._deltas = T
-        self._start = S
-        self._finals = F
-        self._types = G
+        self._nfa = RegularGrammar._ranges(*RegularGrammar._merge_nfa(nfa, states))
+        if lazy:
+            self._lazy = _LazyDFA(self._nfa, self._names, lazy)
+        else:
+            self._compile()
 
     @staticmethod
     def kleene_star():
@@ -357,113 +675,336 @@ class RegularGrammar:
     def name(self):
         """Query for the name of the scanner.
 
-        A readonly property which copies the scanners's name to protect against
-        user mutations.
+        A readonly property returning the scanner's (immutable) name.
 
         Return:
           str: The given input name of the scanner.
         """
-        return deepcopy(self._name)
+        return self._name
 
     @property
     def expressions(self):
         """Query for the patterns recognized by the scanner.
 
-        A readonly property which copies the scanners's token name/expression
-        pairs to protect against user mutations.
+        A readonly property returning an immutable view of the scanner's token
+        name/expression pairs, so no copy is made.
 
         Return:
-          dict[str, list[str, int]]: the token name/expression pairs
+          mappingproxy[str, tuple[str, int]]: the token name/expression pairs
         """
-        return deepcopy(self._expressions)
+        return self._expressions
 
     @property
     def states(self):
         """Query for states in the grammars equivalent minimal DFA.
 
-        A readonly property which copies the scanner's states to protect against
-        user mutation.
+        A readonly property returning the scanner's states as an immutable set,
+        so no copy is made.
 
         Return:
-          set[str]: all possible states in the resulting DFA.
+          frozenset[str]: all possible states in the resulting DFA.
         """
-        return deepcopy(self._states)
+        self._compile()
+        return self._states
 
     @property
     def alphabet(self):
         """Query for alphabet of characters recognized by the grammars DFA.
 
-        A readonly property which copies the scannner's alphabet to protect
-        against user mutation.
+        A readonly property returning the scanner's alphabet as an immutable
+        set, so no copy is made. The set holds every character, so it is only
+        built upon first query; classes describes the same characters as
+        ranges.
+
+        Return:
+          frozenset[str]: all possible input characters to the resulting DFA.
+        """
+        self._compile()
+        if self._alphabet is None:
+            self._alphabet = frozenset(self._symbols())
+        return self._alphabet
+
+    @property
+    def classes(self):
+        """Query for the character classes of the grammars DFA.
+
+        A readonly property returning the scanner's character classes as
+        nested tuples, so no copy is made. Every character within a class behaves
+        identically in every state of the DFA, so the class index is also the
+        row of the character within the transition table. This allows a compact
+        character to class lookup (e.g. for the first 256 characters) to drive
+        a class indexed table.
 
         Return:
-          set[str]: all possible input characters to the resulting DFA.
+          tuple[tuple[tuple[int, int]]]: the sorted, inclusive character code
+            ranges belonging to each class.
         """
-        return deepcopy(self._alphas)
+        self._compile()
+        return self._alphas
 
     @property
     def transitions(self):
         """Query for the state transitions defining the grammars DFA.
 
-        A readonly property which copies the scannner's transitions to protect
-        against user mutation.
+        A readonly property returning immutable views of the scanner's
+        transitions, so no copy is made. The table is indexed by character
+        class, so all characters of the same class map to the same row of the
+        table. The character to row mapping is only built upon first query.
 
         Return:
-          tuple[dict[str, int], dict[str, int], list[list[str]]]: the DFA
-            encoded as a table.
+          tuple[mappingproxy[str, int], mappingproxy[str, int],
+                tuple[tuple[str]]]: the DFA encoded as a table.
         """
-        return deepcopy(self._deltas)
+        self._compile()
+        if self._deltas is None:
+            states, table = self._rows
+            self._deltas = (states, self._symbols(), table)
+        return self._deltas
 
     @property
     def start(self):
         """Query for the start state of the grammars DFA.
 
-        A readonly property which copies the scanner's start state to protect
-        against user manipulation.
+        A readonly property returning the scanner's (immutable) start state.
 
         Return:
           str: the start state of the grammars DFA.
         """
-        return deepcopy(self._start)
+        self._compile()
+        return self._start
 
     @property
     def accepting(self):
         """Query for all accepting states of the grammars DFA.
 
-        A readonly property which copies the scanner's accepting states to
-        protect against user manipulation.
+        A readonly property returning the scanner's accepting states as an
+        immutable set, so no copy is made.
 
         Return:
-          set[str]: the resulting DFA's accepting states.
+          frozenset[str]: the resulting DFA's accepting states.
         """
-        return deepcopy(self._finals)
+        self._compile()
+        return self._finals
 
     @property
     def types(self):
         """Query for the dictionary labeling all types to ther final state(s).
 
-        A readonly property which copies the scanner's types to protect against
-        user manipulation.
+        A readonly property returning an immutable view of the scanner's types,
+        so no copy is made.
 
         Return:
-          dict[str, set[str]]: the resulting DFA's token types.
+          mappingproxy[str, frozenset[str]]: the resulting DFA's token types.
         """
-        return deepcopy(self._types)
+        self._compile()
+        return self._types
+
+    @property
+    def table(self):
+        """Query for the compact transition table of the grammars DFA.
+
+        A readonly property returning the scanner's DFA encoded as an
+        (immutable) TransitionTable, so no copy is made. Unlike transitions,
+        states are integers and the table is a flat buffer of row-major state x
+        class cells, suitable to hand to generators and runtimes as is.
+
+        Return:
+          TransitionTable: the resulting DFA as a compact table.
+        """
+        self._compile()
+        return self._table
+
+    def match(self, text, position=0):
+        """Find the longest prefix of the text recognized by the grammar.
+
+        Run the DFA over the text starting from the given position, reporting
+        the longest (maximal munch) match found. When the grammar is lazy the
+        DFA states are discovered, and cached, as the text reaches them.
+        Should a match be recognized by multiple types, the type given first in
+        the expressions takes priority.
+
+        Args:
+          text (str): the input text to match against.
+          position (int): the index in text where matching begins.
+
+        Return:
+          tuple[str, int]|None: the matched type and the end position of the
+            match in text, or None if no match was found.
+
+        Raises:
+          TypeError: if text is not a string
+          TypeError: if position is not an int
+          ValueError: if position is not within the text
+        """
+        if not isinstance(text, str):
+            raise TypeError('text must be a string')
+
+        if not type(position) is type(int()):
+            raise TypeError('position must be an int')
+
+        if position < 0 or position > len(text):
+            raise ValueError('position must be within the text')
+
+        if self._lazy is not None:
+            match = self._lazy.match(text, position)
+            return (self._names[match[0]], match[1]) if match else None
+
+        table = self._table
+        cells, width, accepts, sink = table.cells, table.classes, table.accepts, table.sink
+
+        state, match = table.start, None
+        if accepts[state] >= 0:
+            match = (table.types[accepts[state]], position)
+        for idx in range(position, len(text)):
+            symbol = table.symbol(text[idx])
+            if symbol < 0:
+                break
+            state = cells[state * width + symbol]
+            if state == sink:
+                break
+            if accepts[state] >= 0:
+                match = (table.types[accepts[state]], idx+1)
+        return match
+
+    def _compile(self):
+        """Construct the minimal DFA from the NFA, if not already done.
+
+        Take the NFA through subset construction, totalization, and
+        minimization to produce the minimal DFA which all properties are
+        derived from, storing it in the cache if one was given. For eager (not
+        lazy) grammars the NFA is no longer needed and is released afterward.
+        """
+        if self._dfa is not None:
+            return
+
+        Q, V, T, E, S, F, G = self._nfa
+        Q, V, T, S, F, G = RegularGrammar._dfa(Q, V, T, E, S, F, G)
+        Q, V, T, S, F, G = RegularGrammar._classes(*RegularGrammar._total(Q, V, T, S, F, G))
+        Q, V, T, S, F, G = RegularGrammar._classes(*RegularGrammar._hopcroft(Q, V, T, S, F, G))
+        self._link(Q, V, T, S, F, G)
+
+        if self._cache is not None:
+            self._cache.store(self._key, (Q, V, T, S, F, G))
+
+        if self._lazy is None:
+            self._nfa = None
+
+    def _link(self, Q, V, T, S, F, G):
+        """Derive everything the properties and matching need from the DFA.
+
+        Args:
+          Q (set[int]): states of the minimal DFA.
+          V (list[tuple[tuple[int, int]]]): ranges of each character class.
+          T (list[list[int]]): transition table indexed by class then state.
+          S (int): start state of the DFA.
+          F (set[int]): accepting states of the DFA.
+          G (dict[str, set[int]]): types and the states accepting them.
+        """
+        self._dfa = (Q, V, T, S, F, G)
+
+        # highest priority type accepted by each state; class of each range
+        accepts = [-1 for _ in Q]
+        for idx in reversed(range(len(self._names))):
+            for state in G.get(self._names[idx], set()):
+                accepts[state] = idx
+        ranges = sorted((low, high, symbol) for symbol, ranges in enumerate(V)
+                        for (low, high) in ranges)
+        sink = min(G.get('_sink', set([-1])))
+        cells = [T[symbol][state] for state in range(len(Q)) for symbol in range(len(V))]
+        self._table = TransitionTable(cells, len(V), S, sink, accepts, self._names, ranges)
+
+        # NOTE: properties hand out these (immutable) structures directly.
+        Q, V, (states, table), S, F, G = RegularGrammar._alpha(Q, V, T, S, F, G)
+        self._states = frozenset(Q)
+        self._alphas = tuple(tuple(ranges) for ranges in V)
+        self._rows = (MappingProxyType(states), tuple(tuple(row) for row in table))
+        self._symbol_map, self._alphabet, self._deltas = None, None, None
+        self._start = S
+        self._finals = frozenset(F)
+        self._types = MappingProxyType({name: frozenset(G[name]) for name in G})
+
+    def _symbols(self):
+        """Map every character of the alphabet to its row in the table.
+
+        The mapping holds an entry per character, which for wide ranges of
+        unicode is large, so it is only built upon first query (of alphabet or
+        transitions) and shared thereafter.
+
+        Return:
+          mappingproxy[str, int]: the table row (symbol) index for each
+            character.
+        """
+        if self._symbol_map is None:
+            self._symbol_map = MappingProxyType({
+                chr(code):symbol for symbol, ranges in enumerate(self._alphas)
+                for (low, high) in ranges for code in range(low, high+1)})
+        return self._symbol_map
+
+    @staticmethod
+    def _merge_ranges(ranges):
+        """sort and coalesce a collection of inclusive character code ranges.
+
+        Args:
+          ranges (Iterable[tuple[int, int]]): possibly overlapping inclusive
+              ranges of character codes.
+
+        Return:
+          tuple[tuple[int, int]]: sorted, disjoint, non adjacent ranges covering
+              exactly the same character codes as the input.
+        """
+        merged = []
+        for (low, high) in sorted(ranges):
+            if merged and low <= merged[-1][1] + 1:
+                if high > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], high)
+            else:
+                merged.append((low, high))
+        return tuple(merged)
+
+    @staticmethod
+    def _negate_ranges(ranges):
+        """find the printable ascii characters not covered by the given ranges.
+
+        Args:
+          ranges (tuple[tuple[int, int]]): sorted, disjoint and non adjacent
+              inclusive ranges of character codes.
+
+        Return:
+          tuple[tuple[int, int]]: the printable character codes not covered by
+              the input ranges as sorted, disjoint, non adjacent ranges.
+        """
+        negated = []
+        for (low, high) in RegularGrammar._merge_ranges((ord(c), ord(c)) for c in printable):
+            for (_low, _high) in ranges:
+                if _high < low or _low > high:
+                    continue
+                if _low > low:
+                    negated.append((low, _low-1))
+                low = _high+1
+                if low > high:
+                    break
+            if low <= high:
+                negated.append((low, high))
+        return tuple(negated)
 
     @staticmethod
     def _expand_char_class_range(expr):
         """expand any character classes/ranges present in the expression.
 
         Expand the internal representation of the expression so that
-        character classes and ranges are eliminated.
+        character classes and ranges are replaced by a single operand holding
+        the sorted and disjoint inclusive character code ranges the class
+        accepts. The ranges are never expanded into the individual characters
+        they cover, so their cost does not grow with the size of the range.
 
         Args:
           expr (list[str, int]): an internal representation of a regular
               expression possible with character ranges and/or classes.
 
         Return:
-          list[str, int]: an internal representation of a regular expression
-              with all character classes and ranges elimintated.
+          list[str, int, tuple[tuple[int, int]]]: an internal representation of
+              a regular expression with all character classes and ranges
+              replaced by character code range operands.
 
         Raises:
           ValueError: if a recursive class/range is specified.
@@ -476,6 +1017,7 @@ class RegularGrammar:
           ValueError: if character range has no starting character specified.
           ValueError: if character range is immediately followed by the same.
           ValueError: if an operator other than range or negation appears in the range/class.
+          TypeError: if an integer appears in the range/class.
           ValueError: if character range has no ending character specified.
         """
         output, literals = [], []
@@ -491,16 +1033,13 @@ class RegularGrammar:
                 if prange:
                     raise ValueError('Character range no specified end character')
                 expand = False
+                literals = RegularGrammar._merge_ranges(literals)
                 if negation:
                     negation = False
-                    literals = set(printable) - set(literals)
+                    literals = RegularGrammar._negate_ranges(literals)
                 if not literals:
                     raise ValueError('Empty character range/class not allowed')
-                output.append(RegularGrammar.left_group())
-                for literal in literals:
-                    output.append(literal)
-                    output.append(RegularGrammar.alternative())
-                output[-1] = RegularGrammar.right_group()
+                output.append(literals)
                 literals = []
             elif char is RegularGrammar.character_negation():
                 if not expand:
@@ -519,12 +1058,16 @@ class RegularGrammar:
             elif expand:
                 if isinstance(char, _RegularGrammarOperators):
                     raise ValueError('Operator not allowed in character range/class')
+                if type(char) is type(int()):
+                    raise TypeError('Integers only permitted inside interval expressions.')
                 if prange:
                     prange = False
-                    _char = literals.pop()
-                    literals.extend([chr(idx) for idx in range(ord(min(_char, char)), ord(max(_char, char))+1)])
+                    low, high = literals.pop()
+                    if low < high:
+                        literals.append((low, high-1))
+                    literals.append((min(high, ord(char)), max(high, ord(char))))
                 else:
-                    literals.append(char)
+                    literals.append((ord(char), ord(char)))
             else:
                 output.append(char)
         if expand:
@@ -536,15 +1079,17 @@ class RegularGrammar:
         """expand any intervals present in the expression.
 
         Expand the internal representation of the expression so that
-        intervals are eliminated.
+        intervals are eliminated. Bounded intervals are expanded into the
+        mandatory copies followed by nested optional copies, keeping the
+        expansion linear in the upper bound of the interval.
 
         Args:
-          expr (list[str, int]): an internal representation of a regular
-              expression possibly using intervals.
+          expr (list[str, int, tuple[tuple[int, int]]]): an internal
+              representation of a regular expression possibly using intervals.
 
         Return:
-          list[str, int]: an internal representation of a regular expression
-              with interval brackets expanded throughout.
+          list[str, tuple[tuple[int, int]]]: an internal representation of a
+              regular expression with interval brackets expanded throughout.
 
         Raises:
           ValueError: Recursive interval expressions not valid.
@@ -553,7 +1098,7 @@ class RegularGrammar:
           ValueError: Invalid interval, min must be less than max.
           ValueError: Negative interval.
           ValueError: Invalid group for interval expression.
-          ValueError: Feature limited to character/group expressions.
+          ValueError: Feature limited to character/class/group expressions.
           TypeError: Interval expression characters must be integers.
           ValueError: Only two numbers required for interval expressions.
           TypeError: Integers only permitted inside interval expressions.
@@ -578,45 +1123,36 @@ class RegularGrammar:
                 if _min < 0:
                     raise ValueError('Negative interval.')
                 expression = None
-                if isinstance(output[end], str):
+                if isinstance(output[end], (str, tuple)):
                     expression = [output[end]]
                     begin = end
                 elif output[end] is RegularGrammar.right_group():
-                    count = 0
+                    depth = 0
                     for _idx in range(end, -1, -1):
                         if output[_idx] is RegularGrammar.right_group():
-                            count -= 1
+                            depth -= 1
                         if output[_idx] is RegularGrammar.left_group():
-                            count += 1
-                        if not count:
+                            depth += 1
+                        if not depth:
                             begin = _idx
                             expression = output[begin:end+1]
                             break
                     if not expression:
                         raise ValueError('Invalid group for interval expression.')
                 else:
-                    raise ValueError('Feature limited to character/group expressions.')
+                    raise ValueError('Feature limited to character/class/group expressions.')
                 expanded = None
                 if _max is None:  # {n}
                     expanded = expression * _min
                 elif not _max:  # {n,0}
                     expanded = expression *_min
                     expanded.append(RegularGrammar.kleene_plus())
-                else:  # {n,m}
-                    maybe = False
-                    if not _min:
-                        maybe = True
-                        _min = 1
-                    expanded = [RegularGrammar.left_group()]
-                    for repetitions in range(_min, _max+1):
-                        _expanded = [RegularGrammar.left_group()]
-                        _expanded.extend(expression * repetitions)
-                        _expanded.append(RegularGrammar.right_group())
-                        _expanded.append(RegularGrammar.alternative())
-                        expanded.extend(_expanded)
-                    expanded[-1] = RegularGrammar.right_group()
-                    if maybe:
-                        expanded.append(RegularGrammar.maybe())
+                else:  # {n,m} -> x^n (x(x(...)?)?)?
+                    optional = _max - _min
+                    expanded = expression * _min
+                    expanded.extend(([RegularGrammar.left_group()] + expression) * optional)
+                    expanded.extend([RegularGrammar.right_group(),
+                                     RegularGrammar.maybe()] * optional)
                 output = output[:begin]  # cut the expression already in the output q
                 output.extend(expanded)
                 interval, _min, _max = False, None, None
@@ -657,7 +1193,7 @@ class RegularGrammar:
             if output[-1] is not RegularGrammar.left_group() and \
                 output[-1] is not RegularGrammar.alternative() and \
                 output[-1] is not RegularGrammar.concatenation() and \
-                (elem is RegularGrammar.left_group() or isinstance(elem, str)):
+                (elem is RegularGrammar.left_group() or isinstance(elem, (str, tuple))):
                 output.append(RegularGrammar.concatenation())
             output.append(elem)
         return output
@@ -721,18 +1257,7 @@ class RegularGrammar:
         return queue
 
     @staticmethod
-    def _state():
-        """Generate a new universally unique state label.
-
-        The state label is a string prepresentation of a UUID type 4.
-
-        Return:
-          str: a unique state name
-        """
-        return str(uuid4())
-
-    @staticmethod
-    def _nfa(name, expr):
+    def _nfa(name, expr, states):
         """convert a postfix notation regular expression to an epsilon NFA.
 
         Attempt to convert an internal representation of a regular expression
@@ -746,16 +1271,19 @@ class RegularGrammar:
 
         Args:
           name (str): the identifier/type of the expression.
-          expr (list[str, int]): a regular expression in postfix notation.
+          expr (list[str, int, tuple[tuple[int, int]]]): a regular expression
+              in postfix notation.
+          states (Iterator[int]): the shared source of fresh state identifiers.
 
         Return:
-          set[str]: the set of states, Q
-          set[str]: the set of alphabet characters, V
-          set[tuple[str, str, str]]: the set of state transitions, T
-          dict[str, set[str]]: the set of epsilon transitions, E
-          str: the start state, S
-          str: the final state, F
-          dict[str, str]: map of identifier/type to final state, G
+          set[int]: the set of states, Q
+          set[tuple[tuple[int, int]]]: the set of character code ranges, V
+          set[tuple[int, tuple[tuple[int, int]], int]]: the set of state
+              transitions, T
+          dict[int, set[int]]: the set of epsilon transitions, E
+          int: the start state, S
+          set[int]: the final state, F
+          dict[str, set[int]]: map of identifier/type to final state, G
 
         Raises:
           ValueError: if concatentation is supplied with improper arguments
@@ -791,7 +1319,7 @@ class RegularGrammar:
                     raise ValueError('Error: not enough args to op |')
                 p, q = stk.pop()
                 r, t = stk.pop()
-                S, F = RegularGrammar._state(), RegularGrammar._state()
+                S, F = next(states), next(states)
                 e_update(S, p)
                 e_update(S, r)
                 e_update(q, F)
@@ -800,7 +1328,7 @@ class RegularGrammar:
                 if not stk:
                     raise ValueError('Error: not enough args to op *')
                 p, q = stk.pop()
-                S, F = RegularGrammar._state(), RegularGrammar._state()
+                S, F = next(states), next(states)
                 e_update(S, p)
                 e_update(q, p)
                 e_update(q, F)
@@ -809,7 +1337,7 @@ class RegularGrammar:
                 if not stk:
                     raise ValueError('Error: not enough args to op +')
                 p, q = stk.pop()
-                S, F = RegularGrammar._state(), RegularGrammar._state()
+                S, F = next(states), next(states)
                 e_update(S, p)
                 e_update(q, p)
                 e_update(q, F)
@@ -817,12 +1345,14 @@ class RegularGrammar:
                 if not stk:
                     raise ValueError('Error: not enough args to op ?')
                 p, q = stk.pop()
-                S, F = RegularGrammar._state(), RegularGrammar._state()
+                S, F = next(states), next(states)
                 e_update(S, p)
                 e_update(S, F)
                 e_update(q, F)
-            else:  # it's a character
-                S, F = RegularGrammar._state(), RegularGrammar._state()
+            else:  # it's a character (range)
+                if isinstance(token, str):
+                    token = ((ord(token), ord(token)),)
+                S, F = next(states), next(states)
                 V.add(token)
                 T.add((S, token, F))
             Q.update([S, F])
@@ -831,11 +1361,111 @@ class RegularGrammar:
         if len(stk) != 1:
             raise ValueError('Error: invalid expression')
         S, F = stk.pop()
-        G[name] = F
-        return Q, V, T, E, S, F, G
+        G[name] = set([F])
+        return Q, V, T, E, S, G[name], G
 
     @staticmethod
-    def _merge_nfa(nfa):
+    def _glushkov(name, expr, states):
+        """convert a postfix notation regular expression to a position NFA.
+
+        Attempt to convert an internal representation of a regular expression
+        in RPN to an epsilon free NFA, with a single state for each character
+        (position) in the expression plus a start state. Operators handled are
+        the same as thompson construction. The nullable, first, and last sets
+        of each subexpression are evaluated on a stack (standard RPN evaluation
+        algorithm) while the follow relation between positions is accumulated,
+        as described in section 4.3 in 'A taxonomy of finite automata
+        construction algorithms' by Bruce Watson,
+        located @http://alexandria.tue.nl/extra1/wskrap/publichtml/9313452.pdf
+
+        Args:
+          name (str): the identifier/type of the expression.
+          expr (list[str, int, tuple[tuple[int, int]]]): a regular expression
+              in postfix notation.
+          states (Iterator[int]): the shared source of fresh state identifiers.
+
+        Return:
+          set[int]: the set of states, Q
+          set[tuple[tuple[int, int]]]: the set of character code ranges, V
+          set[tuple[int, tuple[tuple[int, int]], int]]: the set of state
+              transitions, T
+          dict[int, set[int]]: the (empty) set of epsilon transitions, E
+          int: the start state, S
+          set[int]: the final states, F
+          dict[str, set[int]]: map of identifier/type to final states, G
+
+        Raises:
+          ValueError: if concatentation is supplied with improper arguments
+          ValueError: if alternation is supplied with improper arguments
+          ValueError: if kleene star is supplied with improper arguments
+          ValueError: if kleene plus is supplied with improper arguments
+          ValueError: if choice is supplied with an improper arguments
+          ValueError: if the input expression is invalid
+        """
+        label = dict()   # position -> character (range)
+        follow = dict()  # position -> { positions which may come next }
+
+        def f_update(last, first):
+            """An internal helper to update the follow relation."""
+            for position in last:
+                follow[position].update(first)
+
+        stk = []  # (nullable, first, last) stk
+        for token in expr:
+            if token is RegularGrammar.concatenation():
+                if len(stk) < 2:
+                    raise ValueError('Error: not enough args to op .')
+                n_2, f_2, l_2 = stk.pop()
+                n_1, f_1, l_1 = stk.pop()
+                f_update(l_1, f_2)
+                stk.append((n_1 and n_2,
+                            f_1 | f_2 if n_1 else f_1,
+                            l_1 | l_2 if n_2 else l_2))
+            elif token is RegularGrammar.alternative():
+                if len(stk) < 2:
+                    raise ValueError('Error: not enough args to op |')
+                n_2, f_2, l_2 = stk.pop()
+                n_1, f_1, l_1 = stk.pop()
+                stk.append((n_1 or n_2, f_1 | f_2, l_1 | l_2))
+            elif token is RegularGrammar.kleene_star():
+                if not stk:
+                    raise ValueError('Error: not enough args to op *')
+                _, f_1, l_1 = stk.pop()
+                f_update(l_1, f_1)
+                stk.append((True, f_1, l_1))
+            elif token is RegularGrammar.kleene_plus():
+                if not stk:
+                    raise ValueError('Error: not enough args to op +')
+                n_1, f_1, l_1 = stk.pop()
+                f_update(l_1, f_1)
+                stk.append((n_1, f_1, l_1))
+            elif token is RegularGrammar.maybe():
+                if not stk:
+                    raise ValueError('Error: not enough args to op ?')
+                _, f_1, l_1 = stk.pop()
+                stk.append((True, f_1, l_1))
+            else:  # it's a character (range)
+                if isinstance(token, str):
+                    token = ((ord(token), ord(token)),)
+                position = next(states)
+                label[position] = token
+                follow[position] = set()
+                stk.append((False, frozenset([position]), frozenset([position])))
+
+        if len(stk) != 1:
+            raise ValueError('Error: invalid expression')
+        nullable, first, last = stk.pop()
+
+        S = next(states)
+        Q = set(label) | set([S])
+        V = set(label.values())
+        T = {(S, label[position], position) for position in first}
+        T.update((source, label[dest], dest) for source in follow for dest in follow[source])
+        F = set(last) | (set([S]) if nullable else set())
+        return Q, V, T, dict(), S, F, {name: F}
+
+    @staticmethod
+    def _merge_nfa(nfa, states):
         """merge a list of NFAs into a single NFA.
 
         Merge multiple NFAs into a single NFA with a new start state containing
@@ -843,26 +1473,30 @@ class RegularGrammar:
 
         Args:
           nfa: list[tuple[
-                          set[str],
-                          set[str],
-                          set[tuple[str, str, str]],
-                          dict[str, set[str]],
-                          str,
-                          str,
-                          dict[str, str]
+                          set[int],
+                          set[tuple[tuple[int, int]]],
+                          set[tuple[int, tuple[tuple[int, int]], int]],
+                          dict[int, set[int]],
+                          int,
+                          set[int],
+                          dict[str, set[int]]
                     ]]: the input NFAs to merge together.
+          states (Iterator[int]): the shared source of fresh state identifiers.
 
         Return:
-          set[str]: the merged set of states, Q
-          set[str]: the merged set of alphabet characters, V
-          set[tuple[str, str, str]]: the merged set of state transitions, T
-          dict[str, set[str]]: the merged set of epsilon transitions, E
-          str: the new start state, S
-          set[str]: the merged set of final states, F
-          dict[str, str]: merged mapping of expression type to final state(s), G
+          set[int]: the merged set of states, Q
+          set[tuple[tuple[int, int]]]: the merged set of character code
+              ranges, V
+          set[tuple[int, tuple[tuple[int, int]], int]]: the merged set of state
+              transitions, T
+          dict[int, set[int]]: the merged set of epsilon transitions, E
+          int: the new start state, S
+          set[int]: the merged set of final states, F
+          dict[str, set[int]]: merged mapping of expression type to final
+              state(s), G
         """
-        S = RegularGrammar._state()
-        Q, V, T, E, S, F, G = set(), set(), set(), dict(), S, set(), dict()
+        S = next(states)
+        Q, V, T, E, S, F, G = set([S]), set(), set(), dict(), S, set(), dict()
         E[S] = set()
         for _nfa in nfa:
             Q.update(_nfa[0])
@@ -872,12 +1506,72 @@ class RegularGrammar:
             for state in _nfa[3]:
                 etransitions = _nfa[3][state]
                 E[state] = E.get(state, set()) | etransitions
-            F.add(_nfa[5])
+            F.update(_nfa[5])
             for name in _nfa[6]:
                 state = _nfa[6][name]
                 G[name] = state
         return Q, V, T, E, S, F, G
 
+    @staticmethod
+    def _ranges(Q, V, T, E, S, F, G):
+        """split the NFA's character code ranges into disjoint ranges.
+
+        Partition all character codes appearing on any transition into the
+        coarsest set of disjoint ranges such that every range is either wholly
+        inside or wholly outside of each transition's ranges. The transitions
+        are then relabeled to use the index of the disjoint range(s) instead,
+        allowing later stages to treat each range as a single input symbol
+        regardless of how many characters it covers.
+
+        Args:
+          Q (set[int]): set of NFA states
+          V (set[tuple[tuple[int, int]]]): set of NFA character code ranges
+          T (set[tuple[int, tuple[tuple[int, int]], int]]): state transitions
+          E (dict[int, set[int]]): set of epsilon transitions
+          S (int): start state
+          F (set[int]): set of final states
+          G (dict[str, set[int]]): mapping of expressions types to final states
+
+        Return:
+          set[int]: the set of states, Q
+          list[tuple[tuple[int, int]]]: the sorted disjoint range of each
+              symbol, V
+          set[tuple[int, int, int]]: the relabeled state transitions, T
+          dict[int, set[int]]: the set of epsilon transitions, E
+          int: the start state, S
+          set[int]: the set of final states, F
+          dict[str, set[int]]: mapping of expression type to final states, G
+        """
+        bounds = set()
+        for ranges in V:
+            for (low, high) in ranges:
+                bounds.update([low, high+1])
+        bounds = sorted(bounds)
+
+        covered = [False for _ in bounds]
+        for ranges in V:
+            for (low, high) in ranges:
+                for idx in range(bisect_left(bounds, low), bisect_left(bounds, high+1)):
+                    covered[idx] = True
+
+        Vp, symbols = [], {}
+        for idx, low in enumerate(bounds[:-1]):
+            if covered[idx]:
+                symbols[low] = len(Vp)
+                Vp.append(((low, bounds[idx+1]-1),))
+
+        labels = {}
+        for ranges in V:
+            labels[ranges] = [symbols[bounds[idx]]
+                              for (low, high) in ranges
+                              for idx in range(bisect_left(bounds, low),
+                                               bisect_left(bounds, high+1))]
+
+        Tp = {(source, symbol, dest) for (source, ranges, dest) in T
+              for symbol in labels[ranges]}
+
+        return Q, Vp, Tp, E, S, F, G
+
     @staticmethod
     def _e_closure(q, E, cache):
         """find the epsilon closure of the current state and cache the result.
@@ -889,12 +1583,12 @@ class RegularGrammar:
         cycles appropriately.
 
         Args:
-          q (str): the state to find the e-closure of.
-          E (dict[str, set[str]]): the set of e-transitions.
-          cache (dict[str, set[str]]): previously computed e-closures.
+          q (int): the state to find the e-closure of.
+          E (dict[int, set[int]]): the set of e-transitions.
+          cache (dict[int, set[int]]): previously computed e-closures.
 
         Return:
-          set[str]: the e-closure of state q.
+          set[int]: the e-closure of state q.
         """
         if q in cache:
             return cache[q]
@@ -918,51 +1612,65 @@ class RegularGrammar:
         e-closure conversion. Only states wich are reachable from the start
         state are considered. This results in a minimized DFA with reguard to
         reachable states, but not with reguard to nondistinguishable states.
+        The transitions are first indexed by source state, with each target
+        already expanded to its e-closure, so that every subset step only
+        visits the outgoing edges of its member NFA states. Each discovered
+        subset of NFA states is numbered densely, in order of discovery, so
+        that the resulting DFA states are simple integers.
 
         Args:
-          Q (set[str]): set of NFA states
-          V (set[str]): set of NFA alphabet characters
-          T (set[tuple[str, str, str]]): set of state transitions
-          E (dict[str, set[str]]): set of epsilon transitions
-          S (str): start state
-          F (set[str]): set of final states
-          G (dict[str, str]): mapping of expressions types to final states
+          Q (set[int]): set of NFA states
+          V (list[tuple[tuple[int, int]]]): character code ranges of each symbol
+          T (set[tuple[int, int, int]]): set of state transitions
+          E (dict[int, set[int]]): set of epsilon transitions
+          S (int): start state
+          F (set[int]): set of final states
+          G (dict[str, set[int]]): mapping of expressions types to final states
 
         Return:
-          set[frozenset[str]]: set of DFA states
-          set[str]: set of characters in the DFA alphabet
-          set[tuple[frozenset[str], str, frozenset[str]]]: the DFA transitions
-          frozenset[str]: the DFA start state
-          set[frozenset[str]]: set of DFA final states
-          dict[str, set[frozenset[str]]]: mapping of types to final states
+          set[int]: set of DFA states
+          list[tuple[tuple[int, int]]]: character code ranges of each symbol
+          set[tuple[int, int, int]]: the DFA transitions
+          int: the DFA start state
+          set[int]: set of DFA final states
+          dict[str, set[int]]: mapping of types to final states
         """
         cache, Gp = dict(), dict()
+
+        # index: { q -> { v -> e-closure({ q' | q ->v q' }) } }
+        delta = {}
+        for (source, symbol, dest) in T:
+            moves = delta[source] = delta.get(source, {})
+            moves[symbol] = moves.get(symbol, frozenset()) | \
+                            RegularGrammar._e_closure(dest, E, cache)
+
         Sp = frozenset(RegularGrammar._e_closure(S, E, cache))
-        Qp, Fp, Tp, explore = set(), set(), set(), set([Sp])
+        subsets, explore = {Sp: 0}, [Sp]
+        Fp, Tp = set(), set()
         while explore:
             in_state = explore.pop()  # DFA state; set of NFA states
-            if in_state not in Qp:
-                Qp.add(in_state)
-                if F & in_state:
-                    Fp.add(in_state)
-                qps = {}
-                for t in T:
-                    if t[0] in in_state:
-                        out_states = qps[t[1]] = qps.get(t[1], set())
-                        out_states.update(RegularGrammar._e_closure(t[2], E, cache))
-                for alpha in qps:
-                    out_state = qps[alpha]
-                    out_state = frozenset(out_state)
-                    explore.add(out_state)
-                    Tp.add((in_state, alpha, out_state))
+            in_id = subsets[in_state]
+            if F & in_state:
+                Fp.add(in_id)
+            qps = {}
+            for state in in_state:
+                for alpha, closure in delta.get(state, {}).items():
+                    out_states = qps[alpha] = qps.get(alpha, set())
+                    out_states.update(closure)
+            for alpha in qps:
+                out_state = frozenset(qps[alpha])
+                if out_state not in subsets:
+                    subsets[out_state] = len(subsets)
+                    explore.append(out_state)
+                Tp.add((in_id, alpha, subsets[out_state]))
 
         for name in G:
-            nfa_final = G[name]
-            for dfa_final in Fp:
-                if nfa_final in dfa_final:
+            nfa_finals = G[name]
+            for subset, dfa_final in subsets.items():
+                if nfa_finals & subset:
                     Gp[name] = Gp.get(name, set()) | set([dfa_final])
 
-        return Qp, V, Tp, Sp, Fp, Gp
+        return set(subsets.values()), V, Tp, 0, Fp, Gp
 
     @staticmethod
     def _total(Q, V, T, S, F, G):
@@ -972,40 +1680,74 @@ class RegularGrammar:
         sink/error state. All unspecified state transitions are then specified
         by adding a transition to the new sink/error state. A new entry is also
         made into G to track this new sink/error type which is accessible as
-        '_sink'.
+        '_sink'. Since DFA states and symbols are dense integers they double as
+        the column and row indices into the resulting table.
 
         Args:
-          Q (set[frozenset[str]]): set of DFA states
-          V (set[str]): the DFA alphabet
-          T (set[tuple[frozenset[str], str, frozenset[str]]]): DFA transitions
-          S (frozenset[str]): the DFA start state
-          F (set[frozenset[str]]): the set of DFA final states
-          G (dict[str, set[frozenset[str]]]): DFA pattern name to final state(s)
+          Q (set[int]): set of DFA states
+          V (list[tuple[tuple[int, int]]]): character code ranges of each symbol
+          T (set[tuple[int, int, int]]): DFA transitions
+          S (int): the DFA start state
+          F (set[int]): the set of DFA final states
+          G (dict[str, set[int]]): DFA pattern name to final state(s)
 
         Return:
-          set[frozenset[str]]: possibly extended set of DFA states
-          set[str]: the given input alphabet
-          tuple[
-                dict[frozenset[str], int],
-                dict[str, int],
-                list[list[frozenset[str]]]
-               ]: a possibly extended transition function converted to a table
-          frozenset[str]: the input start state
-          set[frozenset[str]]: the input final state(s)
-          dict[str, set[frozenset[str]]]: the type to pattern mapping
+          set[int]: possibly extended set of DFA states
+          list[tuple[tuple[int, int]]]: the given input alphabet
+          list[list[int]]: a possibly extended transition function converted
+              to a table indexed by symbol and then state
+          int: the input start state
+          set[int]: the input final state(s)
+          dict[str, set[int]]: the type to pattern mapping
         """
-        q_err = frozenset([RegularGrammar._state()])
+        q_err = len(Q)
         if len(T) != len(Q) * len(V):
             Q.add(q_err)
             G['_sink'] = set([q_err])
 
-        states = {v:k for k, v in enumerate(Q)}
-        symbols = {v:k for k, v in enumerate(V)}
-        table = [[q_err for _ in states] for _ in symbols]
+        table = [[q_err for _ in Q] for _ in V]
         for (state, symbol, dest) in T:
-            table[symbols[symbol]][states[state]] = dest
+            table[symbol][state] = dest
+
+        return Q, V, table, S, F, G
+
+    @staticmethod
+    def _classes(Q, V, T, S, F, G):
+        """merge input symbols which behave identically into equivalence classes.
+
+        Partition the DFA's alphabet into equivalence classes, where two
+        symbols are equivalent if they transition every state to the same
+        destination. Each class then becomes a single row of the table, so the
+        size of the table and the work done to minimize it scale with the number
+        of classes rather than the size of the alphabet.
+
+        Args:
+          Q (set[int]): set of DFA states
+          V (list[tuple[tuple[int, int]]]): character code ranges of each symbol
+          T (list[list[int]]): the total DFA transition function as a table
+          S (int): the DFA start state
+          F (set[int]): the set of DFA final states
+          G (dict[str, set[int]]): DFA pattern name to final state(s)
+
+        Return:
+          set[int]: the given set of DFA states
+          list[tuple[tuple[int, int]]]: character code ranges of each class
+          list[list[int]]: the transition function table indexed by class
+          int: the given start state
+          set[int]: the given final state(s)
+          dict[str, set[int]]: the given type to pattern mapping
+        """
+        rows, Vp, Tp = {}, [], []
+        for ranges, row in zip(V, T):
+            key = tuple(row)
+            if key in rows:
+                Vp[rows[key]].extend(ranges)
+            else:
+                rows[key] = len(Vp)
+                Vp.append(list(ranges))
+                Tp.append(row)
 
-        return Q, V, (states, symbols, table), S, F, G
+        return Q, [RegularGrammar._merge_ranges(ranges) for ranges in Vp], Tp, S, F, G
 
     @staticmethod
     def _hopcroft(Q, V, T, S, F, G):
@@ -1013,131 +1755,118 @@ class RegularGrammar:
 
         Minimize the DFA with reguard to nondistinguishable states using
         hopcrafts algorithm, which merges states together based on partition
-        refinement.
+        refinement. An inverse transition index, a state to partition (block)
+        map, and a worklist of (partition, symbol) splitters ensure only the
+        predecessors of each splitter are ever visited, giving the
+        O(n * k * log n) bound. The resulting partitions are numbered densely
+        to become the states of the minimal DFA.
 
         Args:
-          Q (set[frozenset[str]]): the set of DFA states
-          V (set[str]): the set of DFA input characters
-          T (tuple[
-                   dict[frozenset[str], int],
-                   dict[str, int],
-                   list[list[frozenset[str]]]
-                  ]): the DFA transition function as a table
-          S (frozenset[str]): the DFA start state
-          F (set[frozenset[str]]): the set of DFA final states
-          G (dict[str, set[frozenset[str]]]): map of type to DFA final state(s)
+          Q (set[int]): the set of DFA states
+          V (list[tuple[tuple[int, int]]]): character code ranges of each symbol
+          T (list[list[int]]): the DFA transition function as a table
+          S (int): the DFA start state
+          F (set[int]): the set of DFA final states
+          G (dict[str, set[int]]): map of type to DFA final state(s)
 
         Return:
-          set[set[frozenset[frozenset[str]]]]: set of possible merged states
-          set[str]: the given set of input chacters
-          tuple[
-                dict[set[frozenset[frozenset[str]]], int],
-                dict[str, int],
-                list[list[set[frozenset[frozenset[str]]]]]
-               ]: possibly updated and reduced table with merged states
-          set[frozenset[frozenset[str]]]: a possibly updated start state.
-          set[set[frozenset[frozenset[str]]]]: a possibly updated set of final
-              states.
-          dict[str, set[set[frozenset[frozenset[str]]]]: a possibly updated map
-              of token to final state(s).
+          set[int]: set of possible merged states
+          list[tuple[tuple[int, int]]]: the given input character code ranges
+          list[list[int]]: possibly updated and reduced table with merged
+              states
+          int: a possibly updated start state.
+          set[int]: a possibly updated set of final states.
+          dict[str, set[int]]: a possibly updated map of token to final
+              state(s).
         """
-        (states, symbols, T) = T
-        Q, F = frozenset(Q), frozenset(F)
-
-        partitions = set([F, Q - F]) - set([frozenset()])  # if Q - F was empty
-        explore = set([F])
+        # inverse: { symbol -> { q' -> [ q | q ->symbol q' ] } }
+        inverse = [[[] for _ in Q] for _ in T]
+        for row, _inverse in zip(T, inverse):
+            for state in Q:
+                _inverse[row[state]].append(state)
+
+        # initially partition by the type(s) accepted, so types are never merged
+        signatures = {}
+        for state in Q:
+            signature = frozenset(name for name in G if name != '_sink' and state in G[name])
+            signatures.setdefault(signature, set()).add(state)
+        partitions = list(signatures.values())
+        block = [0 for _ in Q]
+        for idx, partition in enumerate(partitions):
+            for state in partition:
+                block[state] = idx
+
+        # all but the largest initial partition must be explored
+        largest = max(range(len(partitions)), key=lambda idx: len(partitions[idx]))
+        explore = [(idx, symbol) for idx in range(len(partitions)) if idx != largest
+                   for symbol in range(len(T))]
 
         while explore:
-            selection = explore.pop()
-            for key in symbols:
-                v_idx = symbols[key]
-                _selection = {q for q in states if T[v_idx][states[q]] in selection}
-                _selection = frozenset(_selection)
-                _partitions = set()
-                for partition in partitions:
-                    split_1 = _selection & partition
-                    split_2 = partition - _selection
-                    if split_1 and split_2:
-                        _partitions.update([split_1, split_2])
-                        if partition  in explore:
-                            explore.remove(partition)
-                            explore.update([split_1, split_2])
-                        elif len(split_1) <= len(split_2):
-                            explore.update([split_1])
-                        else:
-                            explore.update([split_2])
-                    else:
-                        _partitions.add(partition)
-                partitions = _partitions
-
-        _states = {item:idx for idx, item in enumerate(partitions)}
-        Tp = [[None for _ in partitions] for symbol in V]
-        for source in states:
-            for symbol in V:
-                dest = T[symbols[symbol]][states[source]]
-                state_1, state_2 = None, None
-                for part in partitions:
-                    if source in part:
-                        state_1 = part
-                    if dest in part:
-                        state_2 = part
-                Tp[symbols[symbol]][_states[state_1]] = state_2
-
-        Sp = None
-        for part in partitions:
-            if S in part:
-                Sp = part
-
-        Fp = {partition for partition in partitions if partition & F}
-
-        Gp = dict()
-
-        for name in G:
-            dfa_finals = G[name]
-            if name == '_sink': # special case (i.e not a final state)
-                Gp[name] = {part for part in partitions if part & G['_sink']}
-                continue
-            for dfa_final in dfa_finals:
-                for dfa_merged_final in Fp:
-                    if dfa_final in dfa_merged_final:
-                        Gp[name] = Gp.get(name, set()) | set([dfa_merged_final])
-
-        return partitions, V, (_states, symbols, Tp), Sp, Fp, Gp
+            splitter, symbol = explore.pop()
+
+            # group the predecessors of the splitter by their current partition
+            touched = {}
+            _inverse = inverse[symbol]
+            for dest in partitions[splitter]:
+                for source in _inverse[dest]:
+                    touched.setdefault(block[source], []).append(source)
+
+            for idx, sources in touched.items():
+                partition = partitions[idx]
+                if len(sources) == len(partition):
+                    continue
+                split = set(sources)
+                if len(split) > len(partition) - len(split):
+                    split = partition - split
+                partition -= split
+                _idx = len(partitions)
+                partitions.append(split)
+                for state in split:
+                    block[state] = _idx
+                # split is the smaller half, and it must always be explored;
+                # any pending (idx, symbol) now covers the remainder
+                for _symbol in range(len(T)):
+                    explore.append((_idx, _symbol))
+
+        Tp = [[0 for _ in partitions] for _ in T]
+        for row, _row in zip(T, Tp):
+            for state in Q:
+                _row[block[state]] = block[row[state]]
+
+        Fp = {block[state] for state in F}
+        Gp = {name:{block[state] for state in G[name]} for name in G}
+
+        return set(range(len(partitions))), V, Tp, block[S], Fp, Gp
 
     @staticmethod
     def _alpha(Q, V, T, S, F, G):
         """rename/convert states for better legibility.
 
-        Perform an alpha rename on all DFA states to simplify the
-        representation which the end user will consume.
+        Perform an alpha rename on all DFA states, converting the internal
+        integer identifiers into the string labels which the end user will
+        consume.
 
         Args:
-          Q (set[set[frozenset[frozenset[str]]]]): the set of states
-          V (set[str]): the input alphabet chacters
-          T (tuple[
-                   dict[set[frozenset[frozenset[str]]], int],
-                   dict[str,  int],
-                   list[list[set[frozenset[frozenset[str]]]]]
-                  ]): the delta function as a table
-          S (set[frozenset[frozenset[str]]]): the start state
-          F (set[set[frozenset[frozenset[str]]]]): the set of final states
-          G (dict[str, set[set[frozenset[frozenset[str]]]]]): the type to state
-              mapping.
+          Q (set[int]): the set of states
+          V (list[tuple[tuple[int, int]]]): character code ranges of each symbol
+          T (list[list[int]]): the delta function as a table
+          S (int): the start state
+          F (set[int]): the set of final states
+          G (dict[str, set[int]]): the type to state mapping.
 
         Return:
           set[str]: the renamed start states
-          set[str]: the input alphabet
-          tuple[dict[str, int], dict[str, int], list[list[str]]]: the updated
-              transition function
+          list[tuple[tuple[int, int]]]: the input character code ranges
+          tuple[dict[str, int], list[list[str]]]: the updated transition
+              function
           str: the updated start state
           set[str]: the updated finish state(s)
           dict[str, set[str]]: the updated token to final state mapping.
         """
-        rename = {q: RegularGrammar._state() for q in Q}
-        Qp = {rename[k] for k in rename}
-        (states, symbols, table) = T
-        states = {rename[state]:states[state] for state in states}
-        Tp = (states, symbols, [[rename[col] for col in row] for row in table])
+        rename = ['q{0}'.format(state) for state in range(len(Q))]
+        Qp = set(rename)
+        states = {rename[state]:state for state in Q}
+        Tp = (states, [[rename[col] for col in row] for row in T])
         Sp = rename[S]
         Fp = {rename[f] for f in F}
         Gp = {g:{rename[s] for s in G[g]} for g in G}
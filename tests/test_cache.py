@@ -0,0 +1,140 @@
+"""
+Testing for the Cache object located in spag/cache.py
+"""
+from os import listdir
+from tempfile import NamedTemporaryFile
+import pytest
+import spag.cache
+from spag.cache import Cache
+from spag.parser import ContextFreeGrammar
+from spag.scanner import RegularGrammar
+
+
+class TestCache:
+    """
+    A test suite for testing the Cache object.
+    """
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Directory is not of type string.',
+        raises=TypeError,
+    )
+    def test_directory_invalid():
+        """
+        Ensure a TypeError is raised when constructing a Cache object if the
+        directory is not of type string.
+        """
+        Cache(None)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Directory is empty.',
+        raises=ValueError,
+    )
+    def test_directory_empty():
+        """
+        Ensure a ValueError is raised when constructing a Cache object if the
+        directory is the empty string.
+        """
+        Cache('')
+
+    @staticmethod
+    def test_key():
+        """
+        Ensure keys are stable, sensitive to order, and never confuse operators
+        with plain strings.
+        """
+        star = RegularGrammar.kleene_star()
+        assert Cache.key('kind', ['a', star]) == Cache.key('kind', ['a', star])
+        assert Cache.key('kind', ['a', star]) != Cache.key('kind', [star, 'a'])
+        assert Cache.key('kind', ['a', star]) != Cache.key('kind', ['a', str(star)])
+        assert Cache.key('kind', [1]) != Cache.key('kind', ['1'])
+        assert Cache.key('kind', [1]) != Cache.key('other', [1])
+
+    @staticmethod
+    def test_store_load(tmpdir):
+        """
+        Ensure artifacts survive a round trip and misses or corrupt entries
+        load as None.
+        """
+        cache = Cache(str(tmpdir.join('cache')))
+        key = Cache.key('kind', 'spec')
+        assert cache.load(key) is None
+        artifact = ({0, 1}, [[1, 0]], {'a': frozenset([1])})
+        cache.store(key, artifact)
+        assert cache.load(key) == artifact
+        tmpdir.join('cache', key + '.spag').write('corrupt')
+        assert cache.load(key) is None
+
+    @staticmethod
+    @pytest.mark.parametrize('failure', ['write', 'replace', 'remove'])
+    def test_store_failure(tmpdir, monkeypatch, failure):
+        """
+        Ensure failures to write or replace an entry are ignored without
+        leaving temporary files behind, even if the cleanup itself fails.
+        """
+        def _fail(*_):
+            raise OSError(failure)
+
+        directory = tmpdir.join('cache')
+        cache = Cache(str(directory))
+        key = Cache.key('kind', 'spec')
+        if failure == 'write':
+            def _unwritable(**kwargs):
+                entry = NamedTemporaryFile(**kwargs)  # pylint: disable=consider-using-with
+                entry.write = _fail
+                return entry
+            monkeypatch.setattr(spag.cache, 'NamedTemporaryFile', _unwritable)
+        else:
+            monkeypatch.setattr(spag.cache, 'replace', _fail)
+        if failure == 'remove':
+            monkeypatch.setattr(spag.cache, 'remove', _fail)
+        cache.store(key, 'artifact')
+        monkeypatch.undo()
+        assert cache.load(key) is None
+        assert len(listdir(str(directory))) == (1 if failure == 'remove' else 0)
+
+    @staticmethod
+    def test_regular_grammar(tmpdir):
+        """
+        Ensure a RegularGrammar is stored once compiled and loaded afterwards
+        without recompilation.
+        """
+        directory = str(tmpdir)
+        expressions = {
+            'if': ['i', 'f'],
+            'id': ['a', RegularGrammar.kleene_plus()],
+        }
+        compiled = RegularGrammar('cached', expressions, cache=directory)
+        assert len(listdir(directory)) == 1
+        loaded = RegularGrammar('cached', expressions, cache=directory)
+        assert loaded.states == compiled.states
+        assert loaded.transitions == compiled.transitions
+        assert loaded.types == compiled.types
+        assert loaded.match('if') == ('if', 2)
+
+        lazy = RegularGrammar('cached', {'id': ['a']}, 'thompson', 4, directory)
+        assert len(listdir(directory)) == 1
+        assert lazy.states and len(listdir(directory)) == 2
+
+    @staticmethod
+    def test_context_free_grammar(tmpdir):
+        """
+        Ensure a ContextFreeGrammar is stored once compiled and loaded
+        afterwards without recompilation.
+        """
+        directory = str(tmpdir)
+        productions = {
+            'S': [['a', 'S'], []],
+        }
+        compiled = ContextFreeGrammar('cached', productions, 'S', directory)
+        assert len(listdir(directory)) == 1
+        loaded = ContextFreeGrammar('cached', productions, 'S', directory)
+        assert loaded.first == compiled.first
+        assert loaded.follow == compiled.follow
+        assert loaded.table == compiled.table
+
+        assert loaded.lalr_table == compiled.lalr_table and len(listdir(directory)) == 2
+        assert ContextFreeGrammar('cached', productions, 'S', directory).lalr_table == \
+               compiled.lalr_table and len(listdir(directory)) == 2
@@ -170,6 +170,109 @@ class TestGenerator:
         generator = Generator()
         assert generator.match == 'longest', 'Invalid default match retrieved'
 
+    @staticmethod
+    @pytest.mark.parametrize('tabulate', [
+        True,
+        False,
+        pytest.param(None, marks=pytest.mark.xfail(
+            reason='Tabulate not of type bool.',
+            raises=TypeError,
+        )),
+    ])
+    def test_tabulate(tabulate):
+        """
+        Ensure the Generator object's tabulate property behaves as expected.
+        """
+        generator = Generator()
+        generator.tabulate = tabulate
+        assert generator.tabulate == tabulate, 'Invalid tabulate set/retrieval'
+
+    @staticmethod
+    def test_tabulate_default():
+        """
+        Ensure default tabulate retrieval works as expected upon successful
+        creation of a Generator object.
+        """
+        generator = Generator()
+        assert generator.tabulate is False, 'Invalid default tabulate retrieved'
+
+    @staticmethod
+    @pytest.mark.parametrize('ignore', [
+        set(),
+        {'space', 'comment'},
+        frozenset(['space']),
+        pytest.param(['space'], marks=pytest.mark.xfail(
+            reason='Ignore not of type set.',
+            raises=TypeError,
+        )),
+        pytest.param({'space', 1}, marks=pytest.mark.xfail(
+            reason='Ignore not a set of strings.',
+            raises=TypeError,
+        )),
+    ])
+    def test_ignore(ignore):
+        """
+        Ensure the Generator object's ignore property behaves as expected.
+        """
+        generator = Generator()
+        generator.ignore = ignore
+        assert generator.ignore == ignore, 'Invalid ignore set/retrieval'
+
+    @staticmethod
+    def test_ignore_default():
+        """
+        Ensure default ignore retrieval works as expected upon successful
+        creation of a Generator object.
+        """
+        generator = Generator()
+        assert generator.ignore == frozenset(), 'Invalid default ignore retrieved'
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Ignored type not of the scanner.',
+        raises=ValueError,
+    )
+    def test_ignore_unknown():
+        """
+        Ensure a ValueError is raised if a type not of the scanner is ignored.
+        """
+        generator = Generator()
+        generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r']})
+        generator.ignore = {'space'}
+        generator.generate()
+
+    @staticmethod
+    def test_sizes_default():
+        """
+        Ensure default sizes retrieval works as expected upon successful
+        creation of a Generator object.
+        """
+        generator = Generator()
+        assert generator.sizes is None, 'Invalid default sizes retrieved'
+
+    @staticmethod
+    @pytest.mark.parametrize('encoding, match', [
+        pytest.param('direct', 'longest', marks=pytest.mark.xfail(
+            reason='Tabulating requires table encoding.',
+            raises=ValueError,
+        )),
+        pytest.param('table', 'shortest', marks=pytest.mark.xfail(
+            reason='Tabulating requires longest matching.',
+            raises=ValueError,
+        )),
+    ])
+    def test_tabulate_options(encoding, match):
+        """
+        Ensure a ValueError is raised if tabulating maximal munch is requested
+        with conflicting options.
+        """
+        generator = Generator()
+        generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r']})
+        generator.encoding = encoding
+        generator.match = match
+        generator.tabulate = True
+        generator.generate()
+
     @staticmethod
     @pytest.mark.xfail(
         reason='Scanner or parser required for generation.',
@@ -1,8 +1,12 @@
 """
 Testing for Generator subclass objects located in src/generators/*.py
 """
+from shutil import which
+from subprocess import PIPE, run
 import pytest
+from spag.generator import Generator
 from spag.generators import __all__
+from spag.generators.c import C
 from spag.scanner import RegularGrammar
 from spag.parser import ContextFreeGrammar
 
@@ -58,3 +62,241 @@ class TestGenerator:
         generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r']})
         generator.parser = ContextFreeGrammar('test', {'S': [['a']]}, 'S')
         assert generator.generate(), 'no result returned'
+
+    @staticmethod
+    def test_comb():
+        """
+        Ensure the comb vector (row displacement) compression of a scanner's
+        transition table encodes the same transitions as the dense table.
+        """
+        table = RegularGrammar('test', {
+            'id': [RegularGrammar.left_class(), 'a', RegularGrammar.character_range(),
+                   'z', RegularGrammar.right_class(), RegularGrammar.kleene_plus()],
+            'int': [RegularGrammar.left_class(), '0', RegularGrammar.character_range(),
+                    '9', RegularGrammar.right_class(), RegularGrammar.kleene_plus()],
+            'if': ['i', 'f'],
+            'ws': [' '],
+        }).table
+        base, _next, check, default = Generator._comb(table)
+        assert len(_next) == len(check) < table.states * table.classes
+        for state in range(table.states):
+            for symbol in range(table.classes):
+                idx = base[state] + symbol
+                dest = _next[idx] if check[idx] == state else default[state]
+                assert dest == table.cells[state*table.classes+symbol], \
+                       'Incorrect comb vector produced'
+
+    @staticmethod
+    def test_c_table_encoding():
+        """
+        Ensure the c generator emits comb vector compressed tables, with the
+        compressed size reported next to the dense size (both in the source
+        and to the caller), when table encoded.
+        """
+        generator = C()
+        generator.encoding = 'table'
+        generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r'], 'null': ['n']})
+        files = generator.generate()
+        source = files['out_test.c']
+        for array in ('classes', 'base', 'next', 'check', 'default', 'accept'):
+            assert 'test_{0}['.format(array) in source
+        compressed, dense = generator.sizes
+        assert 'Compressed: {0} bytes'.format(compressed) in source and \
+               'dense: {0} bytes'.format(dense) in source
+        assert 'test_NULL' in files['out_test.h']
+        generator.encoding = 'direct'
+        generator.generate()
+        assert generator.sizes is None, 'Stale table sizes retrieved'
+
+    @staticmethod
+    def test_c_tabulating():
+        """
+        Ensure the c generator emits tabulating maximal munch when requested.
+        """
+        generator = C()
+        generator.encoding = 'table'
+        generator.tabulate = True
+        generator.scanner = RegularGrammar('test', {
+            'a': ['a'],
+            'ab': ['a', RegularGrammar.kleene_star(), 'b'],
+        })
+        files = generator.generate()
+        assert 'test_failed(' in files['out_test.c'] and 'test_fail(' in files['out_test.c']
+        assert 'unsigned char *failed;' in files['out_test.c']
+
+    @staticmethod
+    @pytest.mark.parametrize('encoding', ['direct', 'table'])
+    def test_c_buffered_input(encoding):
+        """
+        Ensure the c scanner reads its input in blocks into a sentinel
+        terminated buffer instead of a character (and token) at a time.
+        """
+        generator = C()
+        generator.encoding = encoding
+        generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r'], 'null': ['n']})
+        source = generator.generate()['out_test.c']
+        assert 'read(test_scanner->fd' in source and 'test_refill(' in source
+        for call in ('fgetc(', 'fread(', 'ftell(', 'fseek(', 'fopen('):
+            assert call not in source
+
+    @staticmethod
+    def test_c_in_place_input():
+        """
+        Ensure the c scanner can be created over a memory mapped file or a
+        caller owned buffer, both of which are scanned in place.
+        """
+        generator = C()
+        generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r'], 'null': ['n']})
+        files = generator.generate()
+        for prototype in ('test_scanner_t *new_test_scanner_mmap(const char *path)',
+                          'test_scanner_t *new_test_scanner_buffer(const char *buf, size_t len)'):
+            assert prototype + ';' in files['out_test.h']
+            assert prototype + ' {' in files['out_test.c']
+        assert 'mmap(' in files['out_test.c'] and 'munmap(' in files['out_test.c']
+
+    @staticmethod
+    def test_c_token_views():
+        """
+        Ensure the c scanner reads tokens as views into its input, only
+        allocating a token when the caller asks for one.
+        """
+        generator = C()
+        generator.scanner = RegularGrammar('test', {'foo': ['b', 'a', 'r'], 'null': ['n']})
+        files = generator.generate()
+        assert '} test_token_view_t;' in files['out_test.h']
+        assert 'const test_token_view_t *test_view(test_scanner_t *test_scanner);' in \
+               files['out_test.h']
+        source = files['out_test.c']
+        read_token = source[source.index('test_scan_error_t test_read_token('):]
+        read_token = read_token[:read_token.index('\n}\n')]
+        assert 'new_test_token(' not in read_token and 'alloc(' not in read_token
+
+    @staticmethod
+    def test_c_parser():
+        """
+        Ensure the c generator emits a table driven LL(1) parser reading its
+        terminals straight from the scanner, skipping only the ignored tokens.
+        """
+        generator = C()
+        generator.ignore = {'space'}
+        generator.scanner = RegularGrammar('test', {'a': ['a'], 'b': ['b'], 'space': [' ']})
+        generator.parser = ContextFreeGrammar('test', {'S': [['a', 'S', 'b'], []]}, 'S')
+        files = generator.generate()
+        header, source = files['out_test_test.h'], files['out_test_test.c']
+        assert 'test_parse_error_t test_parse(test_parser_t *test_parser,' in header
+        assert 'test_scanner_t *test_scanner,' in header
+        for array in ('table', 'offsets', 'rhs', 'columns'):
+            assert 'test_{0}['.format(array) in source
+        assert 'test_scan(test_scanner)' in source
+        assert '#define test_IGNORED -2' in source and '#define test_UNEXPECTED -3' in source
+
+    @staticmethod
+    def _run_c(tmpdir, files, main, *args):
+        """
+        Compile the generated files along with the given main, skipping the
+        test if no C compiler is available, and run the program with the given
+        arguments, returning its output.
+        """
+        compiler = which('cc') or which('gcc')
+        if compiler is None:
+            pytest.skip('no C compiler available')
+        sources = [str(tmpdir.join('main.c'))]
+        tmpdir.join('main.c').write(main)
+        for name, content in files.items():
+            tmpdir.join(name).write(content)
+            if name.endswith('.c'):
+                sources.append(str(tmpdir.join(name)))
+        program = str(tmpdir.join('program'))
+        run([compiler, '-I', str(tmpdir), '-o', program] + sources, check=True)
+        return [run([program, arg], check=True, stdout=PIPE, universal_newlines=True).stdout
+                for arg in args]
+
+    @staticmethod
+    @pytest.mark.parametrize('ignore, text, result', [
+        ({'ws'}, '1 + (22+3)', 'ACCEPT'),
+        ({'ws'}, '1 + (22+3) aaab a', 'SYNTAX_ERROR'),
+        ({'ws'}, '1 + id', 'SYNTAX_ERROR'),
+        ({'ws'}, '1 +', 'SYNTAX_ERROR'),
+        (set(), '1 + 2', 'SYNTAX_ERROR'),
+        (set(), '1+2', 'ACCEPT'),
+    ])
+    def test_c_parser_run(tmpdir, ignore, text, result):
+        """
+        Ensure the compiled c parser accepts exactly the input derivable by the
+        grammar, skipping only the ignored types of scanner tokens and failing
+        with a syntax error on any other type not in the grammar.
+        """
+        _class = (RegularGrammar.left_class(), RegularGrammar.right_class())
+        _range, _plus = RegularGrammar.character_range(), RegularGrammar.kleene_plus()
+        generator = C()
+        generator.ignore = ignore
+        generator.scanner = RegularGrammar('calc', {
+            'int': [_class[0], '0', _range, '9', _class[1], _plus],
+            'id': [_class[0], 'a', _range, 'z', _class[1], _plus],
+            'plus': ['+'],
+            'open': ['('],
+            'close': [')'],
+            'ws': [_class[0], ' ', '\n', _class[1], _plus],
+        })
+        generator.parser = ContextFreeGrammar('expr', {
+            'E': [['T', 'Ep']],
+            'Ep': [['plus', 'T', 'Ep'], []],
+            'T': [['int'], ['open', 'E', 'close']],
+        }, 'E')
+        main = """\
+#include <string.h>
+#include "out_calc_expr.h"
+
+int main(int argc, char **argv) {
+  calc_scanner_t *scanner = new_calc_scanner_buffer(argv[1], strlen(argv[1]));
+  expr_parser_t *parser = new_expr_parser();
+  expr_parse_error_t error = expr_parse(parser, scanner, NULL, NULL);
+
+  printf("%s", error == expr_ACCEPT ? "ACCEPT" :
+               error == expr_SYNTAX_ERROR ? "SYNTAX_ERROR" : "ERROR");
+  free_expr_parser(parser);
+  free_calc_scanner(scanner);
+  return argc - 2;
+}
+"""
+        assert TestGenerator._run_c(tmpdir, generator.generate(), main, text) == [result]
+
+    @staticmethod
+    def test_c_parser_without_scanner():
+        """
+        Ensure the c generator emits a parser reading terminals from a caller
+        supplied function when no scanner is given, with every terminal named,
+        whatever the scanner only options.
+        """
+        generator = C()
+        generator.parser = ContextFreeGrammar('test', {'S': [[':', 'S', '='], []]}, 'S')
+        header = generator.generate()['out_test.h']
+        assert 'test_next_t next, void *source,' in header
+        assert header.count('test_T__') == 2
+        generator.tabulate = True
+        assert 'test_next_t next, void *source,' in generator.generate()['out_test.h']
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Parse table conflict.',
+        raises=ValueError,
+    )
+    def test_c_parser_conflict():
+        """
+        Ensure the c generator refuses to emit a parser for a grammar which is
+        not LL(1).
+        """
+        generator = C()
+        generator.parser = ContextFreeGrammar('test', {'S': [['a'], ['a', 'b']]}, 'S')
+        generator.generate()
+
+    @staticmethod
+    def test_c_token_type_constants():
+        """
+        Ensure token types never collide with the constants of the generated
+        api (e.g. nil with the NIL scan error).
+        """
+        generator = C()
+        generator.scanner = RegularGrammar('test', {'nil': ['n'], 't_x': ['t']})
+        header = generator.generate()['out_test.h']
+        assert 'test_NIL_TOKEN,' in header and 'test_T_X_TOKEN,' in header
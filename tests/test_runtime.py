@@ -0,0 +1,381 @@
+"""
+Testing for the Lexer, Token, Parser, Node and Tree objects located in
+spag/runtime.py
+"""
+from pickle import dumps, loads
+from tracemalloc import get_traced_memory, start, stop
+import pytest
+from spag.parser import ContextFreeGrammar
+from spag.runtime import Lexer, Node, Parser, Token, Tree
+from spag.scanner import RegularGrammar
+
+
+class TestLexer:
+    """
+    A test suite for testing the Lexer object.
+    """
+
+    @staticmethod
+    def _grammar():
+        """
+        A small scanner with keywords, identifiers, numbers and whitespace.
+        """
+        _class = (RegularGrammar.left_class(), RegularGrammar.right_class())
+        _range, _plus = RegularGrammar.character_range(), RegularGrammar.kleene_plus()
+        return RegularGrammar('runtime', {
+            'if': ['i', 'f'],
+            'id': [_class[0], 'a', _range, 'z', _class[1], _plus],
+            'int': [_class[0], '0', _range, '9', _class[1], _plus],
+            'ws': [_class[0], ' ', '\n', _class[1], _plus],
+        })
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Grammar is not of type RegularGrammar.',
+        raises=TypeError,
+    )
+    def test_grammar_invalid():
+        """
+        Ensure a TypeError is raised when constructing a Lexer object if the
+        grammar is not a RegularGrammar.
+        """
+        Lexer(None)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Ignore is not of type set.',
+        raises=TypeError,
+    )
+    def test_ignore_invalid():
+        """
+        Ensure a TypeError is raised when constructing a Lexer object if ignore
+        is not a set.
+        """
+        Lexer(TestLexer._grammar(), ['ws'])
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Ignore contains an unknown type.',
+        raises=ValueError,
+    )
+    def test_ignore_unknown():
+        """
+        Ensure a ValueError is raised when constructing a Lexer object if ignore
+        contains a type not in the grammar.
+        """
+        Lexer(TestLexer._grammar(), {'comment'})
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Tabulate is not of type bool.',
+        raises=TypeError,
+    )
+    def test_tabulate_invalid():
+        """
+        Ensure a TypeError is raised when constructing a Lexer object if
+        tabulate is not a bool.
+        """
+        Lexer(TestLexer._grammar(), None, 1)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Text is not of type str or bytes.',
+        raises=TypeError,
+    )
+    def test_text_invalid():
+        """
+        Ensure a TypeError is raised when tokenizing if the text is not a str or
+        bytes.
+        """
+        Lexer(TestLexer._grammar()).tokens(None)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Input is not recognized.',
+        raises=ValueError,
+    )
+    def test_text_unrecognized():
+        """
+        Ensure a ValueError is raised when tokenizing if the input is not
+        recognized.
+        """
+        list(Lexer(TestLexer._grammar()).tokens('if ?'))
+
+    @staticmethod
+    def test_tokens():
+        """
+        Ensure tokens are found by maximal munch, ties go to the type given
+        first, and locations are tracked.
+        """
+        tokens = list(Lexer(TestLexer._grammar(), {'ws'}).tokens('if iffy\n 42 x'))
+        assert tokens == [
+            Token('if', 'if', 0, 1, 1),
+            Token('id', 'iffy', 3, 1, 4),
+            Token('int', '42', 9, 2, 2),
+            Token('id', 'x', 12, 2, 5),
+        ]
+
+    @staticmethod
+    def test_tokens_bytes():
+        """
+        Ensure bytes are tokenized the same as str, with bytes lexemes.
+        """
+        lexer = Lexer(TestLexer._grammar())
+        text = 'if iffy\n 42 x'
+        expected = [(token.type, token.value.encode(), token.offset, token.line, token.column)
+                    for token in lexer.tokens(text)]
+        actual = [(token.type, token.value, token.offset, token.line, token.column)
+                  for token in lexer.tokens(text.encode())]
+        assert expected == actual
+
+    @staticmethod
+    def test_tokens_position():
+        """
+        Ensure tokenizing may begin part way through the input.
+        """
+        tokens = list(Lexer(TestLexer._grammar(), {'ws'}).tokens('if\niffy 42', 3))
+        assert tokens == [Token('id', 'iffy', 3, 2, 1), Token('int', '42', 8, 2, 6)]
+
+    @staticmethod
+    @pytest.mark.parametrize('text', [
+        'a' * 64,
+        'a' * 8 + 'b' + 'aab' + 'aaa',
+        'b' + 'a' * 16 + 'b',
+    ])
+    def test_tokens_tabulating(text):
+        """
+        Ensure tabulating maximal munch finds the same tokens as backtracking
+        on input where backtracking is quadratic.
+        """
+        regular_grammar = RegularGrammar('munch', {
+            'a': ['a'],
+            'ab': ['a', RegularGrammar.kleene_star(), 'b'],
+        })
+        expected = list(Lexer(regular_grammar).tokens(text))
+        actual = list(Lexer(regular_grammar, tabulate=True).tokens(text))
+        assert expected == actual
+
+
+class TestParser:
+    """
+    A test suite for testing the Parser object.
+    """
+
+    @staticmethod
+    def _grammar():
+        """
+        Nested lists of identifiers, i.e. s-expressions.
+        """
+        return ContextFreeGrammar('runtime', {
+            'S': [['(', 'L', ')'], ['id']],
+            'L': [['S', 'L'], []],
+        }, 'S')
+
+    @staticmethod
+    def _tokens(text):
+        """
+        Tokenize the given text for the grammar, ignoring whitespace.
+        """
+        _class = (RegularGrammar.left_class(), RegularGrammar.right_class())
+        _range, _plus = RegularGrammar.character_range(), RegularGrammar.kleene_plus()
+        return Lexer(RegularGrammar('runtime', {
+            '(': ['('],
+            ')': [')'],
+            'id': [_class[0], 'a', _range, 'z', _class[1], _plus],
+            'ws': [_class[0], ' ', '\n', _class[1], _plus],
+            'int': [_class[0], '0', _range, '9', _class[1], _plus],
+        }), ignore={'ws'}).tokens(text)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Grammar is not of type ContextFreeGrammar.',
+        raises=TypeError,
+    )
+    def test_grammar_invalid():
+        """
+        Ensure a TypeError is raised when constructing a Parser object if the
+        grammar is not a ContextFreeGrammar.
+        """
+        Parser(None)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Grammar is not LL(1).',
+        raises=ValueError,
+    )
+    def test_grammar_conflict():
+        """
+        Ensure a ValueError is raised when constructing a Parser object if the
+        grammar has parse table conflicts.
+        """
+        Parser(ContextFreeGrammar('test', {'S': [['a'], ['a', 'b']]}, 'S'))
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Input is not derivable by the grammar.',
+        raises=ValueError,
+    )
+    @pytest.mark.parametrize('text', ['(a', '(a))', ')', ''])
+    def test_parse_unexpected(text):
+        """
+        Ensure a ValueError is raised when parsing if the tokens are not
+        derivable by the grammar.
+        """
+        Parser(TestParser._grammar()).parse(TestParser._tokens(text))
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Token type is not a terminal of the grammar.',
+        raises=ValueError,
+    )
+    @pytest.mark.parametrize('text', ['(a 1)', '(a) 1'])
+    def test_parse_unknown(text):
+        """
+        Ensure a ValueError is raised when parsing if a token's type is known
+        to the scanner but not a terminal of the grammar, rather than the token
+        being skipped.
+        """
+        Parser(TestParser._grammar()).parse(TestParser._tokens(text))
+
+    @staticmethod
+    def test_parse():
+        """
+        Ensure a parse tree is built from the tokens not ignored by the lexer,
+        with epsilon rules deriving childless nodes.
+        """
+        tree = Parser(TestParser._grammar()).parse(TestParser._tokens('( a )'))
+        assert tree == Node('S', 0, [
+            Token('(', '(', 0, 1, 1),
+            Node('L', 2, [Node('S', 1, [Token('id', 'a', 2, 1, 3)]), Node('L', 3, [])]),
+            Token(')', ')', 4, 1, 5),
+        ])
+
+    @staticmethod
+    def test_derive():
+        """
+        Ensure the leftmost derivation is streamed as rules and tokens.
+        """
+        grammar = TestParser._grammar()
+        events = list(Parser(grammar).derive(TestParser._tokens('(a)')))
+        assert events == [
+            0, Token('(', '(', 0, 1, 1),
+            2, 1, Token('id', 'a', 1, 1, 2),
+            3, Token(')', ')', 2, 1, 3),
+        ]
+        assert [grammar.rules[rule] for rule in events if isinstance(rule, int)] == [
+            ('S', ('(', 'L', ')')), ('L', ('S', 'L')), ('S', ('id',)), ('L', ()),
+        ]
+
+    @staticmethod
+    def test_parse_deep():
+        """
+        Ensure deeply nested input is parsed without recursion.
+        """
+        depth = 100000
+        tree = Parser(TestParser._grammar()).parse(TestParser._tokens('(' * depth + ')' * depth))
+        for _ in range(depth - 1):
+            assert tree.symbol == 'S' and tree.children[1].rule == 2
+            tree = tree.children[1].children[0]
+        assert tree.children[1] == Node('L', 3, [])
+
+    @staticmethod
+    def test_events():
+        """
+        Ensure events walk the parse tree depth first, bracketing the tokens
+        derived by each rule with its enter and exit.
+        """
+        events = list(Parser(TestParser._grammar()).events(TestParser._tokens('(a ())')))
+        assert events == [
+            ('enter', 0), ('token', Token('(', '(', 0, 1, 1)),
+            ('enter', 2), ('enter', 1), ('token', Token('id', 'a', 1, 1, 2)), ('exit', 1),
+            ('enter', 2), ('enter', 0), ('token', Token('(', '(', 3, 1, 4)),
+            ('enter', 3), ('exit', 3),
+            ('token', Token(')', ')', 4, 1, 5)), ('exit', 0),
+            ('enter', 3), ('exit', 3), ('exit', 2), ('exit', 2),
+            ('token', Token(')', ')', 5, 1, 6)), ('exit', 0),
+        ]
+
+    @staticmethod
+    def test_events_lazy():
+        """
+        Ensure events are yielded as tokens arrive, before the input is
+        exhausted (or found to be invalid).
+        """
+        def _tokens():
+            yield from TestParser._tokens('(a')
+            raise RuntimeError('input read too far')
+
+        events = Parser(TestParser._grammar()).events(_tokens())
+        assert [next(events) for _ in range(5)] == [
+            ('enter', 0), ('token', Token('(', '(', 0, 1, 1)),
+            ('enter', 2), ('enter', 1), ('token', Token('id', 'a', 1, 1, 2)),
+        ]
+
+    @staticmethod
+    def test_events_memory():
+        """
+        Ensure the memory used streaming events depends on the nesting depth
+        of the input, not its length.
+        """
+        parser, peaks = Parser(TestParser._grammar()), []
+        for length in (1000, 10000):
+            text = '(' + 'a ' * length + ')'
+            start()
+            for _ in parser.events(TestParser._tokens(text)):
+                pass
+            peaks.append(get_traced_memory()[1])
+            stop()
+        assert peaks[1] <= peaks[0] * 1.5
+
+    @staticmethod
+    def test_tree():
+        """
+        Ensure the flat tree encodes the same tree as parse, in preorder, with
+        each node spanning its tokens.
+        """
+        text = '(a ())'
+        tree = Parser(TestParser._grammar()).tree(TestParser._tokens(text))
+        assert isinstance(tree, Tree) and len(tree) == 12
+        assert [tree.symbol(node) for node in tree.walk()] == \
+               ['S', '(', 'L', 'S', 'id', 'L', 'S', '(', 'L', ')', 'L', ')']
+        assert [kind for kind in tree.kind if kind >= 0] == [0, 2, 1, 2, 0, 3, 3]
+        assert list(tree.parent) == [-1, 0, 0, 2, 3, 2, 5, 6, 6, 6, 5, 0]
+        assert list(tree.first) == [1, -1, 3, 4, -1, 6, 7, -1, -1, -1, -1, -1]
+        assert list(tree.sibling) == [-1, 2, 11, 5, -1, -1, 10, 8, 9, -1, -1, -1]
+        assert list(tree.offset) == [0, 0, 1, 1, 1, 3, 3, 3, -1, 4, -1, 5]
+        assert list(tree.length) == [6, 1, 4, 1, 1, 2, 2, 1, 0, 1, 0, 1]
+
+    @staticmethod
+    def test_tree_navigation():
+        """
+        Ensure the flat tree's helpers navigate it.
+        """
+        text = '(a ())'
+        tree = Parser(TestParser._grammar()).tree(TestParser._tokens(text))
+        assert list(tree.children(0)) == [1, 2, 11] and list(tree.children(4)) == []
+        assert list(tree.ancestors(7)) == [6, 5, 2, 0] and list(tree.ancestors(0)) == []
+        assert list(tree.walk(5)) == list(range(5, 11)) and list(tree.walk(6)) == list(range(6, 10))
+        assert [tree.token(node) for node in tree.children(0)] == [True, False, True]
+        assert tree.text(2, text) == 'a ()' and tree.text(8, text) == ''
+        assert tree.text(2, text.encode()) == b'a ()' and tree.text(8, text.encode()) == b''
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Node is not in the tree.',
+        raises=IndexError,
+    )
+    def test_tree_walk_invalid():
+        """
+        Ensure an IndexError is raised when walking from a node not in the
+        tree.
+        """
+        Parser(TestParser._grammar()).tree(TestParser._tokens('a')).walk(2)
+
+    @staticmethod
+    def test_tree_pickle():
+        """
+        Ensure the flat tree survives pickling, carrying only its columns and
+        symbol names.
+        """
+        tree = Parser(TestParser._grammar()).tree(TestParser._tokens('((a) b)'))
+        assert loads(dumps(tree)) == tree
@@ -1,9 +1,11 @@
 """
 Testing for RegularGrammar objects located in spag/scanner.py
 """
-from itertools import permutations
+from copy import copy, deepcopy
+from pickle import dumps, loads
+from tracemalloc import get_traced_memory, start, stop
 import pytest
-from spag.scanner import RegularGrammar
+from spag.scanner import RegularGrammar, TransitionTable
 
 
 class TestScanner:
@@ -66,42 +68,73 @@ class TestScanner:
             _symbol = {s:idx for idx, s in enumerate([row.pop(0) for row in expected['T']])}
             Tp = expected['T']
 
+        # NOTE: DFA's are deterministic, so a bijection (if any) is found by
+        # walking both from their start states in lock step.
         S = actual.start
-        Qp = expected['Q']
-
-        perms = permutations(Qp, len(Qp))
-        map_generator = ({q:perm[idx] for idx, q in enumerate(Q)} for perm in perms)
-        for _map in map_generator:
-            if _map[S] != expected['S']:
-                continue
-            if not all([_map[f] in expected['F'] for f in F]):
-                continue
-            if not all([{_map[s] for s in G[name]} == \
-               expected['G'].get(name, set()) for name in G]):
-                continue
-            if not all([all([_map[T[symbol[v]][state[q]]] == \
-               Tp[_symbol[v]][_state[_map[q]]] for q in Q]) for v in V]):
-                continue
-            return
-
-        assert False, 'Non-isomorphic DFA produced'
+        _map, explore = {S: expected['S']}, [S]
+        while explore:
+            q = explore.pop()
+            for v in V:
+                dest, _dest = T[symbol[v]][state[q]], Tp[_symbol[v]][_state[_map[q]]]
+                if dest not in _map:
+                    _map[dest] = _dest
+                    explore.append(dest)
+                assert _map[dest] == _dest, 'Non-isomorphic DFA produced'
+
+        assert len(_map) == len(Q) and len(set(_map.values())) == len(Q), \
+               'Non-isomorphic DFA produced'
+
+        assert all([_map[f] in expected['F'] for f in F]), \
+               'Non-isomorphic DFA produced'
+
+        assert all([{_map[s] for s in G[name]} == expected['G'].get(name, set())
+                    for name in G]), 'Non-isomorphic DFA produced'
 
     @staticmethod
     def _run(**kwargs):
         """
         The 'main' for testing which creates the required object and compares
         the results are what was expected, failing appropriately if they are
-        not.
+        not. Every supported NFA construction must produce the same DFA, as
+        must a lazy grammar once it is queried.
+        """
+        for construction, lazy in (('thompson', 0), ('glushkov', 0), ('thompson', 2)):
+            regular_grammar = RegularGrammar(kwargs['name'], kwargs['expressions'],
+                                             construction, lazy)
+
+            assert regular_grammar.name == kwargs['name'], \
+                   'Incorrect DFA name returned'
+
+            TestScanner._compare_expressions(kwargs['expressions'],
+                                             regular_grammar.expressions)
+
+            TestScanner._compare_dfa(deepcopy(kwargs['DFA']), regular_grammar)
+
+            TestScanner._compare_table(regular_grammar)
+
+    @staticmethod
+    def _compare_table(actual):
         """
-        regular_grammar = RegularGrammar(kwargs['name'], kwargs['expressions'])
+        Ensure the compact transition table encodes the same DFA as the
+        transitions, with a state's table id being its column.
+        """
+        state, symbol, T = actual.transitions
+        table = actual.table
+        assert table.states == len(state) and table.classes == len(T), \
+               'Incorrect table dimensions produced'
 
-        assert regular_grammar.name == kwargs['name'], \
-               'Incorrect DFA name returned'
+        assert len(memoryview(table)) == table.states * table.classes * \
+               memoryview(table.cells).itemsize, 'Incorrect table size produced'
 
-        TestScanner._compare_expressions(kwargs['expressions'],
-                                         regular_grammar.expressions)
+        assert table.start == state[actual.start], 'Incorrect table start produced'
 
-        TestScanner._compare_dfa(kwargs['DFA'], regular_grammar)
+        for label, column in state.items():
+            assert (table.accept(column) is not None) == (label in actual.accepting), \
+                   'Incorrect table accepting state produced'
+
+            for char, row in symbol.items():
+                assert table.next_state(column, char) == state[T[row][column]], \
+                       'Incorrect table transition produced'
 
     @staticmethod
     @pytest.mark.xfail(
@@ -139,6 +172,152 @@ class TestScanner:
             'DFA': {}
         })
 
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Construction is not of type string.',
+        raises=TypeError,
+    )
+    def test_construction_invalid():
+        """
+        Ensure a TypeError is raised when constructing a RegularGrammar object
+        if the construction is not of type string.
+        """
+        RegularGrammar('Invalid Construction', {'foo': ['b', 'a', 'r']}, None)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Construction is not recognized.',
+        raises=ValueError,
+    )
+    def test_construction_unrecognized():
+        """
+        Ensure a ValueError is raised when constructing a RegularGrammar object
+        if the construction is not recognized.
+        """
+        RegularGrammar('Unknown Construction', {'foo': ['b', 'a', 'r']}, 'brzozowski')
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Lazy is not of type int.',
+        raises=TypeError,
+    )
+    def test_lazy_invalid():
+        """
+        Ensure a TypeError is raised when constructing a RegularGrammar object
+        if lazy is not of type int.
+        """
+        RegularGrammar('Invalid Lazy', {'foo': ['b', 'a', 'r']}, 'thompson', True)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Lazy is negative.',
+        raises=ValueError,
+    )
+    def test_lazy_negative():
+        """
+        Ensure a ValueError is raised when constructing a RegularGrammar object
+        if lazy is negative.
+        """
+        RegularGrammar('Negative Lazy', {'foo': ['b', 'a', 'r']}, 'thompson', -1)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Text is not of type string.',
+        raises=TypeError,
+    )
+    def test_match_text_invalid():
+        """
+        Ensure a TypeError is raised when matching if the text is not of type
+        string.
+        """
+        RegularGrammar('Invalid Text', {'foo': ['b', 'a', 'r']}).match(None)
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Position is not of type int.',
+        raises=TypeError,
+    )
+    def test_match_position_invalid():
+        """
+        Ensure a TypeError is raised when matching if the position is not of
+        type int.
+        """
+        RegularGrammar('Invalid Position', {'foo': ['b', 'a', 'r']}).match('bar', '0')
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Position is not within the text.',
+        raises=ValueError,
+    )
+    def test_match_position_range():
+        """
+        Ensure a ValueError is raised when matching if the position is not
+        within the text.
+        """
+        RegularGrammar('Range Position', {'foo': ['b', 'a', 'r']}).match('bar', 4)
+
+    @staticmethod
+    @pytest.mark.parametrize("lazy", [0, 1, 3, 64])
+    def test_match(lazy):
+        """
+        Ensure matching finds the longest match, prioritizes types in the order
+        given, and agrees whether or not (and however small) the DFA is lazy.
+        """
+        _class = [RegularGrammar.left_class(), RegularGrammar.right_class()]
+        _range = RegularGrammar.character_range()
+        _plus = RegularGrammar.kleene_plus()
+        regular_grammar = RegularGrammar('match', {
+            'if': ['i', 'f'],
+            'id': [_class[0], 'a', _range, 'z', _class[1], _plus],
+            'int': [_class[0], '0', _range, '9', _class[1], _plus],
+            'ws': [' ', _plus],
+        }, 'thompson', lazy)
+        text = 'if iffy 42  x'
+        expected = [('if', 2), ('ws', 3), ('id', 7), ('ws', 8), ('int', 10),
+                    ('ws', 12), ('id', 13)]
+        position = 0
+        for (_type, end) in expected:
+            assert regular_grammar.match(text, position) == (_type, end), \
+                   'Incorrect match produced'
+            position = end
+        assert regular_grammar.match(text, position) is None, \
+               'Incorrect match produced'
+        assert regular_grammar.match('?') is None, 'Incorrect match produced'
+
+    @staticmethod
+    @pytest.mark.parametrize("lazy", [1, 2, 8])
+    def test_lazy_bounded(lazy):
+        """
+        Ensure the DFA states of a lazy grammar, including those reachable
+        from its start state, never exceed the cache capacity however often
+        the cache is flushed.
+        """
+        _class = [RegularGrammar.left_class(), RegularGrammar.right_class()]
+        _range = RegularGrammar.character_range()
+        _plus = RegularGrammar.kleene_plus()
+        regular_grammar = RegularGrammar('bounded', {
+            'while': ['w', 'h', 'i', 'l', 'e'],
+            'with': ['w', 'i', 't', 'h'],
+            'int': ['i', 'n', 't'],
+            'if': ['i', 'f'],
+            'id': [_class[0], 'a', _range, 'z', _class[1], _plus],
+            'ws': [' ', _plus],
+        }, 'thompson', lazy)
+        text = 'while with int if whilst within interval iffy x ' * 4
+        position = 0
+        while position < len(text):
+            _, position = regular_grammar.match(text, position)
+            lazy_dfa = regular_grammar._lazy  # pylint: disable=protected-access
+            assert lazy_dfa.size <= lazy, 'Cache capacity exceeded'
+            start = lazy_dfa._start  # pylint: disable=protected-access
+            reachable, explore = {id(start)}, [start]
+            while explore:
+                for state in explore.pop().transitions.values():
+                    if id(state) not in reachable:
+                        reachable.add(id(state))
+                        explore.append(state)
+            assert len(reachable) <= lazy, 'Evicted DFA states are reachable'
+
     @staticmethod
     @pytest.mark.xfail(
         reason='Expression is not of type dict.',
@@ -1678,6 +1857,37 @@ class TestScanner:
             }
         })
 
+    @staticmethod
+    def test_class_interval():
+        """
+        Ensure the expression produces the expected output.
+        """
+        TestScanner._run(**{
+            'name': 'Class Interval',
+            'expressions': {
+                'class_interval': [RegularGrammar.left_class(), 'a', RegularGrammar.character_range(), 'b',
+                                   RegularGrammar.right_class(), RegularGrammar.left_interval(), 1, 2,
+                                   RegularGrammar.right_interval()],
+            },
+            'DFA': {
+                'Q': set(['S', 'A1', 'F', 'Err']),
+                'V': set('ab'),
+                # pylint: disable=bad-whitespace
+                'T': [
+                    [' ', 'S',  'A1', 'F',   'Err'],
+                    ['a', 'A1', 'F',  'Err', 'Err'],
+                    ['b', 'A1', 'F',  'Err', 'Err']
+                ],
+                # pylint: enable=bad-whitespace
+                'S': 'S',
+                'F': set(['A1', 'F']),
+                'G': {
+                    'class_interval': set(['A1', 'F']),
+                    '_sink': set(['Err'])
+                }
+            }
+        })
+
     @staticmethod
     def test_operator_literals():
         """
@@ -1698,36 +1908,36 @@ class TestScanner:
                 'rbracket': [']']
             },
             'DFA': {
-                'Q': set(['S', 'F', 'Err']),
+                'Q': set(['S', 'F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7', 'F8', 'F9', 'F10', 'Err']),
                 'V': set('.|*?+\\()[]'),
                 # pylint: disable=bad-whitespace
                 'T': [
-                    [' ',  'S', 'F',   'Err'],
-                    ['.',  'F', 'Err', 'Err'],
-                    ['|',  'F', 'Err', 'Err'],
-                    ['*',  'F', 'Err', 'Err'],
-                    ['?',  'F', 'Err', 'Err'],
-                    ['+',  'F', 'Err', 'Err'],
-                    ['\\', 'F', 'Err', 'Err'],
-                    ['(',  'F', 'Err', 'Err'],
-                    [')',  'F', 'Err', 'Err'],
-                    ['[',  'F', 'Err', 'Err'],
-                    [']',  'F', 'Err', 'Err']
+                    [' ',  'S',   'F1',  'F2',  'F3',  'F4',  'F5',  'F6',  'F7',  'F8',  'F9',  'F10', 'Err'],
+                    ['.',  'F1',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['|',  'F2',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['*',  'F3',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['?',  'F4',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['+',  'F5',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['\\', 'F6',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['(',  'F7',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    [')',  'F8',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    ['[',  'F9',  'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err'],
+                    [']',  'F10', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err', 'Err']
                 ],
                 # pylint: enable=bad-whitespace
                 'S': 'S',
-                'F': set(['F']),
+                'F': set(['F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7', 'F8', 'F9', 'F10']),
                 'G': {
-                    'concat': set(['F']),
-                    'alt': set(['F']),
-                    'star': set(['F']),
-                    'question': set(['F']),
-                    'plus': set(['F']),
-                    'slash': set(['F']),
-                    'lparen': set(['F']),
-                    'rparen': set(['F']),
-                    'lbracket': set(['F']),
-                    'rbracket': set(['F']),
+                    'concat': set(['F1']),
+                    'alt': set(['F2']),
+                    'star': set(['F3']),
+                    'question': set(['F4']),
+                    'plus': set(['F5']),
+                    'slash': set(['F6']),
+                    'lparen': set(['F7']),
+                    'rparen': set(['F8']),
+                    'lbracket': set(['F9']),
+                    'rbracket': set(['F10']),
                     '_sink': set(['Err'])
                 }
             }
@@ -3070,3 +3280,89 @@ class TestScanner:
                 }
             }
         })
+
+    @staticmethod
+    def test_readonly_views():
+        """
+        Ensure the properties share immutable structures rather than copying
+        them on every access.
+        """
+        regular_grammar = RegularGrammar('views', {'foo': ['b', 'a', 'r']})
+        assert regular_grammar.transitions is regular_grammar.transitions
+        assert regular_grammar.types is regular_grammar.types
+        assert regular_grammar.states is regular_grammar.states
+        assert regular_grammar.accepting is regular_grammar.accepting
+        assert regular_grammar.expressions is regular_grammar.expressions
+        assert regular_grammar.alphabet is regular_grammar.alphabet
+        assert regular_grammar.transitions[1] is regular_grammar.transitions[1]
+
+    @staticmethod
+    def test_wide_ranges():
+        """
+        Ensure wide character ranges are compiled as ranges, not expanded into
+        a character at a time unless the alphabet is queried.
+        """
+        start()
+        regular_grammar = RegularGrammar('wide', {
+            'wide': [RegularGrammar.left_class(), '\u0100', RegularGrammar.character_range(),
+                     '\U0010ffff', RegularGrammar.right_class(), RegularGrammar.kleene_plus()],
+        })
+        assert regular_grammar.classes == (((0x100, 0x10ffff),),)
+        assert regular_grammar.table.next_state(regular_grammar.table.start, '\U0001f600') >= 0
+        peak = get_traced_memory()[1]
+        stop()
+        assert peak < 1 << 20
+        assert len(regular_grammar.alphabet) == 0x10ffff - 0x100 + 1
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Types are read only.',
+        raises=TypeError,
+    )
+    def test_types_readonly():
+        """
+        Ensure a TypeError is raised when attempting to mutate the types.
+        """
+        RegularGrammar('views', {'foo': ['b', 'a', 'r']}).types['foo'] = frozenset()
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Table is read only.',
+        raises=TypeError,
+    )
+    def test_table_readonly():
+        """
+        Ensure a TypeError is raised when attempting to mutate the table.
+        """
+        RegularGrammar('views', {'foo': ['b', 'a', 'r']}).table.cells[0] = 0
+
+    @staticmethod
+    def test_table_pickle():
+        """
+        Ensure the table survives pickling and copying, and only compares equal
+        to tables identical in every field.
+        """
+        table = RegularGrammar('pickle', {'foo': ['b', 'a', 'r'], 'baz': ['b', 'a', 'z']}).table
+        for copied in (loads(dumps(table)), copy(table), deepcopy(table)):
+            assert copied == table and hash(copied) == hash(table), 'Incorrect copy produced'
+            assert (copied.typecode, copied.states, copied.classes, copied.start, copied.sink) == \
+                   (table.typecode, table.states, table.classes, table.start, table.sink)
+            assert list(copied.cells) == list(table.cells) and \
+                   list(copied.accepts) == list(table.accepts) and copied.types == table.types
+            assert copied.next_state(copied.start, 'b') == table.next_state(table.start, 'b')
+        assert table != bytes(table), 'Table equals its raw bytes'
+        tables = [TransitionTable([1, 1], 1, 0, 1, [-1, 0], types, [(97, 97, 0)])
+                  for types in (('a',), ('b',))]
+        assert bytes(tables[0]) == bytes(tables[1]) and tables[0] != tables[1], \
+               'Types were not compared'
+
+    @staticmethod
+    @pytest.mark.xfail(
+        reason='Transitions are read only.',
+        raises=TypeError,
+    )
+    def test_transitions_readonly():
+        """
+        Ensure a TypeError is raised when attempting to mutate the transitions.
+        """
+        RegularGrammar('views', {'foo': ['b', 'a', 'r']}).transitions[2][0] = ()